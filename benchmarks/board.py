@@ -0,0 +1,120 @@
+"""Board memory and access speed: the old list-of-dicts grids vs common.board.
+
+    python -m benchmarks.board
+"""
+import gc
+import sys
+import time
+import tracemalloc
+
+from common.board import Board, make_grid
+from common.placement import pool, ship_cells
+
+COLOR = (76, 86, 106)
+
+
+class Node:
+    # make_grid built every square from one of these before common.board
+    def __init__(self, rect, color):
+        self.rect = rect
+        self.ship = None
+        self.color = color
+        self.empty = 1
+        self.aimed = False
+        self.perma_color = None
+
+
+def legacy_grid(sx=50, ex=400, sy=390, ey=730, color=COLOR, size=35):
+    return [
+        [Node((x, y, size, size), color).__dict__ for y in range(sy, ey, size)]
+        for x in range(sx, ex, size)
+    ]
+
+
+def legacy_layout(code):
+    grid = legacy_grid()
+    for name, cells in ship_cells(code):
+        for x, y in cells:
+            grid[x][y]["ship"] = name
+    return grid
+
+
+def layout(code):
+    grid = make_grid(50, 400, 390, 730, COLOR)
+    for name, cells in ship_cells(code):
+        grid.place(name, cells)
+    return grid
+
+
+def memory(build, codes):
+    gc.collect()
+    tracemalloc.start()
+    boards = [build(code) for code in codes]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del boards
+    return size / len(codes)
+
+
+def rate(label, fn, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    per_sec = n / (time.perf_counter() - start)
+    print(f"{label:<40} {per_sec:>12.0f}/s  {1e6 / per_sec:>8.2f} us")
+
+
+def scan_dicts(grid):
+    # What the drawing loops and the bot did on every pass over a grid
+    return sum(1 for column in grid for square in column if square["ship"] and not square["aimed"])
+
+
+def scan_view(board):
+    return sum(1 for column in board for square in column if square["ship"] and not square["aimed"])
+
+
+def scan_values(board):
+    return sum(1 for name, aimed in board.values("ship", "aimed") if name and not aimed)
+
+
+def scan_arrays(board):
+    return int(((board.array("ship") != 0) & (board.array("aimed") == 0)).sum())
+
+
+def check(codes):
+    for code in codes:
+        old, new = legacy_layout(code), layout(code)
+        assert new.to_list() == old
+        assert scan_dicts(old) == scan_view(new) == scan_values(new) == 17
+    print(f"{len(codes)} boards match the dict grids square for square")
+
+
+if __name__ == "__main__":
+    codes = [pool.draw() for _ in range(2000)]
+    check(codes[:200])
+
+    old, new = memory(legacy_layout, codes), memory(layout, codes)
+    print(f"dict grid with ships  {old:>9.0f} bytes/board")
+    print(f"Board with ships      {new:>9.0f} bytes/board  ({old / new:.0f}x smaller)")
+    print(f"empty Board object    {sys.getsizeof(Board()):>9} bytes")
+
+    code = codes[0]
+    rate("build dict grid + ships", lambda: legacy_layout(code), 20000)
+    rate("build Board + ships", lambda: layout(code), 20000)
+
+    grid, board = legacy_layout(code), layout(code)
+    for x, y in ((0, 0), (3, 4), (9, 9)):
+        grid[x][y]["aimed"] = True
+        board.set(x, y, "aimed", True)
+    rate("random access grid[x][y]['ship']", lambda: grid[4][7]["ship"], 1000000)
+    rate("random access board.ship_at(x, y)", lambda: board.ship_at(4, 7), 1000000)
+    rate("random access board[x][y]['ship']", lambda: board[4][7]["ship"], 1000000)
+    rate("full scan, dict grid", lambda: scan_dicts(grid), 20000)
+    rate("full scan, Board view", lambda: scan_view(board), 20000)
+    rate("full scan, Board.values", lambda: scan_values(board), 20000)
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        print("NumPy not installed, skipping the array scan")
+    else:
+        rate("full scan, Board.array (NumPy)", lambda: scan_arrays(board), 20000)
@@ -0,0 +1,122 @@
+"""Frames/sec of common.framing.FrameReader against the old receive() loop.
+
+    python -m benchmarks.framing
+
+"framing" replays a captured byte stream from memory and leaves out the JSON
+decode, so it shows the cost of splitting frames alone. "socketpair" runs
+the complete receive path over a real socket, where the number of recv
+syscalls per frame matters too.
+"""
+import json
+import socket
+import time
+from threading import Thread
+
+from common.framing import FrameReader, encode
+
+
+class ReplaySocket:
+    """Socket stand-in serving a byte string, at most `chunk` bytes per call."""
+
+    def __init__(self, data, chunk):
+        self.data = memoryview(data)
+        self.chunk = chunk
+        self.pos = 0
+
+    def recv(self, n):
+        b = self.data[self.pos : self.pos + min(n, self.chunk)].tobytes()
+        self.pos += len(b)
+        return b
+
+    def recv_into(self, buf):
+        n = min(len(buf), self.chunk, len(self.data) - self.pos)
+        buf[:n] = self.data[self.pos : self.pos + n]
+        self.pos += n
+        return n
+
+
+def legacy_frame(sock):
+    # receive() as it was in server/network.py and client/misc/network.py
+    buff = b""
+    n = int.from_bytes(sock.recv(4)[:4], "big")
+    while n > 0:
+        b = sock.recv(n)
+        buff += b
+        n -= len(b)
+    return buff.decode()
+
+
+def legacy_receive(sock):
+    return json.loads(legacy_frame(sock))
+
+
+def reader_frame(reader, sock):
+    while (payload := reader.next_frame()) is None:
+        reader.fill(sock)
+    return payload
+
+
+def messages():
+    from server.utils import layout_ships
+
+    return [
+        ("POSITION", {"category": "POSITION", "payload": [3, 7]}, 200000),
+        ("CHAT", {"category": "CHAT", "payload": "x" * 40}, 200000),
+        ("BOARD", {"category": "BOARD", "payload": [True, layout_ships().to_list(("ship",)), [], "name", 0]}, 5000),
+    ]
+
+
+def framing(name, message, count, chunk=65536):
+    stream = encode(message) * count
+    reader = FrameReader()
+    rates = []
+    for receive in (legacy_frame, lambda s: reader_frame(reader, s)):
+        sock = ReplaySocket(stream, chunk)
+        start = time.perf_counter()
+        for _ in range(count):
+            receive(sock)
+        rates.append(count / (time.perf_counter() - start))
+    report("framing", name, len(stream) // count, *rates)
+
+
+def socketpair(name, message, count):
+    frame = encode(message)
+    rates = []
+    for receive in (legacy_receive, FrameReader().receive):
+        a, b = socket.socketpair()
+        writer = Thread(target=lambda: [a.sendall(frame) for _ in range(count)])
+        start = time.perf_counter()
+        writer.start()
+        for _ in range(count):
+            receive(b)
+        rates.append(count / (time.perf_counter() - start))
+        writer.join()
+        a.close()
+        b.close()
+    report("socketpair", name, len(frame), *rates)
+
+
+def report(mode, name, size, legacy, reader):
+    print(
+        f"{mode:<10} {name:<9} {size:>6} B/frame  legacy {legacy:>9.0f}/s  "
+        f"FrameReader {reader:>9.0f}/s  x{reader / legacy:.2f}"
+    )
+
+
+def check_partial_reads():
+    sent = [{"category": "CHAT", "payload": "x" * i} for i in range(0, 3000, 7)]
+    stream = b"".join(encode(m) for m in sent)
+    for chunk in (1, 3, 5, 1460):
+        reader = FrameReader(size=16)
+        sock = ReplaySocket(stream, chunk)
+        assert [reader.receive(sock) for _ in sent] == sent
+    print("short reads: all frames decoded intact")
+
+
+if __name__ == "__main__":
+    check_partial_reads()
+    cases = messages()
+    for case in cases:
+        framing(*case)
+    for name, message, count in cases:
+        socketpair(name, message, count // 4)
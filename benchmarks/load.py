@@ -0,0 +1,271 @@
+"""Synthetic players for finding the server's limits.
+
+    python -m benchmarks.load --players 2000 --rate 200 --games 3
+
+Players connect in pairs at --rate connections/sec: one sends CREATE, the
+other JOINs the room it got, and both play full games (random shots every
+--shot-delay seconds, chat at --chat-rate messages/sec), offering a rematch
+until --games have been played. Every --interval seconds a line shows the
+open connections, message rates and the room/player counts the server
+reports for a STATS request; the final report has connection setup latency,
+shot round-trip (POSITION to RESULT) and chat relay percentiles, and errors.
+
+Everything runs on one asyncio loop and speaks the same framing and codec
+negotiation as client/misc/network.py. With a sharded server the STATS line
+shows whichever worker answered the monitor connection.
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+from collections import Counter
+
+from common import binproto
+from common.framing import HEADER, decode, encode
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+SIZE = 10
+
+
+class Run:
+    """Settings and measurements shared by every synthetic player."""
+
+    def __init__(self, args):
+        self.args = args
+        self.address = (args.host, args.port)
+        self.codecs = [] if args.json else [binproto.NAME]
+        self.setup = []
+        self.rtt = []
+        self.relay = []
+        self.errors = Counter()
+        self.games = 0
+        self.open = 0
+        self.sent = 0
+        self.received = 0
+        self.finished = 0
+
+
+class LoadPlayer:
+    """One synthetic client, mirroring client/misc/network.Network."""
+
+    def __init__(self, run, name):
+        self.run = run
+        self.name = name
+        self.binary = False
+        self.writer = None
+        self.turn = asyncio.Event()
+        self.playing = False
+        self.game = 0
+        self.games_left = run.args.games
+        self.untried = []
+        self.shot_at = None
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection(*self.run.address)
+        self.run.open += 1
+
+    def send(self, data):
+        if isinstance(data, dict) and data.get("category") in ("CREATE", "JOIN"):
+            data = {**data, "codecs": self.run.codecs}
+        self.writer.write(encode(data, self.binary))
+        self.run.sent += 1
+
+    async def receive(self):
+        n = int.from_bytes(await self.reader.readexactly(HEADER), "big")
+        payload = await self.reader.readexactly(n)
+        if binproto.is_binary(payload):
+            self.binary = True
+        self.run.received += 1
+        return decode(payload)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.run.open -= 1
+            self.writer = None
+
+    async def play(self, started=None):
+        # started: connect time of a JOINing player, counted until its BOARD
+        tasks = [asyncio.create_task(self.shoot()), asyncio.create_task(self.chat())]
+        try:
+            while True:
+                data = await self.receive()
+                if isinstance(data, str):
+                    # END, TAKEN or INVALID
+                    self.run.errors[data] += 1
+                    return
+                category, payload = data["category"], data.get("payload")
+                if category == "BOARD":
+                    if started is not None:
+                        self.run.setup.append(time.perf_counter() - started)
+                        started = None
+                    self.game += 1
+                    self.playing = True
+                    self.untried = random.sample(range(SIZE * SIZE), SIZE * SIZE)
+                    if payload[0]:
+                        self.turn.set()
+                elif category == "RESULT":
+                    if self.shot_at is not None:
+                        self.run.rtt.append(time.perf_counter() - self.shot_at)
+                        self.shot_at = None
+                elif category == "POSITION":
+                    if self.playing:
+                        self.turn.set()
+                elif category == "CHAT":
+                    self.run.relay.append(time.perf_counter() - float(payload))
+                elif category == "PING":
+                    self.send({"category": "PONG"})
+                elif category == "GAME_OVER":
+                    self.playing = False
+                    self.turn.clear()
+                    self.games_left -= 1
+                    if self.games_left <= 0:
+                        return
+                    self.send({"category": "REMATCH_OFFER"})
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def shoot(self):
+        while True:
+            await self.turn.wait()
+            self.turn.clear()
+            game = self.game
+            await asyncio.sleep(self.run.args.shot_delay)
+            if game != self.game or not self.playing or not self.untried:
+                continue
+            x, y = divmod(self.untried.pop(), SIZE)
+            self.shot_at = time.perf_counter()
+            self.send({"category": "POSITION", "payload": [x, y]})
+
+    async def chat(self):
+        rate = self.run.args.chat_rate
+        if rate <= 0:
+            return
+        while True:
+            await asyncio.sleep(random.expovariate(rate))
+            # Only in a match: the server drops chat from a player without an
+            # opponent, so it would never be relayed
+            if self.playing:
+                self.send({"category": "CHAT", "payload": f"{time.perf_counter():.6f}"})
+
+
+async def run_pair(run, index):
+    host = LoadPlayer(run, f"load{index}a")
+    guest = LoadPlayer(run, f"load{index}b")
+    try:
+        started = time.perf_counter()
+        await host.connect()
+        host.send({"category": "CREATE", "name": host.name, "avatar": 0})
+        data = await host.receive()
+        if not isinstance(data, dict) or data.get("category") != "ID":
+            run.errors[f"CREATE answered {data!r}"[:60]] += 1
+            return
+        run.setup.append(time.perf_counter() - started)
+        started = time.perf_counter()
+        await guest.connect()
+        guest.send({"category": "JOIN", "payload": data["payload"], "name": guest.name, "avatar": 0})
+        await asyncio.gather(host.play(), guest.play(started))
+        run.games += min(host.game, guest.game)
+    except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+        run.errors[type(e).__name__] += 1
+    finally:
+        host.close()
+        guest.close()
+        run.finished += 1
+
+
+async def monitor(run, pairs):
+    stats = None
+    try:
+        reader, writer = await asyncio.open_connection(*run.address)
+    except OSError:
+        reader = writer = None
+    start = time.perf_counter()
+    last_sent = last_received = 0
+    while run.finished < pairs:
+        await asyncio.sleep(run.args.interval)
+        if writer is not None:
+            try:
+                writer.write(encode({"category": "STATS"}))
+                n = int.from_bytes(await reader.readexactly(HEADER), "big")
+                stats = decode(await reader.readexactly(n))["payload"]
+            except (OSError, asyncio.IncompleteReadError, KeyError, TypeError):
+                writer = None
+                stats = None
+        server = f"rooms {stats['rooms']:>5}  players {stats['players']:>5}" if stats else "server stats n/a"
+        print(
+            f"{time.perf_counter() - start:6.1f}s  open {run.open:>5}  "
+            f"out {(run.sent - last_sent) / run.args.interval:>8.0f}/s  "
+            f"in {(run.received - last_received) / run.args.interval:>8.0f}/s  "
+            f"{server}  games {run.games}  errors {sum(run.errors.values())}"
+        )
+        last_sent, last_received = run.sent, run.received
+    if writer is not None:
+        writer.close()
+
+
+def percentiles(label, samples):
+    if not samples:
+        print(f"{label}: no samples")
+        return
+    samples = sorted(samples)
+    cut = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))] * 1000
+    print(
+        f"{label}: p50 {cut(0.5):.2f} ms  p90 {cut(0.9):.2f} ms  p99 {cut(0.99):.2f} ms  "
+        f"max {samples[-1] * 1000:.2f} ms  ({len(samples)} samples)"
+    )
+
+
+async def main(args):
+    run = Run(args)
+    pairs = args.players // 2
+    watcher = asyncio.create_task(monitor(run, pairs))
+    tasks = []
+    start = time.perf_counter()
+    for i in range(pairs):
+        tasks.append(asyncio.create_task(run_pair(run, i)))
+        # Each pair opens two connections
+        await asyncio.sleep(2 / args.rate)
+    await asyncio.gather(*tasks)
+    await watcher
+    elapsed = time.perf_counter() - start
+
+    print(f"{pairs * 2} players, {run.games} games in {elapsed:.1f} s")
+    print(f"messages: {run.sent} sent, {run.received} received")
+    percentiles("connection setup (connect to ID/BOARD)", run.setup)
+    percentiles("shot round trip (POSITION to RESULT)", run.rtt)
+    percentiles("chat relay", run.relay)
+    if run.errors:
+        print("errors:")
+        for error, count in run.errors.most_common():
+            print(f"  {count:>6}  {error}")
+
+
+def raise_fd_limit():
+    # Every player holds a socket; the default soft limit is often 1024
+    if resource is None:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load")
+    parser.add_argument("--host", default=os.getenv("SERVER_HOST", "localhost"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("SERVER_PORT", "1234")))
+    parser.add_argument("--players", type=int, default=200, help="number of synthetic players")
+    parser.add_argument("--rate", type=float, default=100, help="new connections per second")
+    parser.add_argument("--games", type=int, default=1, help="games per pair, with rematches")
+    parser.add_argument("--shot-delay", type=float, default=0.05, help="seconds before each shot")
+    parser.add_argument("--chat-rate", type=float, default=0.5, help="chat messages per second per player")
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between progress lines")
+    parser.add_argument("--json", action="store_true", help="do not offer the binary codec")
+    raise_fd_limit()
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,105 @@
+"""Quick-play pairing: scanning open rooms vs server.matchmaking.Matchmaker.
+
+Without a queue, pairing strangers means finding a room whose creator still
+waits, a scan over every open room, --playing matches in progress included.
+The matchmaker pops the longest waiting player from a FIFO instead. Both
+start with --queued players waiting; each arrival is then paired with one
+of them and replaced by a newcomer, so the backlog stays the same size.
+--leave-rate of the waiting players give up before they are paired.
+Latency is per arrival, the call that pairs it.
+
+    python -m benchmarks.matchmaking --queued 10000 50000 --ratings
+"""
+import argparse
+import random
+import statistics
+import time
+from collections import deque
+
+from server.matchmaking import Matchmaker
+
+
+class Player:
+    def __init__(self, rating=None):
+        self.rating = rating
+        self.queued = None
+
+
+class RoomScan(Matchmaker):
+    """Quick play on top of CREATE/JOIN: join the oldest room with a free seat."""
+
+    def __init__(self, playing, bucket_width=200):
+        super().__init__(bucket_width)
+        # Insertion ordered, so the oldest room is found first
+        self.rooms = {i: [Player(), Player()] for i in range(playing)}
+
+    def enqueue(self, player, rating=None):
+        key = self.bucket(rating)
+        for room, players in self.rooms.items():
+            if len(players) == 1 and self.bucket(players[0].rating) == key:
+                # The match starts; it is no longer a candidate
+                del self.rooms[room]
+                return players[0]
+        self.rooms[player] = [player]
+        return None
+
+    def cancel(self, player):
+        return self.rooms.pop(player, None) is not None
+
+
+def rating(args):
+    return random.gauss(1500, 300) if args.ratings else None
+
+
+def run(matcher, args, queued):
+    waiting = deque()
+    for _ in range(queued):
+        player = Player(rating(args))
+        matcher.enqueue(player, player.rating)
+        waiting.append(player)
+    latencies = []
+    pairs = 0
+    start = time.perf_counter()
+    for _ in range(args.arrivals):
+        if random.random() < args.leave_rate and waiting:
+            matcher.cancel(waiting.popleft())
+        player = Player(rating(args))
+        t = time.perf_counter_ns()
+        opponent = matcher.enqueue(player, player.rating)
+        latencies.append(time.perf_counter_ns() - t)
+        if opponent is None:
+            waiting.append(player)
+        else:
+            pairs += 1
+            # Keep the backlog topped up
+            newcomer = Player(rating(args))
+            if matcher.enqueue(newcomer, newcomer.rating) is None:
+                waiting.append(newcomer)
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "pairs/s": pairs / elapsed,
+        "p50": latencies[len(latencies) // 2] / 1000,
+        "p99": latencies[int(len(latencies) * 0.99)] / 1000,
+        "mean": statistics.fmean(latencies) / 1000,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.matchmaking")
+    parser.add_argument("--queued", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--arrivals", type=int, default=20000)
+    parser.add_argument("--playing", type=int, default=10000, help="full rooms the scan passes over")
+    parser.add_argument("--leave-rate", type=float, default=0.1)
+    parser.add_argument("--ratings", action="store_true", help="pair by skill bucket")
+    parser.add_argument("--skip-scan", action="store_true", help="only run the matchmaker")
+    args = parser.parse_args()
+
+    print(f"{'queued':>7} {'matcher':<12} {'pairs/s':>10} {'p50 us':>8} {'p99 us':>8} {'mean us':>8}")
+    for queued in args.queued:
+        matchers = [("matchmaker", Matchmaker())]
+        if not args.skip_scan:
+            matchers.append(("room scan", RoomScan(args.playing)))
+        for label, matcher in matchers:
+            r = run(matcher, args, queued)
+            print(f"{queued:>7} {label:<12} {r['pairs/s']:>10.0f} {r['p50']:>8.2f} {r['p99']:>8.2f} {r['mean']:>8.2f}")
@@ -0,0 +1,85 @@
+"""Fleet layout generation: old rejection sampling vs the placement pool.
+
+    python -m benchmarks.placement
+"""
+import random
+import time
+
+from common.placement import SHIPS, PlacementPool, sample, ship_cells, ship_masks
+from server.utils import layout_ships, make_grid
+
+
+def legacy_layout_ships():
+    # server/utils.layout_ships before the pool
+    grid = make_grid(50, 400, 390, 730, (76, 86, 106))
+    for name, size in SHIPS.items():
+        while True:
+            ship_collision = False
+            coords = []
+            coord1 = random.randint(0, 9)
+            coord2 = random.randint(0, 10 - size)
+            if random.choice((True, False)):
+                x, y = coord1, coord2
+                xi, yi = 0, 1
+            else:
+                x, y = coord2, coord1
+                xi, yi = 1, 0
+            for i in range(size):
+                new_x = x + (xi * i)
+                new_y = y + (yi * i)
+                if grid[new_x][new_y]["ship"]:
+                    ship_collision = True
+                    break
+                coords.append((new_x, new_y))
+            if not ship_collision:
+                break
+        for bx, by in coords:
+            grid[bx][by]["ship"] = name
+    return grid
+
+
+def check_layouts(n):
+    for _ in range(n):
+        code = sample()
+        seen = set()
+        for name, cells in ship_cells(code):
+            assert len(cells) == SHIPS[name]
+            assert all(0 <= x < 10 and 0 <= y < 10 for x, y in cells)
+            assert seen.isdisjoint(cells)
+            seen.update(cells)
+        assert sum(bin(m).count("1") for m in ship_masks(code).values()) == len(seen)
+    print(f"{n} sampled layouts valid")
+
+
+def occupancy(layouts):
+    counts = [0] * 100
+    for grid in layouts:
+        for x, col in enumerate(grid):
+            for y, sq in enumerate(col):
+                if sq["ship"]:
+                    counts[x * 10 + y] += 1
+    return [c / len(layouts) for c in counts]
+
+
+def rate(label, fn, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    per_sec = n / (time.perf_counter() - start)
+    print(f"{label:<34} {per_sec:>12.0f}/s  {1e6 / per_sec:>8.2f} us")
+
+
+if __name__ == "__main__":
+    check_layouts(20000)
+    n = 20000
+    old = occupancy([legacy_layout_ships() for _ in range(n)])
+    new = occupancy([layout_ships() for _ in range(n)])
+    print(f"max per-cell occupancy difference vs old sampler: {max(abs(a - b) for a, b in zip(old, new)):.3f}")
+
+    rate("legacy layout_ships()", legacy_layout_ships, 20000)
+    rate("placement.sample()", sample, 100000)
+    pool = PlacementPool(size=200000, low=0)
+    pool.layouts.extend(sample() for _ in range(200000))
+    rate("PlacementPool.draw()", pool.draw, 200000)
+    rate("layout_ships() from pool", layout_ships, 20000)
+    rate("pool draw + ship_masks (bitboard)", lambda: ship_masks(pool.draw()), 100000)
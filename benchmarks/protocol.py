@@ -0,0 +1,80 @@
+"""Size and encode/decode time of the binary codec against JSON frames.
+
+    python -m benchmarks.protocol
+
+Every message is round-tripped through both codecs first and must come back
+as the JSON path would deliver it.
+"""
+import json
+import time
+
+from common import binproto
+from common.framing import FrameReader, decode, encode
+from benchmarks.framing import ReplaySocket
+
+
+def messages():
+    from server.utils import layout_ships
+
+    # Serialized the way the server sends a BOARD
+    layout, opponent = (layout_ships().to_list(("ship",)) for _ in range(2))
+    ships = [(x, y, sq["ship"]) for x, col in enumerate(opponent) for y, sq in enumerate(col) if sq["ship"]]
+    return [
+        ("BOARD", {"category": "BOARD", "payload": [True, layout, [], "Captain", 2]}),
+        ("BOARD+opp", {"category": "BOARD", "payload": [True, layout, ships, "Captain", 2]}),
+        ("POSITION", {"category": "POSITION", "payload": (4, 9)}),
+        ("RESULT", {"category": "RESULT", "payload": {"position": [3, 4], "hit": False, "sunk": None, "cells": [], "win": False}}),
+        ("SUNK", {"category": "RESULT", "payload": {"position": [0, 2], "hit": True, "sunk": "Cruiser", "cells": [[0, 0], [0, 1], [0, 2]], "win": True}}),
+        ("CHAT", {"category": "CHAT", "payload": "gg, chơi lại nhé?"}),
+        ("ID", {"category": "ID", "payload": "qwerty"}),
+        ("GAME_OVER", {"category": "GAME_OVER", "payload": {"by": "Captain", "reason": "surrender"}}),
+        ("GAME_OVER", {"category": "GAME_OVER", "payload": {"by": None, "reason": "surrender"}}),
+        ("REMATCH", {"category": "REMATCH_STATUS", "payload": {"offers": ["A", "B"]}}),
+        ("START", {"category": "REMATCH_START", "payload": {}}),
+        ("SURRENDER", {"category": "SURRENDER"}),
+        ("END", "END"),
+        ("INVALID", "INVALID"),
+        ("fallback", {"category": "CREATE", "name": "A", "avatar": 1, "codecs": ["bin1"]}),
+    ]
+
+
+def as_received(message):
+    """What a JSON client gets, with layouts reduced to the fields bin1 keeps."""
+    message = json.loads(json.dumps(message))
+    if isinstance(message, dict) and message.get("category") == "BOARD":
+        message["payload"][1] = [[{"ship": sq["ship"]} for sq in col] for col in message["payload"][1]]
+    return message
+
+
+def check_round_trip(cases):
+    for name, message in cases:
+        for binary in (False, True):
+            frame = encode(message, binary)
+            got = FrameReader().receive(ReplaySocket(frame, len(frame)))
+            assert as_received(got) == as_received(message), (name, binary)
+        assert binproto.is_binary(encode(message, True)[4:])
+    print(f"round trip ok for {len(cases)} messages")
+
+
+def per_call(fn, arg, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        fn(arg)
+    return (time.perf_counter() - start) / n * 1e6
+
+
+if __name__ == "__main__":
+    cases = messages()
+    check_round_trip(cases)
+    print(f"{'message':<10} {'json B':>7} {'bin1 B':>7}  {'json enc+dec us':>16} {'bin1 enc+dec us':>16}")
+    for name, message in cases:
+        n = 2000 if name.startswith("BOARD") else 50000
+        sizes, times = [], []
+        for binary in (False, True):
+            frame = encode(message, binary)
+            sizes.append(len(frame))
+            times.append(
+                per_call(lambda m: encode(m, binary), message, n)
+                + per_call(decode, memoryview(frame)[4:], n)
+            )
+        print(f"{name:<10} {sizes[0]:>7} {sizes[1]:>7}  {times[0]:>16.2f} {times[1]:>16.2f}")
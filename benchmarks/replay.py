@@ -0,0 +1,122 @@
+"""Match replay log: cost on the gameplay thread, and reading it back.
+
+Writes --matches synthetic matches (BOARD, a shot per record until one fleet
+is down, END), --concurrent of them interleaved at a time like rooms on a
+busy server. The time per recorded event is what a room pays while holding
+its lock; it is compared with writing each record to the file straight
+away. Then ``ReplayReader`` maps the segments, and random seeks to a match
+and a move in it are timed against finding the same move by scanning the
+segments from the start.
+
+    python -m benchmarks.replay --matches 20000
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from common.placement import pool, ship_masks
+from server.bitboard import BitBoard
+from server.replay import FLEET_DESTROYED, HEADER, MAGIC, ReplayLog, ReplayReader
+
+
+class DirectLog(ReplayLog):
+    """Every record written to the file by the thread that made it."""
+
+    def append(self, record):
+        with self._lock:
+            self._write(record)
+
+
+def play(log, matches, concurrent):
+    # Interleaved matches, shots in random order until a fleet is gone
+    running = []
+    started = events = 0
+    elapsed = 0.0
+    while started < matches or running:
+        while started < matches and len(running) < concurrent:
+            codes = [pool.draw(), pool.draw()]
+            t = time.perf_counter()
+            match = log.start("abcdef", codes, 0, ["player a", "player b"])
+            elapsed += time.perf_counter() - t
+            boards = [BitBoard(ship_masks(code)) for code in codes]
+            cells = [random.sample(range(100), 100) for _ in codes]
+            running.append([match, boards, cells, 0])
+            started += 1
+            events += 1
+        game = random.choice(running)
+        match, boards, cells, turn = game
+        x, y = divmod(cells[turn].pop(), 10)
+        hit, sunk, won = boards[1 - turn].fire(x, y)
+        t = time.perf_counter()
+        match.shot(turn, x, y, hit, sunk, won)
+        if won:
+            match.end(turn, FLEET_DESTROYED)
+        elapsed += time.perf_counter() - t
+        events += 1 + won
+        game[3] = 1 - turn
+        if won:
+            running.remove(game)
+    return events, elapsed
+
+
+def scan_for(directory, match_id, n):
+    # The n-th record of a match without an index: read from the start
+    for name in sorted(os.listdir(directory)):
+        with open(os.path.join(directory, name), "rb") as f:
+            data = f.read()
+        offset = len(MAGIC)
+        while offset + HEADER.size <= len(data):
+            found, kind, ms, length = HEADER.unpack_from(data, offset)
+            if found == match_id:
+                if n == 0:
+                    return kind, ms, data[offset + HEADER.size : offset + HEADER.size + length]
+                n -= 1
+            offset += HEADER.size + length
+    return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.replay")
+    parser.add_argument("--matches", type=int, default=20000)
+    parser.add_argument("--concurrent", type=int, default=500)
+    parser.add_argument("--segment-mb", type=int, default=64)
+    parser.add_argument("--seeks", type=int, default=100000)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="replay-bench-")
+    try:
+        for label, cls in (("direct writes", DirectLog), ("batched (ReplayLog)", ReplayLog)):
+            directory = os.path.join(root, cls.__name__)
+            log = cls(directory, segment_bytes=args.segment_mb << 20)
+            events, elapsed = play(log, args.matches if cls is ReplayLog else args.matches // 10, args.concurrent)
+            t = time.perf_counter()
+            log.close()
+            drain = time.perf_counter() - t
+            print(f"{label:<22} {elapsed / events * 1e6:>7.2f} us per event on the game thread "
+                  f"({events} events, {drain * 1000:.0f} ms left to write at close)")
+
+        directory = os.path.join(root, "ReplayLog")
+        size = sum(os.path.getsize(os.path.join(directory, n)) for n in os.listdir(directory))
+        t = time.perf_counter()
+        reader = ReplayReader(directory)
+        opened = time.perf_counter() - t
+        print(f"{size / 1e6:.1f} MB in {len(reader.segments)} segments, {len(reader)} matches, "
+              f"{size / events:.1f} bytes per event, indexed in {opened * 1000:.0f} ms")
+
+        ids = reader.matches()
+        targets = [(m, random.randrange(reader.records(m))) for m in random.choices(ids, k=args.seeks)]
+        t = time.perf_counter()
+        for match_id, n in targets:
+            reader.event(match_id, n)
+        seek = (time.perf_counter() - t) / len(targets)
+        t = time.perf_counter()
+        for match_id, n in targets[:5]:
+            assert scan_for(directory, match_id, n) is not None
+        scan = (time.perf_counter() - t) / 5
+        print(f"random seek to a match and move: {seek * 1e6:.2f} us indexed, {scan * 1000:.1f} ms scanning")
+        reader.close()
+    finally:
+        shutil.rmtree(root)
@@ -0,0 +1,117 @@
+"""Room registry contention: one global lock vs server.rooms.RoomRegistry.
+
+Each thread runs CREATE -> JOIN -> a few in-room steps -> close on rooms of
+its own, the way the thread engine's connection threads do. ``--hold-us``
+makes every in-room step hold its lock that long while blocking (as a send
+to a slow client used to): under the old global lock that stalls every
+room, with per-room locks only the room itself.
+
+    python -m benchmarks.rooms --threads 1 2 4 8 --hold-us 200
+"""
+import argparse
+import random
+import string
+import time
+from threading import Barrier, Lock, Thread
+
+from server.rooms import RoomRegistry
+
+
+class Room:
+    def __init__(self):
+        self.players = []
+        self.lock = Lock()
+        self._id = ""
+
+
+def new_id():
+    return "".join(random.choice(string.ascii_lowercase) for _ in range(6))
+
+
+class GlobalLockRegistry:
+    """server/network.py before RoomRegistry: a dict and one module-wide lock."""
+
+    def __init__(self):
+        self.rooms = {}
+        self.lock = Lock()
+
+    def create(self, room, new_id):
+        with self.lock:
+            room_id = new_id()
+            while room_id in self.rooms:
+                room_id = new_id()
+            room._id = room_id
+            self.rooms[room_id] = room
+            return room_id
+
+    def join(self, room_id, player):
+        with self.lock:
+            room = self.rooms.get(room_id)
+            if room is None:
+                return "INVALID"
+            if len(room.players) >= 2:
+                return "TAKEN"
+            room.players.append(player)
+            return room
+
+    def remove(self, room):
+        with self.lock:
+            if self.rooms.get(room._id) is room:
+                del self.rooms[room._id]
+
+
+def room_lock(registry, room):
+    if isinstance(registry, GlobalLockRegistry):
+        return registry.lock
+    return room.lock
+
+
+def worker(registry, barrier, deadline, steps, hold, counts, index):
+    barrier.wait()
+    done = 0
+    while time.perf_counter() < deadline:
+        room = Room()
+        room.players.append("host")
+        room_id = registry.create(room, new_id)
+        assert registry.join(room_id, "guest") is room
+        for _ in range(steps):
+            with room_lock(registry, room):
+                if hold:
+                    time.sleep(hold)
+        registry.remove(room)
+        done += 1
+    counts[index] = done
+
+
+def run(registry, threads, seconds, steps, hold):
+    counts = [0] * threads
+    barrier = Barrier(threads + 1)
+    deadline = time.perf_counter() + seconds + 0.05
+    pool = [
+        Thread(target=worker, args=(registry, barrier, deadline, steps, hold, counts, i))
+        for i in range(threads)
+    ]
+    for t in pool:
+        t.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for t in pool:
+        t.join()
+    return sum(counts) / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.rooms")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--seconds", type=float, default=1.0)
+    parser.add_argument("--steps", type=int, default=4, help="locked in-room steps per room")
+    parser.add_argument("--hold-us", type=float, default=0, help="blocking time inside each step")
+    args = parser.parse_args()
+
+    hold = args.hold_us / 1e6
+    print(f"rooms/s (CREATE + JOIN + {args.steps} steps + close), hold {args.hold_us:g} us")
+    print(f"{'threads':>7} {'global lock':>12} {'registry':>12} {'speedup':>8}")
+    for threads in args.threads:
+        old = run(GlobalLockRegistry(), threads, args.seconds, args.steps, hold)
+        new = run(RoomRegistry(), threads, args.seconds, args.steps, hold)
+        print(f"{threads:>7} {old:>12.0f} {new:>12.0f} {new / old:>7.2f}x")
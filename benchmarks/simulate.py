@@ -0,0 +1,172 @@
+"""Headless bot-vs-bot games for measuring AI strength and speed.
+
+    python -m benchmarks.simulate --games 100000 --a hard --b normal
+
+Games are split into chunks and played across a process pool. The first bot
+to sink the other fleet wins, and the loser keeps shooting until it sinks its
+target too, so the shots-to-sink figures cover every game and not just the
+ones a strategy won. The report shows win rates, the shots-to-sink
+distribution per strategy, games/sec and per-move latency percentiles.
+--max-mean-shots and --max-p99-us turn the run into a regression check: the
+exit status is 1 when strategy A misses either limit.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from client.misc.ai import Bot, create_ship_grid  # noqa: E402
+from common.placement import SHIPS  # noqa: E402
+
+FLEET_CELLS = sum(SHIPS.values())
+# Move latency histogram: 1 us buckets, the last one collects everything slower
+LATENCY_BUCKETS = 5000
+
+
+class Tally:
+    """Results of a batch of games for one strategy (mergeable across processes)."""
+
+    def __init__(self):
+        self.wins = 0
+        # Shots needed to sink the whole fleet, won and lost games alike
+        self.shots_to_sink = Counter()
+        self.latency = [0] * (LATENCY_BUCKETS + 1)
+        self.moves = 0
+
+    def merge(self, other):
+        self.wins += other.wins
+        self.shots_to_sink.update(other.shots_to_sink)
+        self.latency = [a + b for a, b in zip(self.latency, other.latency)]
+        self.moves += other.moves
+
+    def percentile(self, q):
+        rank = q * self.moves
+        seen = 0
+        for us, count in enumerate(self.latency):
+            seen += count
+            if seen >= rank and count:
+                return us
+        return LATENCY_BUCKETS
+
+
+def play(levels, tallies):
+    bots = [Bot(create_ship_grid(), level=level) for level in levels]
+    hits = [0, 0]
+    turn = random.randrange(2)
+    shots = [0, 0]
+    winner = None
+    while True:
+        target = bots[1 - turn].grid
+        start = time.perf_counter_ns()
+        x, y = bots[turn].choose_move(target)
+        elapsed = (time.perf_counter_ns() - start) // 1000
+        tally = tallies[turn]
+        tally.latency[min(elapsed, LATENCY_BUCKETS)] += 1
+        tally.moves += 1
+        square = target[x][y]
+        if square["aimed"]:
+            raise RuntimeError(f"{levels[turn]} bot shot ({x}, {y}) twice")
+        square["aimed"] = True
+        shots[turn] += 1
+        if square["ship"]:
+            hits[turn] += 1
+            if hits[turn] == FLEET_CELLS:
+                tally.shots_to_sink[shots[turn]] += 1
+                if winner is not None:
+                    return
+                winner = turn
+                tally.wins += 1
+        # After the win only the loser shoots
+        if winner is None or turn == winner:
+            turn = 1 - turn
+
+
+def play_chunk(levels, games, seed):
+    random.seed(seed)
+    tallies = [Tally(), Tally()]
+    for _ in range(games):
+        play(levels, tallies)
+    return tallies
+
+
+def describe(counter):
+    values = sorted(counter.elements())
+    if not values:
+        return "no games"
+    cut = lambda q: values[min(len(values) - 1, int(q * len(values)))]
+    return (
+        f"mean {statistics.fmean(values):.2f}  min {values[0]}  p10 {cut(0.1)}  "
+        f"median {cut(0.5)}  p90 {cut(0.9)}  max {values[-1]}"
+    )
+
+
+def histogram(counter, width=40, step=5):
+    buckets = Counter()
+    for shots, n in counter.items():
+        buckets[shots // step * step] += n
+    top = max(buckets.values(), default=1)
+    for start in sorted(buckets):
+        bar = "#" * max(1, round(buckets[start] / top * width))
+        print(f"    {start:>3}-{start + step - 1:<3} {bar} {buckets[start]}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.simulate")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--a", default="hard", choices=Bot.LEVELS, help="strategy A")
+    parser.add_argument("--b", default="normal", choices=Bot.LEVELS, help="strategy B")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk", type=int, default=500, help="games per task")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--histogram", action="store_true", help="print shots-to-sink histograms")
+    parser.add_argument("--max-mean-shots", type=float, help="fail if A needs more shots on average")
+    parser.add_argument("--max-p99-us", type=float, help="fail if A's p99 move latency is higher")
+    args = parser.parse_args(argv)
+
+    levels = (args.a, args.b)
+    chunks = [min(args.chunk, args.games - i) for i in range(0, args.games, args.chunk)]
+    totals = [Tally(), Tally()]
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        futures = [
+            executor.submit(play_chunk, levels, n, args.seed * 1_000_003 + i)
+            for i, n in enumerate(chunks)
+        ]
+        for future in futures:
+            for total, tally in zip(totals, future.result()):
+                total.merge(tally)
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.games} games of {args.a} (A) vs {args.b} (B) on {args.workers} workers")
+    print(f"{elapsed:.1f} s, {args.games / elapsed:.0f} games/s")
+    for name, level, tally in zip("AB", levels, totals):
+        print(f"{name} {level}: win rate {tally.wins / args.games:.1%}")
+        print(f"  shots to sink the fleet: {describe(tally.shots_to_sink)}")
+        print(
+            f"  move latency: p50 {tally.percentile(0.5)} us  p90 {tally.percentile(0.9)} us  "
+            f"p99 {tally.percentile(0.99)} us  p99.9 {tally.percentile(0.999)} us  ({tally.moves} moves)"
+        )
+        if args.histogram:
+            histogram(tally.shots_to_sink)
+
+    a = totals[0]
+    failed = False
+    if args.max_mean_shots is not None and a.shots_to_sink:
+        mean = statistics.fmean(a.shots_to_sink.elements())
+        if mean > args.max_mean_shots:
+            print(f"FAIL: A needs {mean:.2f} shots on average (limit {args.max_mean_shots})")
+            failed = True
+    if args.max_p99_us is not None and a.percentile(0.99) > args.max_p99_us:
+        print(f"FAIL: A p99 move latency {a.percentile(0.99)} us (limit {args.max_p99_us})")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""Spectator fan-out: a send per spectator vs Room.broadcast.
+
+Two players trade shots in one room watched by --spectators connections.
+Every connection is a real Outbox over a socket that takes everything, so
+the numbers cover encoding, queueing and the per-connection write path.
+The old way would call ``conn.send(message)`` for each spectator, encoding
+the same message every time; ``Room.broadcast`` encodes it once per codec
+and queues the same bytes everywhere. CPU time per shot is process time.
+
+    python -m benchmarks.spectate --spectators 0 10 100 1000
+"""
+import argparse
+import random
+import time
+
+from server.network import Network, Room, ServerPlayer
+from server.outbox import batched
+
+
+class NullSocket:
+    """Takes every write whole, like a socket with an empty send buffer."""
+
+    def sendmsg(self, buffers, ancdata=(), flags=0):
+        return sum(len(b) for b in buffers)
+
+    def close(self):
+        pass
+
+
+class SendPerSpectator(Room):
+    def broadcast(self, message):
+        for conn in self.spectators:
+            conn.send(message)
+
+
+def connection(binary):
+    conn = Network(sock=NullSocket(), is_server=False)
+    conn.binary = binary
+    return conn
+
+
+def run(room_class, spectators, shots, binary_share):
+    room = room_class()
+    room._id = "abcdef"
+    room.players = [ServerPlayer(connection(True)), ServerPlayer(connection(True))]
+    for i, player in enumerate(room.players):
+        player.name = f"player{i}"
+    for i in range(spectators):
+        room.spectators[connection(i < spectators * binary_share)] = None
+    room.send_board()
+    cells = []
+    fired = 0
+    start = time.process_time()
+    while fired < shots:
+        if not cells or room.game_over:
+            room.send_board()
+            cells = [random.sample(range(100), 100) for _ in room.players]
+        shooter = room.players[0] if room.players[0].turn else room.players[1]
+        cell = cells[room.players.index(shooter)].pop()
+        # The server handles every message inside a batch
+        with batched():
+            room.fire(shooter, divmod(cell, 10))
+        fired += 1
+    return (time.process_time() - start) / shots
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.spectate")
+    parser.add_argument("--spectators", type=int, nargs="+", default=[0, 10, 100, 1000])
+    parser.add_argument("--shots", type=int, default=2000)
+    parser.add_argument("--binary-share", type=float, default=0.5, help="spectators using the bin1 codec")
+    args = parser.parse_args()
+
+    # The first run pays for warming up the layout pool
+    run(Room, 0, args.shots, args.binary_share)
+    base = run(Room, 0, args.shots, args.binary_share)
+    print(f"CPU us per shot, no spectators: {base * 1e6:.1f}")
+    print(f"{'spectators':>10} {'send each':>10} {'broadcast':>10} {'speedup':>8} {'us/spectator':>13}")
+    for spectators in args.spectators:
+        old = run(SendPerSpectator, spectators, args.shots, args.binary_share)
+        new = run(Room, spectators, args.shots, args.binary_share)
+        per = (new - base) / spectators * 1e6 if spectators else 0.0
+        print(f"{spectators:>10} {old * 1e6:>10.1f} {new * 1e6:>10.1f} {old / new:>7.2f}x {per:>13.2f}")
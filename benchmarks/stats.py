@@ -0,0 +1,125 @@
+"""Player stats writes: a transaction per match vs StatsStore group commits.
+
+--threads room threads each finish matches between --players random names
+as fast as they can for --seconds. The per-match baseline commits every
+result on the room's own thread (one shared connection behind a lock, WAL
+mode like the store); StatsStore only queues it. Reported: results saved
+per second, the time a room thread spends per result, and the cost of a
+LEADERBOARD read from the store's memory vs running the top-N query.
+
+    python -m benchmarks.stats --threads 1 4 16
+"""
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+from threading import Barrier, Lock, Thread
+
+from server.stats import SCHEMA, TOP, UPSERT, StatsStore
+
+
+class PerMatchStore:
+    """One transaction per finished match, on the calling thread."""
+
+    def __init__(self, path, top=10):
+        self.top = top
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+        self.lock = Lock()
+
+    def record(self, results):
+        now = time.time()
+        rows = [(name, 1, int(won), int(not won), int(s), shots, hits, now) for name, won, s, shots, hits in results]
+        with self.lock, self.db:
+            self.db.executemany(UPSERT, rows)
+
+    def leaderboard(self):
+        with self.lock:
+            return self.db.execute(TOP, (self.top,)).fetchall()
+
+    def close(self):
+        self.db.close()
+
+
+def result(players):
+    a, b = random.sample(players, 2)
+    shots = random.randint(17, 100)
+    return [(a, True, False, shots, 17), (b, False, random.random() < 0.1, shots - 1, random.randint(0, 16))]
+
+
+def worker(store, players, barrier, deadline, counts, spent, index):
+    barrier.wait()
+    done = 0
+    busy = 0.0
+    while time.perf_counter() < deadline:
+        results = result(players)
+        t = time.perf_counter()
+        store.record(results)
+        busy += time.perf_counter() - t
+        done += 1
+    counts[index] = done
+    spent[index] = busy
+
+
+def run(store, path, threads, seconds, players):
+    counts = [0] * threads
+    spent = [0.0] * threads
+    barrier = Barrier(threads + 1)
+    deadline = time.perf_counter() + seconds + 0.05
+    pool = [
+        Thread(target=worker, args=(store, players, barrier, deadline, counts, spent, i))
+        for i in range(threads)
+    ]
+    for t in pool:
+        t.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for t in pool:
+        t.join()
+    store.close()
+    # Until everything queued is committed; only what reached the file counts
+    elapsed = time.perf_counter() - start
+    with sqlite3.connect(path) as db:
+        saved = db.execute("SELECT SUM(games) FROM players").fetchone()[0] // 2
+    return saved / elapsed, sum(spent) / max(sum(counts), 1)
+
+
+def timed(fn, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.stats")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--seconds", type=float, default=2.0)
+    parser.add_argument("--players", type=int, default=100000)
+    args = parser.parse_args()
+
+    players = [f"player{i}" for i in range(args.players)]
+    root = tempfile.mkdtemp(prefix="stats-bench-")
+    try:
+        print(f"{'threads':>7} {'per match/s':>12} {'us/result':>10} {'grouped/s':>10} {'us/result':>10}")
+        for threads in args.threads:
+            path = os.path.join(root, f"old{threads}.db")
+            old = run(PerMatchStore(path), path, threads, args.seconds, players)
+            path = os.path.join(root, f"new{threads}.db")
+            new = run(StatsStore(path), path, threads, args.seconds, players)
+            print(f"{threads:>7} {old[0]:>12.0f} {old[1] * 1e6:>10.1f} {new[0]:>10.0f} {new[1] * 1e6:>10.2f}")
+
+        path = os.path.join(root, f"new{args.threads[-1]}.db")
+        memory = StatsStore(path)
+        query = PerMatchStore(path)
+        print(f"LEADERBOARD read: {timed(memory.leaderboard, 100000) * 1e6:.3f} us from memory, "
+              f"{timed(query.leaderboard, 2000) * 1e6:.1f} us querying SQLite")
+        memory.close()
+        query.close()
+    finally:
+        shutil.rmtree(root)
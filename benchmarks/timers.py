@@ -0,0 +1,127 @@
+"""Pending timeouts: a thread per timer, a binary heap, and TimingWheel.
+
+--pending timeouts are scheduled 1 to --horizon seconds ahead (heartbeats,
+shot clocks, RESUME grace periods), --cancel of them are cancelled again
+like a clock stopped by a shot, and then the clock is run forward to the
+horizon tick by tick. The heap is what ``loop.call_later`` and ``sched``
+use: O(log n) to push and to pop, cancelled entries popped like the rest.
+The wheel is server.timers.TimingWheel turned by hand. Reported: the cost
+to schedule and to cancel a timeout, and the cost of one 100 ms tick while
+that many timeouts are pending. ``threading.Timer`` is only tried up to
+--thread-limit timers; it starts a thread for each.
+
+    python -m benchmarks.timers --pending 1000 100000 1000000
+"""
+import argparse
+import heapq
+import random
+import threading
+import time
+
+from server.timers import TimingWheel
+
+TICK = 0.1
+
+
+class ManualWheel(TimingWheel):
+    """Turned with advance() instead of by its thread."""
+
+    def run(self):
+        pass
+
+
+class HeapTimers:
+    def __init__(self, clock):
+        self.clock = clock
+        self.heap = []
+        self.seq = 0
+
+    def schedule(self, delay, callback, *args):
+        entry = [self.clock() + delay, self.seq, callback, args]
+        self.seq += 1
+        heapq.heappush(self.heap, entry)
+        return entry
+
+    @staticmethod
+    def cancel(entry):
+        entry[2] = None
+
+    def advance(self, now):
+        due = []
+        heap = self.heap
+        while heap and heap[0][0] <= now:
+            due.append(heapq.heappop(heap))
+        return due
+
+
+def noop():
+    pass
+
+
+def run(kind, pending, horizon, cancel):
+    now = [0.0]
+    clock = lambda: now[0]
+    delays = [random.uniform(1.0, horizon) for _ in range(pending)]
+    doomed = random.sample(range(pending), int(pending * cancel))
+    if kind == "wheel":
+        timers = ManualWheel(tick=TICK, clock=clock)
+        stop = lambda t: t.cancel()
+        advance = lambda: timers.advance(round(now[0] / TICK))
+    else:
+        timers = HeapTimers(clock)
+        stop = timers.cancel
+        advance = lambda: timers.advance(now[0])
+
+    start = time.perf_counter()
+    handles = [timers.schedule(delay, noop) for delay in delays]
+    scheduled = (time.perf_counter() - start) / pending
+
+    start = time.perf_counter()
+    for i in doomed:
+        stop(handles[i])
+    cancelled = (time.perf_counter() - start) / max(len(doomed), 1)
+
+    ticks = int(horizon / TICK) + 1
+    start = time.perf_counter()
+    for _ in range(ticks):
+        now[0] += TICK
+        advance()
+    ticked = (time.perf_counter() - start) / ticks
+    return scheduled, cancelled, ticked
+
+
+def run_threads(count, horizon):
+    # Only start and cancel: each Timer is a thread sleeping until it is due
+    start = time.perf_counter()
+    timers = [threading.Timer(random.uniform(1.0, horizon), noop) for _ in range(count)]
+    for t in timers:
+        t.daemon = True
+        t.start()
+    started = (time.perf_counter() - start) / count
+    threads = threading.active_count()
+    start = time.perf_counter()
+    for t in timers:
+        t.cancel()
+    for t in timers:
+        t.join()
+    cancelled = (time.perf_counter() - start) / count
+    return started, cancelled, threads
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.timers")
+    parser.add_argument("--pending", type=int, nargs="+", default=[1000, 100000, 1000000])
+    parser.add_argument("--horizon", type=float, default=60.0, help="latest timeout, seconds")
+    parser.add_argument("--cancel", type=float, default=0.9, help="share of timeouts cancelled")
+    parser.add_argument("--thread-limit", type=int, default=2000)
+    args = parser.parse_args()
+
+    count = min(args.thread_limit, args.pending[0])
+    started, cancelled, threads = run_threads(count, args.horizon)
+    print(f"threading.Timer x{count}: {started * 1e6:.1f} us to start, {cancelled * 1e6:.1f} us to cancel, "
+          f"{threads} threads running")
+    print(f"{'pending':>9} {'':>6} {'us/schedule':>12} {'us/cancel':>10} {'us/tick':>10}")
+    for pending in args.pending:
+        for kind in ("heap", "wheel"):
+            scheduled, cancelled, ticked = run(kind, pending, args.horizon, args.cancel)
+            print(f"{pending:>9} {kind:>6} {scheduled * 1e6:>12.2f} {cancelled * 1e6:>10.3f} {ticked * 1e6:>10.1f}")
@@ -1,9 +1,10 @@
-from threading import Thread
+import os
 
 import pygame
 
 from client.interface.game import Game
 from client.interface.menu import Menu, PlayerSetup
+from client.misc.assets import assets
 from client.misc.network import Network
 
 # AI support
@@ -15,17 +16,19 @@ class Main:
         pygame.init()
         self.screen = pygame.display.set_mode((1200, 700))
         pygame.display.set_caption("Battleship")
+        assets.preload(self.screen.get_size())
 
         self.running = True
         self.clock = pygame.time.Clock()
         self.menu = Menu(self.screen)
         self.player_setup = None
         self.game = None
-        self.thread_started = False
         self.player_data = None
 
     def run(self):
         while self.running:
+            if self.game:
+                self.game.poll_network()
             if self.menu.show_menu:
                 if (r := self.menu.run()) :
                     if r == "QUIT":
@@ -35,7 +38,8 @@ class Main:
                     if isinstance(r, dict) and r.get("category") == "SOLO":
                         # Create or convert to solo game
                         if not self.game or not getattr(self.game, "ai", None):
-                            bot = Bot()
+                            # BOT_LEVEL=hard picks the heat-map bot
+                            bot = Bot(level=os.getenv("BOT_LEVEL", "normal"))
                             self.game = Game(self.screen, None, ai=bot, player_grid=None)
                         else:
                             # Existing solo game already reset when leaving previous session
@@ -46,7 +50,7 @@ class Main:
                     # Online flow: go to player setup
                     self.player_setup = PlayerSetup(self.screen)
                     self.menu.show_menu = False
-                    self.player_data = r  # Store the menu action (CREATE or JOIN)
+                    self.player_data = r  # Store the menu action (CREATE, JOIN or QUEUE)
             elif self.player_setup:
                 if (setup_result := self.player_setup.run()):
                     if setup_result == "QUIT":
@@ -55,38 +59,13 @@ class Main:
                     # Player setup complete, proceed to game
                     self.player_data.update(setup_result)  # Merge name and avatar
                     if not self.game:
-                        self.game = Game(self.screen, Network())
+                        self.game = Game(self.screen, Network(), menu=self.menu)
                     # Set player name and avatar
                     self.game.player_name = setup_result.get("name", "")
                     self.game.player_avatar = setup_result.get("avatar", 0)
+                    # The reply (ID, BOARD, TAKEN or INVALID) is picked up by poll_network
                     self.game.n.send(self.player_data)
-                    if not self.thread_started:
-                        if self.player_data.get("category") == "CREATE":
-                            self.recv_thread = Thread(
-                                target=self.game.receiving_thread,
-                                kwargs={"menu": self.menu},
-                            )
-                        elif (d := self.game.n.receive()) != "INVALID":
-                            if d == "TAKEN":
-                                self.menu.game_taken = True
-                                self.menu.show_menu = True
-                                self.player_setup = None
-                                continue
-                            else:
-                                self.recv_thread = Thread(
-                                    target=self.game.receiving_thread,
-                                    args=(d, self.menu),
-                                )
-                        else:
-                            self.menu.invalid_code = True
-                            self.menu.show_menu = True
-                            self.player_setup = None
-                            continue
-                        self.recv_thread.daemon = True
-                        self.recv_thread.start()
-                        self.thread_started = True
-                    if not (self.menu.invalid_code or self.menu.game_taken):
-                        self.player_setup = None
+                    self.player_setup = None
             elif self.game.run() == "MENU":
                 self.menu.show_menu = True
                 self.menu.reset()
@@ -98,7 +77,11 @@ class Main:
                     self.running = False
                 elif self.game and not self.menu.show_menu and not self.player_setup:
                     self.game.handle_chat_input(event)
-            pygame.display.flip()
+            if self.game and self.game.dirty is not None and not self.menu.show_menu and not self.player_setup:
+                # The game screen only redrew the areas that changed
+                pygame.display.update(self.game.dirty)
+            else:
+                pygame.display.flip()
             self.clock.tick(30)
 
         return pygame.quit()
@@ -0,0 +1,84 @@
+"""Boards drawn from a tile atlas into one cached surface per board.
+
+Every state a square can be in (empty, ship, hit, miss, sunk, each with or
+without the hover highlight) is drawn once into ``TileAtlas``. ``BoardView``
+keeps the board's picture in its own surface and repaints a square only
+when its state changes, so a shot costs one tile blit and showing the board
+costs one blit of the whole surface.
+"""
+import pygame
+
+SIZE = 10
+
+
+class TileAtlas:
+    """Square images packed side by side in one surface, looked up by state.
+
+    ``render(surface, state)`` draws the tile for ``state`` at (0, 0) on a
+    transparent background, so a tile can be blitted over any backdrop.
+    """
+
+    def __init__(self, render, size=35, states=()):
+        self.render = render
+        self.size = size
+        self.surface = pygame.Surface((size * max(len(states), 1), size), pygame.SRCALPHA)
+        self._areas = {}
+        for state in states:
+            self.area(state)
+
+    def area(self, state):
+        found = self._areas.get(state)
+        if found is not None:
+            return found
+        n = len(self._areas)
+        if (n + 1) * self.size > self.surface.get_width():
+            grown = pygame.Surface((2 * (n + 1) * self.size, self.size), pygame.SRCALPHA)
+            grown.blit(self.surface, (0, 0), special_flags=pygame.BLEND_RGBA_MAX)
+            self.surface = grown
+        area = self._areas[state] = pygame.Rect(n * self.size, 0, self.size, self.size)
+        tile = self.surface.subsurface(area)
+        tile.fill((0, 0, 0, 0))
+        self.render(tile, state)
+        return area
+
+
+class BoardView:
+    """Cached picture of one 10x10 grid at a fixed place on the screen."""
+
+    def __init__(self, atlas, origin):
+        size = atlas.size
+        self.atlas = atlas
+        self.rect = pygame.Rect(origin, (SIZE * size, SIZE * size))
+        self.surface = pygame.Surface(self.rect.size)
+        self.base = None
+        # Bumped on every repaint, for use as a DirtyRenderer key
+        self.version = 0
+        self._states = [None] * (SIZE * SIZE)
+
+    def set_base(self, layer):
+        """Take what lies under the board from ``layer`` (a full-screen surface)."""
+        self.base = layer.subsurface(self.rect).copy()
+        self.surface.blit(self.base, (0, 0))
+        self._states = [None] * (SIZE * SIZE)
+
+    def update(self, states):
+        """Repaint the squares whose state changed; returns their screen rects.
+
+        ``states`` yields one state per square, column by column.
+        """
+        size = self.atlas.size
+        changed = []
+        for i, state in enumerate(states):
+            if self._states[i] != state:
+                self._states[i] = state
+                x, y = divmod(i, SIZE)
+                local = pygame.Rect(x * size, y * size, size, size)
+                self.surface.blit(self.base, local, local)
+                self.surface.blit(self.atlas.surface, local, self.atlas.area(state))
+                changed.append(local.move(self.rect.topleft))
+        if changed:
+            self.version += 1
+        return changed
+
+    def draw(self, screen):
+        screen.blit(self.surface, self.rect)
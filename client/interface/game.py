@@ -1,25 +1,50 @@
+import time
+from functools import partial
+from itertools import product
+
 import pygame
+from common.placement import ship_cells
+from client.interface.board import BoardView, TileAtlas
 from client.interface.player_opponent import *
+from client.misc.assets import AVATARS, assets
+from client.misc.render import DirtyRenderer
 from client.misc.colors import *
+from client.misc.network import Network
 
+# Seconds between attempts to take our seat back after the connection drops
+RESUME_RETRY = 2.0
 
 class Game:
-    def __init__(self, screen, network, ai=None, player_grid=None):
+    def __init__(self, screen, network, ai=None, player_grid=None, menu=None):
         self.screen = screen
+        # Shows TAKEN/INVALID replies to CREATE/JOIN
+        self.menu = menu
         self.game_over = False
         self.waiting = True
         self.opp_disconnected = False
         self.room_id = ""
         self.sent_over = False
-
-        # Load and prepare background image (use ocean background)
-        self.background = pygame.image.load("client/assets/bg_ocean.jpg").convert()
-        screen_width, screen_height = self.screen.get_size()
-        self.background = pygame.transform.scale(self.background, (screen_width, screen_height))
+        # Token from SESSION, to take our seat back with RESUME if the connection drops
+        self.session = None
+        self.reconnecting = False
+        self.resume_at = 0.0
+        self.opponent_away = False
 
         self.player = Player()
         self.opponent = Opponent()
         self.n = network
+        self.renderer = DirtyRenderer(self.screen)
+        self.dirty = None
+        # Every look a square can have, drawn once; boards are cached surfaces
+        self.player_tiles = TileAtlas(
+            self.player.draw_tile,
+            states=[(s, a, h, BLACK, 1) for s, a, h in product((False, True), repeat=3)],
+        )
+        self.opponent_tiles = TileAtlas(
+            self.opponent.draw_tile,
+            states=list(product((None, WHITE, RED), (False, True), (False, True))),
+        )
+        self.board_views = {}
         
         # Layout cache for dynamic positioning (must be initialized before update_board_positions)
         self.layout_cache = {}
@@ -32,7 +57,7 @@ class Game:
 
         self.sent = set()
         self.final_text = ""
-        self.big_font = pygame.font.Font("client/assets/retrofont.ttf", 34)
+        self.big_font = assets.font(34)
         # Compute top UI button positions based on screen size
         sw, sh = self.screen.get_size()
         self.menu_button = pygame.Rect(10, 10, 160, 35)
@@ -53,7 +78,7 @@ class Game:
         self.chat_input = ""
         self.chat_active = False
         self.chat_visible = False
-        self.small_font = pygame.font.Font("client/assets/retrofont.ttf", 12)
+        self.small_font = assets.font(12)
         # chat_toggle_button already positioned relative to menu in initializer
         self.chat_box = pygame.Rect(10, 30, 430, 100)
         self.chat_input_box = pygame.Rect(15, 135, 350, 20)
@@ -64,12 +89,7 @@ class Game:
         self.player_avatar = 0
         self.opponent_name = ""
         self.opponent_avatar = 0
-        self.avatars = [
-            pygame.image.load("client/assets/avatar1.jpg"),
-            pygame.image.load("client/assets/avatar2.jpg"),
-            pygame.image.load("client/assets/avatar3.jpg"),
-            pygame.image.load("client/assets/avatar4.jpg"),
-        ]
+        self.avatars = list(AVATARS)
         # Calculate and store board positions (layout_cache already initialized above)
         self.update_board_positions()
 
@@ -111,6 +131,8 @@ class Game:
         """(Re)initialize boards for solo (AI) play."""
         if not self.ai:
             return
+        self.ai.reset()
+        self.renderer.invalidate()
         self.update_board_positions()
         grid_size = 35
         grid_cells = 10
@@ -148,6 +170,9 @@ class Game:
                 sy=player_board_y,
                 ey=player_board_y + (grid_cells * grid_size),
             )
+        self.player.fleet.reset(self.player.grid)
+        self.opponent.fleet.reset(self.opponent.grid)
+        self.opponent.sunk_banner = None
         # Activate play state
         self.waiting = False
         self.player.is_turn = True
@@ -176,8 +201,8 @@ class Game:
         player_index = max(0, min(len(self.avatars) - 1, self.player_avatar))
         opponent_index = max(0, min(len(self.avatars) - 1, self.opponent_avatar))
         
-        player_avatar = pygame.transform.scale(self.avatars[player_index], avatar_size)
-        opponent_avatar = pygame.transform.scale(self.avatars[opponent_index], avatar_size)
+        player_avatar = assets.scaled(self.avatars[player_index], avatar_size)
+        opponent_avatar = assets.scaled(self.avatars[opponent_index], avatar_size)
         
         # Draw circular background for avatars
         avatar_border_radius = 28
@@ -195,191 +220,364 @@ class Game:
         self.screen.blit(opponent_avatar, opponent_avatar_pos)
         
         # Names
-        name_font = pygame.font.Font("client/assets/retrofont.ttf", 16)
+        name_font = assets.font(16)
         player_label = name_font.render(self.player_name or "You", True, WHITE)
         opponent_label = name_font.render(self.opponent_name or "Opponent", True, WHITE)
         
         self.screen.blit(player_label, (player_panel.x + 80, player_panel.y + 25))
         self.screen.blit(opponent_label, (opponent_panel.x + 80, opponent_panel.y + 25))
-        
-        # Turn indicator
-        turn_font = pygame.font.Font("client/assets/retrofont.ttf", 12)
-        if hasattr(self, 'player') and self.player.is_turn:
-            turn_text = turn_font.render("Your Turn", True, GREEN)
-            self.screen.blit(turn_text, (player_panel.x + 80, player_panel.y + 50))
+        # The turn indicator below the player's name is drawn by render()
+
+    def mark_shot(self, x, y, hit, ship_name=None):
+        self.opponent.grid[x][y][perma_color] = RED if hit else WHITE
+        if hit:
+            # Online the ship is only named once it sinks (see RESULT)
+            self.opponent.fleet.hit((x, y), ship_name)
+            self.opponent.explosion_sound.play()
         else:
-            turn_text = turn_font.render("Waiting...", True, (150, 150, 150))
-            self.screen.blit(turn_text, (player_panel.x + 80, player_panel.y + 50))
+            self.opponent.miss_sound.play()
 
     @staticmethod
     def check_game_over(grid):
         return all(sq[aimed] for x in grid for sq in x if sq[ship])
 
-    def receiving_thread(self, board=None, menu=None):
-        while 1:
-            if not board:
-                received = self.n.receive()
-            else:
-                received = board
-                board = None
-            if received:
-                if menu:
-                    if received == "TAKEN":
-                        menu.game_taken = True
-                        menu.show_menu = True
-                    elif received == "INVALID":
-                        menu.invalid_code = True
-                        menu.show_menu = True
-                if received == "END" and not menu.show_menu and not self.waiting:
-                    self.opp_disconnected = True
-                    break
-                if isinstance(received, dict):
-                    if received.get("category") == "GAME_OVER":
-                        payload = received.get("payload", {})
-                        by = payload.get("by")
-                        # If 'by' equals our player name, we won; otherwise we lost
-                        if by and by == self.player_name:
-                            self.final_text = "You Won!"
-                        else:
-                            # If reason is surrender and 'by' refers to opponent, we won
-                            self.final_text = "You Lost!"
-                        self.game_over = True
-                        # Ensure any active surrender confirmation popup is closed
-                        self.surrender_confirm = False
-                        # do NOT auto-send OVER; wait for player to return to menu
-                        continue
-                    elif received.get("category") == "REMATCH_STATUS":
-                        payload = received.get("payload", {})
-                        offers = payload.get("offers", [])
-                        # If opponent's name in offers, flag opponent_offered
-                        try:
-                            opp_name = self.opponent_name
-                            self.opponent_offered = any(o == opp_name for o in offers)
-                        except Exception:
-                            self.opponent_offered = False
-                        continue
-                    elif received.get("category") == "REMATCH_START":
-                        # Server indicates rematch is starting; wait for BOARD which will reset states
-                        self.waiting_rematch = True
-                        continue
-                    if received["category"] == "BOARD":
-                        received = received["payload"]
-                        self.waiting = False
-                        self.player.is_turn = received[0]
-                        
-                        # Recreate grids at correct positions
-                        self.update_board_positions()
-                        grid_size = 35
-                        grid_cells = 10
-                        
-                        player_board_x, player_board_y = self.layout_cache.get("player_board_pos", (210, 500))
-                        opponent_board_x, opponent_board_y = self.layout_cache.get("opponent_board_pos", (200, 100))
-                        
-                        from client.misc.utils import make_grid
-                        # Create new grids at correct positions
-                        new_player_grid = make_grid(
-                            player_board_x,
-                            player_board_x + (grid_cells * grid_size),
-                            player_board_y,
-                            player_board_y + (grid_cells * grid_size),
-                            BLACK
-                        )
-                        new_opponent_grid = make_grid(
-                            opponent_board_x,
-                            opponent_board_x + (grid_cells * grid_size),
-                            opponent_board_y,
-                            opponent_board_y + (grid_cells * grid_size),
-                            BLACK
-                        )
-                        
-                        # Copy ship data from received grids
-                        old_player_grid = received[1]
-                        for i in range(min(len(old_player_grid), len(new_player_grid))):
-                            for j in range(min(len(old_player_grid[i]), len(new_player_grid[i]))):
-                                if old_player_grid[i][j].get("ship"):
-                                    new_player_grid[i][j]["ship"] = old_player_grid[i][j]["ship"]
-                                if old_player_grid[i][j].get("aimed"):
-                                    new_player_grid[i][j]["aimed"] = old_player_grid[i][j]["aimed"]
-                                if old_player_grid[i][j].get("perma_color"):
-                                    new_player_grid[i][j]["perma_color"] = old_player_grid[i][j]["perma_color"]
-                        
-                        self.player.grid = new_player_grid
-                        
-                        for xi, yi, ship_ in received[2]:
-                            if xi < len(new_opponent_grid) and yi < len(new_opponent_grid[xi]):
-                                new_opponent_grid[xi][yi][ship] = ship_
-                        self.opponent.grid = new_opponent_grid
-                        
-                        if len(received) > 3:
-                            self.opponent_name = received[3]
-                            self.opponent_avatar = received[4]
-                        # Reset rematch and game state when a new board arrives
-                        self.rematch_offered = False
-                        self.waiting_rematch = False
-                        self.opponent_offered = False
-                        # Clear game-over flags so UI switches back to play
-                        self.game_over = False
-                        self.final_text = ""
-                        self.sent_over = False
-                    elif received["category"] == "ID":
-                        self.room_id = received["payload"]
-                    elif received["category"] == "POSITION":
-                        rx, ry = received["payload"]
-                        self.player.is_turn = True
-                        self.player.grid[rx][ry][aimed] = True
-                    elif received["category"] == "CHAT":
-                        self.chat_messages.append(f"{self.opponent_name}: {received['payload']}")
-                        if len(self.chat_messages) > 8:
-                            self.chat_messages.pop(0)
+    def poll_network(self):
+        """Apply the messages that arrived since the last frame, on the UI thread."""
+        if self.n:
+            for received in self.n.poll():
+                self.handle_message(received)
+            if self.n.error is not None and not self.game_over:
+                if self.session:
+                    self.resume()
+                elif self.menu:
+                    self.connection_failed()
+
+    def connection_failed(self):
+        # No seat to take back: show why on the menu and dial afresh next time
+        self.menu.connect_error = str(self.n.error)
+        self.menu.show_menu = True
+        self.reset()
+        self.n.close()
+        self.n = Network()
+
+    def resume(self):
+        # Dial again every RESUME_RETRY seconds and ask for our seat back
+        now = time.monotonic()
+        if now < self.resume_at:
+            return
+        self.resume_at = now + RESUME_RETRY
+        self.reconnecting = True
+        self.n.close()
+        self.n = Network()
+        self.n.send({"category": "RESUME", "payload": self.session})
+
+    def handle_message(self, received):
+        if not received:
+            return
+        if self.reconnecting and received == "INVALID":
+            # The seat was given up; the match is over
+            self.reconnecting = False
+            self.session = None
+            self.opp_disconnected = True
+            return
+        menu = self.menu
+        if menu:
+            if received == "TAKEN":
+                menu.game_taken = True
+                menu.show_menu = True
+            elif received == "INVALID":
+                menu.invalid_code = True
+                menu.show_menu = True
+        if received == "END" and not (menu and menu.show_menu) and not self.waiting:
+            self.opp_disconnected = True
+            return
+        if isinstance(received, dict):
+            if received.get("category") == "GAME_OVER":
+                payload = received.get("payload", {})
+                by = payload.get("by")
+                # If 'by' equals our player name, we won; otherwise we lost
+                if by and by == self.player_name:
+                    self.final_text = "You Won!"
+                else:
+                    # If reason is surrender and 'by' refers to opponent, we won
+                    self.final_text = "You Lost!"
+                self.game_over = True
+                # Ensure any active surrender confirmation popup is closed
+                self.surrender_confirm = False
+                # do NOT auto-send OVER; wait for player to return to menu
+                return
+            elif received.get("category") == "REMATCH_STATUS":
+                payload = received.get("payload", {})
+                offers = payload.get("offers", [])
+                # If opponent's name in offers, flag opponent_offered
+                try:
+                    opp_name = self.opponent_name
+                    self.opponent_offered = any(o == opp_name for o in offers)
+                except Exception:
+                    self.opponent_offered = False
+                return
+            elif received.get("category") == "REMATCH_START":
+                # Server indicates rematch is starting; wait for BOARD which will reset states
+                self.waiting_rematch = True
+                return
+            if received["category"] == "BOARD":
+                received = received["payload"]
+                self.waiting = False
+                self.player.is_turn = received[0]
+                new_player_grid, new_opponent_grid = self.new_grids()
+
+                # Copy ship data from received grids
+                old_player_grid = received[1]
+                for i in range(min(len(old_player_grid), len(new_player_grid))):
+                    for j in range(min(len(old_player_grid[i]), len(new_player_grid[i]))):
+                        if old_player_grid[i][j].get("ship"):
+                            new_player_grid[i][j]["ship"] = old_player_grid[i][j]["ship"]
+                        if old_player_grid[i][j].get("aimed"):
+                            new_player_grid[i][j]["aimed"] = old_player_grid[i][j]["aimed"]
+                        if old_player_grid[i][j].get("perma_color"):
+                            new_player_grid[i][j]["perma_color"] = old_player_grid[i][j]["perma_color"]
+
+                self.player.grid = new_player_grid
+                self.player.fleet.reset(new_player_grid)
+
+                for xi, yi, ship_ in received[2]:
+                    if xi < len(new_opponent_grid) and yi < len(new_opponent_grid[xi]):
+                        new_opponent_grid[xi][yi][ship] = ship_
+                self.opponent.grid = new_opponent_grid
+                self.opponent.fleet.reset()
+                self.opponent.sunk_banner = None
+
+                if len(received) > 3:
+                    self.opponent_name = received[3]
+                    self.opponent_avatar = received[4]
+                # Reset rematch and game state when a new board arrives
+                self.rematch_offered = False
+                self.waiting_rematch = False
+                self.opponent_offered = False
+                # Clear game-over flags so UI switches back to play
+                self.game_over = False
+                self.final_text = ""
+                self.sent_over = False
+            elif received["category"] == "ID":
+                self.room_id = received["payload"]
+            elif received["category"] == "SESSION":
+                self.session = received["payload"]
+            elif received["category"] == "RESUME":
+                self.apply_resume(received["payload"])
+            elif received["category"] == "OPPONENT_AWAY":
+                self.opponent_away = True
+            elif received["category"] == "OPPONENT_BACK":
+                self.opponent_away = False
+            elif received["category"] == "POSITION":
+                rx, ry = received["payload"]
+                self.player.is_turn = True
+                self.player.take_shot(rx, ry)
+            elif received["category"] == "RESULT":
+                # Outcome of our own shot; sunk ships come with their cells
+                result = received["payload"]
+                rx, ry = result["position"]
+                self.opponent.grid[rx][ry][aimed] = True
+                self.mark_shot(rx, ry, result["hit"])
+                for sx, sy in result["cells"]:
+                    self.opponent.grid[sx][sy][ship] = result["sunk"]
+                if result["sunk"]:
+                    self.opponent.fleet.sink(result["sunk"])
+            elif received["category"] == "CHAT":
+                self.chat_messages.append(f"{self.opponent_name}: {received['payload']}")
+                if len(self.chat_messages) > 8:
+                    self.chat_messages.pop(0)
+
+    def new_grids(self):
+        """Empty player and opponent grids at the current board positions."""
+        self.update_board_positions()
+        grid_size = 35
+        grid_cells = 10
+
+        player_board_x, player_board_y = self.layout_cache.get("player_board_pos", (210, 500))
+        opponent_board_x, opponent_board_y = self.layout_cache.get("opponent_board_pos", (200, 100))
+
+        from client.misc.utils import make_grid
+        player_grid = make_grid(
+            player_board_x,
+            player_board_x + (grid_cells * grid_size),
+            player_board_y,
+            player_board_y + (grid_cells * grid_size),
+            BLACK
+        )
+        opponent_grid = make_grid(
+            opponent_board_x,
+            opponent_board_x + (grid_cells * grid_size),
+            opponent_board_y,
+            opponent_board_y + (grid_cells * grid_size),
+            BLACK
+        )
+        return player_grid, opponent_grid
+
+    def apply_resume(self, state):
+        """Rebuild both boards from a RESUME snapshot; what we missed follows as
+        ordinary POSITION/CHAT/GAME_OVER messages. Cells are bits x * 10 + y."""
+        player_grid, opponent_grid = self.new_grids()
+        for name, cells in ship_cells(state["layout"]):
+            for x, y in cells:
+                player_grid[x][y][ship] = name
+        self.sent = set()
+        for i in range(100):
+            x, y = divmod(i, 10)
+            if state["received"] >> i & 1:
+                player_grid[x][y][aimed] = True
+            if state["fired"] >> i & 1:
+                opponent_grid[x][y][aimed] = True
+                opponent_grid[x][y][perma_color] = RED if state["hits"] >> i & 1 else WHITE
+                self.sent.add((x, y))
+        self.player.grid = player_grid
+        self.player.fleet.reset(player_grid)
+        self.opponent.grid = opponent_grid
+        self.opponent.fleet.reset()
+        for i in range(100):
+            if state["hits"] >> i & 1:
+                self.opponent.fleet.hit(divmod(i, 10), notify=False)
+        for name, cells in state["sunk"].items():
+            for x, y in cells:
+                opponent_grid[x][y][ship] = name
+            self.opponent.fleet.sink(name)
+        self.opponent.sunk_banner = None
+        self.player.is_turn = state["turn"]
+        self.opponent_name, self.opponent_avatar = state["opponent"]
+        self.room_id = state["room"]
+        self.waiting = False
+        self.reconnecting = False
+        self.renderer.invalidate()
 
     def render(self):
-        # Get screen dimensions
-        screen_width, screen_height = self.screen.get_size()
         # Mouse debounce: detect rising edge (pressed now, not pressed previously)
         pressed = pygame.mouse.get_pressed(3)[0]
         rising = pressed and not self._mouse_last_pressed
-        
-        # Scale background to fill the entire screen without changing aspect ratio
-        bg_width, bg_height = self.background.get_size()
-        screen_ratio = screen_width / screen_height
-        bg_ratio = bg_width / bg_height
-        
-        if screen_ratio > bg_ratio:
-            # Screen is wider than background (relative to height)
-            new_width = int(screen_height * bg_ratio)
-            new_height = screen_height
-            self.background = pygame.transform.scale(self.background, (new_width, new_height))
-            # Center the background horizontally
-            x_offset = (screen_width - new_width) // 2
-            self.screen.blit(self.background, (x_offset, 0))
-        else:
-            # Screen is taller than background (relative to width)
-            new_width = screen_width
-            new_height = int(screen_width / bg_ratio)
-            self.background = pygame.transform.scale(self.background, (new_width, new_height))
-            # Center the background vertically
-            y_offset = (screen_height - new_height) // 2
-            self.screen.blit(self.background, (0, y_offset))
-        
+        mouse = pygame.mouse.get_pos()
+
         # Update board positions (in case screen size changed)
         self.update_board_positions()
-        
-        # Get positions from cache
+        player_panel = self.layout_cache.get("player_panel")
+        rebuilt = self.renderer.set_static(
+            (
+                self.screen.get_size(),
+                self.player_name,
+                self.opponent_name,
+                self.player_avatar,
+                self.opponent_avatar,
+            ),
+            self.draw_static,
+        )
+
+        # Handle surrender click -> send immediately (no confirmation popup)
+        if (
+            self.surrender_button.collidepoint(*mouse)
+            and rising
+            and not self.waiting
+            and not self.game_over
+        ):
+            if self.ai:
+                # Local solo surrender: immediate loss
+                self.game_over = True
+                self.final_text = "You Lost!"
+            else:
+                # Network surrender
+                if self.n:
+                    try:
+                        self.n.send({"category": "SURRENDER"})
+                        self.sent_over = True
+                    except Exception:
+                        pass
+        target = Opponent.hovered_square(self.opponent.grid, mouse)
+        if target and pressed and self.player.is_turn:
+            ex, es = target
+            square = self.opponent.grid[ex][es]
+            self.opponent.grid[ex][es][aimed] = True
+            if (x := (ex, es)) not in self.sent:
+                self.sent.add(x)
+                # Solo mode: resolve locally and let AI take a move
+                if self.ai:
+                    self.mark_shot(ex, es, bool(square[ship]), square[ship])
+                    # process AI choice against player grid
+                    rx, ry = self.ai.choose_move(self.player.grid)
+                    self.player.take_shot(rx, ry)
+                    if self.player.grid[rx][ry][ship]:
+                        self.player.grid[rx][ry][perma_color] = RED
+                    else:
+                        self.player.grid[rx][ry][perma_color] = WHITE
+                    # player remains with turn after AI move
+                    self.player.is_turn = True
+                else:
+                    # The server resolves the shot and answers with RESULT
+                    self.player.is_turn = False
+                    if self.n:
+                        self.n.send({"category": "POSITION", "payload": x})
+
+        # Everything below is redrawn only where it changed since the last frame
+        add = self.renderer.add
+        hovered = Opponent.hovered_square(self.player.grid, mouse)
+        view = self.board_view("player", self.player_tiles, self.player.grid, rebuilt)
+        damage = view.update(self.player.tile_states(hovered))
+        add("player_board", view.rect, view.version, partial(view.draw, self.screen), damage)
+        view = self.board_view("opponent", self.opponent_tiles, self.opponent.grid, rebuilt)
+        damage = view.update(self.opponent.tile_states(target))
+        add("opponent_board", view.rect, view.version, partial(view.draw, self.screen), damage)
+        if (text := self.opponent.sunk_message()):
+            pos = (450 - len(text) * 10, 0)
+            add("sunk", (pos, font.size(text)), text, partial(self.draw_text, font, text, WHITE, pos))
+
+        turn_font = assets.font(12)
+        turn_pos = (player_panel.x + 80, player_panel.y + 50)
+        turn_text, turn_color = ("Your Turn", GREEN) if self.player.is_turn else ("Waiting...", (150, 150, 150))
+        add(
+            "turn_indicator",
+            (turn_pos, turn_font.size(turn_text)),
+            turn_text,
+            partial(self.draw_text, turn_font, turn_text, turn_color, turn_pos),
+        )
+        status_font = assets.font(14)
+        if self.opponent_away:
+            status = "Opponent reconnecting..."
+        else:
+            status = "Your turn" if self.player.is_turn else "Opponent's turn"
+        add(
+            "status",
+            ((0, 0), status_font.size(status)),
+            status,
+            partial(self.draw_text, status_font, status, WHITE, (0, 0)),
+        )
+        add("chat_toggle", self.chat_toggle_button, self.chat_visible, self.draw_chat_toggle)
+        if self.chat_visible:
+            add(
+                "chat",
+                self.chat_box.union(self.chat_input_box).union(self.send_button),
+                (tuple(self.chat_messages[-6:]), self.chat_input, self.chat_active),
+                self.draw_chat_box,
+            )
+        self.dirty = self.renderer.flush()
+        # Update last mouse state for debounce
+        self._mouse_last_pressed = pressed
+
+    def draw_static(self):
+        """Compose the layer that only changes with the screen size or the players."""
+        screen_width, screen_height = self.screen.get_size()
         player_panel = self.layout_cache.get("player_panel")
         opponent_panel = self.layout_cache.get("opponent_panel")
         player_board_x, player_board_y = self.layout_cache.get("player_board_pos", (210, 500))
         opponent_board_x, opponent_board_y = self.layout_cache.get("opponent_board_pos", (200, 100))
-        
+
+        # Background scaled to the screen
+        self.screen.blit(assets.scaled("bg_ocean.jpg", (screen_width, screen_height)), (0, 0))
+
         # Grid size calculations
         grid_size = 35
         grid_cells = 10
         grid_total_size = grid_cells * grid_size
-        
+
         # Create highlighted background panels for boards
         board_padding = 15
         board_bg_width = grid_total_size + (board_padding * 2)
         board_bg_height = grid_total_size + (board_padding * 2)
-        
+
         # Player board background (highlighted with blue theme)
         player_bg_rect = pygame.Rect(
             player_board_x - board_padding,
@@ -392,7 +590,7 @@ class Game:
         self.screen.blit(player_bg_surface, player_bg_rect.topleft)
         pygame.draw.rect(self.screen, (100, 150, 255), player_bg_rect, 3)  # Blue border
         pygame.draw.rect(self.screen, (150, 200, 255), player_bg_rect, 1)  # Light blue inner border
-        
+
         # Opponent board background (highlighted with red theme)
         opponent_bg_rect = pygame.Rect(
             opponent_board_x - board_padding,
@@ -405,81 +603,31 @@ class Game:
         self.screen.blit(opponent_bg_surface, opponent_bg_rect.topleft)
         pygame.draw.rect(self.screen, (255, 100, 100), opponent_bg_rect, 3)  # Red border
         pygame.draw.rect(self.screen, (255, 150, 150), opponent_bg_rect, 1)  # Light red inner border
-        
+
         # Draw avatar panels
         self.draw_avatar_panels(player_panel, opponent_panel)
 
         # Draw surrender button
         pygame.draw.rect(self.screen, (120, 20, 20), self.surrender_button)
         pygame.draw.rect(self.screen, WHITE, self.surrender_button, 2)
-        s_font = pygame.font.Font("client/assets/retrofont.ttf", 14)
+        s_font = assets.font(14)
         s_text = s_font.render("Surrender", True, WHITE)
         self.screen.blit(s_text, (self.surrender_button.x + (self.surrender_button.width - s_text.get_width()) // 2, self.surrender_button.y + 6))
-        # Handle surrender click -> send immediately (no confirmation popup)
-        if (
-            self.surrender_button.collidepoint(*pygame.mouse.get_pos())
-            and rising
-            and not self.waiting
-            and not self.game_over
-        ):
-            if self.ai:
-                # Local solo surrender: immediate loss
-                self.game_over = True
-                self.final_text = "You Lost!"
-            else:
-                # Network surrender
-                if self.n:
-                    try:
-                        self.n.send({"category": "SURRENDER"})
-                        self.sent_over = True
-                    except Exception:
-                        pass
-        self.player.draw_grid(self.screen)
-        for ex, sx in enumerate(self.opponent.grid):
-            for es, square in enumerate(sx):
-                if (
-                    Opponent.is_hovered(
-                        pygame.mouse.get_pos(), pygame.Rect(square[rect])
-                    )
-                    and pygame.mouse.get_pressed(3)[0]
-                    and self.player.is_turn
-                ):
-                    self.opponent.grid[ex][es][aimed] = True
-                    if (x := (ex, es)) not in self.sent:
-                        if square[ship]:
-                            self.opponent.grid[ex][es][perma_color] = RED
-                            while self.opponent.sound_counter < 1:
-                                self.opponent.explosion_sound.play()
-                                self.opponent.sound_counter += 1
-                            self.opponent.sound_counter = 0
-                        else:
-                            self.opponent.grid[ex][es][perma_color] = WHITE
-                            while self.opponent.sound_counter < 1:
-                                self.opponent.miss_sound.play()
-                                self.opponent.sound_counter += 1
-                            self.opponent.sound_counter = 0
-                        self.sent.add(x)
-                        # Solo mode: let AI take a move locally
-                        if self.ai:
-                            # process AI choice against player grid
-                            rx, ry = self.ai.choose_move(self.player.grid)
-                            self.player.grid[rx][ry][aimed] = True
-                            if self.player.grid[rx][ry][ship]:
-                                self.player.grid[rx][ry][perma_color] = RED
-                            else:
-                                self.player.grid[rx][ry][perma_color] = WHITE
-                            # player remains with turn after AI move
-                            self.player.is_turn = True
-                        else:
-                            self.player.is_turn = False
-                            if self.n:
-                                self.n.send({"category": "POSITION", "payload": x})
-        self.opponent.draw_grid(self.screen)
-        self.draw_chat()
-        # Update last mouse state for debounce
-        self._mouse_last_pressed = pressed
+        return self.screen.copy()
 
-    
+    def board_view(self, name, atlas, grid, rebuilt):
+        """The cached surface for a grid, made again if the grid moved."""
+        origin = grid.origin
+        view = self.board_views.get(name)
+        if view is None or view.rect.topleft != origin:
+            view = self.board_views[name] = BoardView(atlas, origin)
+            view.set_base(self.renderer.static)
+        elif rebuilt:
+            view.set_base(self.renderer.static)
+        return view
+
+    def draw_text(self, font, text, color, pos):
+        self.screen.blit(font.render(text, True, color), pos)
 
     def game_over_screen(self):
         if self.final_text == "You Lost!":
@@ -496,7 +644,7 @@ class Game:
         menu_surface.fill((50, 50, 80, 200))
         self.screen.blit(menu_surface, self.menu_button.topleft)
         pygame.draw.rect(self.screen, WHITE, self.menu_button, 2)
-        font = pygame.font.Font("client/assets/retrofont.ttf", 16)
+        font = assets.font(16)
         menu_text = font.render("Return To Menu", True, WHITE)
         self.screen.blit(menu_text, (self.menu_button.x + (self.menu_button.width - menu_text.get_width()) // 2, self.menu_button.y + (self.menu_button.height - menu_text.get_height()) // 2))
 
@@ -558,42 +706,48 @@ class Game:
         self._mouse_last_pressed = pressed
 
     def run(self):
+        # Screen areas to update after this frame; None means the whole window.
+        # Frames not drawn by render() make it repaint everything next time.
+        self.dirty = None
         if not self.waiting:
-            if self.check_game_over(self.opponent.grid):
-                self.game_over = True
-                self.final_text = "You Won!"
-            elif self.check_game_over(self.player.grid):
-                self.game_over = True
-                self.final_text = "You Lost!"
+            # Online games are decided by the server (GAME_OVER)
+            if self.ai:
+                if self.opponent.fleet.defeated:
+                    self.game_over = True
+                    self.final_text = "You Won!"
+                elif self.player.fleet.defeated:
+                    self.game_over = True
+                    self.final_text = "You Lost!"
             if not self.game_over:
-                self.screen.fill(BACKGROUND)
-                if self.opp_disconnected:
+                if self.opp_disconnected or self.reconnecting:
+                    self.renderer.invalidate()
+                    self.screen.fill(BACKGROUND)
                     screen_width, screen_height = self.screen.get_size()
-                    txt = self.big_font.render("Opponent Has Left", True, RED)
+                    if self.reconnecting:
+                        txt = self.big_font.render("Reconnecting...", True, GREEN)
+                    else:
+                        txt = self.big_font.render("Opponent Has Left", True, RED)
                     center_x = screen_width // 2
                     center_y = screen_height // 2
                     self.screen.blit(
                         txt, (center_x - txt.get_width() // 2, center_y - txt.get_height() // 2)
                     )
+                    self.draw_chat()
                 else:
+                    # Redraws only what changed and sets self.dirty
                     self.render()
-                    font = pygame.font.Font("client/assets/retrofont.ttf", 14)
-                    if self.player.is_turn:
-                        text = font.render("Your turn", True, WHITE)
-                    else:
-                        text = font.render("Opponent's turn", True, WHITE)
-                    self.screen.blit(text, (0, 0))
-                self.draw_chat()
+                    return
             else:
                 # Keep showing the game over screen; do not auto-send OVER or return to menu.
+                self.renderer.invalidate()
                 return self.game_over_screen()
         else:
+            self.renderer.invalidate()
             # Show background image behind waiting text
             screen_width, screen_height = self.screen.get_size()
-            self.background = pygame.transform.scale(self.background, (screen_width, screen_height))
-            self.screen.blit(self.background, (0, 0))
+            self.screen.blit(assets.scaled("bg_ocean.jpg", (screen_width, screen_height)), (0, 0))
             txt = self.big_font.render("Waiting For Player", True, GREEN)
-            font = pygame.font.Font("client/assets/retrofont.ttf", 24)
+            font = assets.font(24)
             roomid_text = font.render(self.room_id, True, GREEN)
             center_x = screen_width // 2
             center_y = screen_height // 2
@@ -611,7 +765,7 @@ class Game:
             # Draw menu button
             pygame.draw.rect(self.screen, BACKGROUND, self.menu_button)
             pygame.draw.rect(self.screen, BLACK, self.menu_button, 2)
-            menu_font = pygame.font.Font("client/assets/retrofont.ttf", 14)
+            menu_font = assets.font(14)
             menu_text = menu_font.render("Return To Menu", True, BLUE)
             self.screen.blit(menu_text, (self.menu_button.x + (self.menu_button.width - menu_text.get_width()) // 2, self.menu_button.y + (self.menu_button.height - menu_text.get_height()) // 2))
             
@@ -623,15 +777,17 @@ class Game:
                 return "MENU"
 
     def draw_chat(self):
-        # Chat toggle button
+        self.draw_chat_toggle()
+        if self.chat_visible:
+            self.draw_chat_box()
+
+    def draw_chat_toggle(self):
         pygame.draw.rect(self.screen, (0, 0, 100) if self.chat_visible else (100, 100, 100), self.chat_toggle_button)
         pygame.draw.rect(self.screen, WHITE, self.chat_toggle_button, 2)
         toggle_text = self.small_font.render("Chat", True, WHITE)
         self.screen.blit(toggle_text, (self.chat_toggle_button.x + 30, self.chat_toggle_button.y + 8))
-        
-        if not self.chat_visible:
-            return
-            
+
+    def draw_chat_box(self):
         # Chat box background
         pygame.draw.rect(self.screen, (50, 50, 50), self.chat_box)
         pygame.draw.rect(self.screen, WHITE, self.chat_box, 2)
@@ -690,11 +846,15 @@ class Game:
                     self.chat_active = False
 
     def reset(self):
+        self.renderer.invalidate()
         self.game_over = False
         self.waiting = True
         self.opp_disconnected = False
         self.room_id = ""
         self.sent_over = False
+        self.session = None
+        self.reconnecting = False
+        self.opponent_away = False
         self.player = Player()
         self.opponent = Opponent()
         self.sent = set()
@@ -1,21 +1,17 @@
 import pygame
 import random
+from client.misc.assets import AVATARS, assets
 from client.misc.colors import *
 
 
 class PlayerSetup:
     def __init__(self, screen):
         self.screen = screen
-        self.font = pygame.font.Font("client/assets/retrofont.ttf", 36)
-        self.small_font = pygame.font.Font("client/assets/retrofont.ttf", 25)
+        self.font = assets.font(36)
+        self.small_font = assets.font(25)
         self.name = ""
         self.selected_avatar = 0
-        self.avatars = [
-            pygame.image.load("client/assets/avatar1.jpg"),
-            pygame.image.load("client/assets/avatar2.jpg"),
-            pygame.image.load("client/assets/avatar3.jpg"),
-            pygame.image.load("client/assets/avatar4.jpg"),
-        ]
+        self.avatars = list(AVATARS)
         # Initialize with screen dimensions for centering
         screen_width, screen_height = screen.get_size()
         center_x = screen_width // 2
@@ -41,10 +37,7 @@ class PlayerSetup:
         self.cursor_timer = 0
 
     def run(self):
-        bg = pygame.image.load("client/assets/bg_ocean.jpg").convert()
-        screen_width, screen_height = self.screen.get_size()
-        bg = pygame.transform.scale(bg, (screen_width, screen_height))
-        self.screen.blit(bg, (0, 0))
+        self.screen.blit(assets.scaled("bg_ocean.jpg", self.screen.get_size()), (0, 0))
 
         screen_width, screen_height = self.screen.get_size()
         center_x = screen_width // 2
@@ -72,7 +65,7 @@ class PlayerSetup:
             color = HOVER if i == self.selected_avatar else BACKGROUND
             pygame.draw.rect(self.screen, color, button)
             pygame.draw.rect(self.screen, BLACK, button, 2)
-            avatar_scaled = pygame.transform.scale(avatar, (70, 70))
+            avatar_scaled = assets.scaled(avatar, (70, 70))
             self.screen.blit(avatar_scaled, (button.x + 5, button.y + 5))
 
         # Confirm button
@@ -123,11 +116,10 @@ class Particle:
 
 class Ship:
     def __init__(self):
-        self.image = pygame.image.load("client/assets/ship.png")
         self.dir = "<"
         if random.choice((True, False)) == True:
-            self.image = pygame.transform.flip(self.image, True, False)
             self.dir = ">"
+        self.image = assets.image("ship.png", flip_x=self.dir == ">")
         self.x = 450 if self.dir == "<" else -self.image.get_width()
         self.y = random.choice((random.randint(250, 320), random.randint(510, 650)))
         self.visible = True
@@ -141,22 +133,21 @@ class Ship:
 
 class Menu:
     def __init__(self, screen):
-        self.font = pygame.font.Font("client/assets/retrofont.ttf", 36)
-        self.small_font = pygame.font.Font("client/assets/retrofont.ttf", 25)
+        self.font = assets.font(36)
+        self.small_font = assets.font(25)
         self.screen = screen
         self.load_entities()
         self.invalid_code = False
         self.show_menu = True
         self.game_taken = False
+        # Why the last online game could not reach the server
+        self.connect_error = ""
         self.particles = []
         self.ships = [Ship() for _ in range(3)]
 
     def run(self):
-        bg = pygame.image.load("client/assets/bg_ocean.jpg").convert()
-        # Scale the background to match the screen size while maintaining aspect ratio
-        screen_width, screen_height = self.screen.get_size()
-        bg = pygame.transform.scale(bg, (screen_width, screen_height))
-        self.screen.blit(bg, (0, 0))
+        # Background scaled to the screen size, cached across frames
+        self.screen.blit(assets.scaled("bg_ocean.jpg", self.screen.get_size()), (0, 0))
 
         self.draw_ships()
         screen_width, screen_height = self.screen.get_size()
@@ -171,6 +162,8 @@ class Menu:
         pygame.draw.rect(self.screen, BLACK, self.create_button, 4)
         pygame.draw.rect(self.screen, BACKGROUND, self.join_button)
         pygame.draw.rect(self.screen, BLACK, self.join_button, 4)
+        pygame.draw.rect(self.screen, self.quick_button_color, self.quick_button)
+        pygame.draw.rect(self.screen, BLACK, self.quick_button, 4)
         pygame.draw.rect(self.screen, BACKGROUND, self.solo_button)
         pygame.draw.rect(self.screen, BLACK, self.solo_button, 4)
 
@@ -179,6 +172,9 @@ class Menu:
         self.screen.blit(
             self.create_text, (center_x - self.create_text.get_width() // 2, self.create_button.centery - self.create_text.get_height() // 2)
         )
+        self.screen.blit(
+            self.quick_text, (center_x - self.quick_text.get_width() // 2, self.quick_button.centery - self.quick_text.get_height() // 2)
+        )
         self.screen.blit(
             self.solo_text, (center_x - self.solo_text.get_width() // 2, self.solo_button.centery - self.solo_text.get_height() // 2)
         )
@@ -215,6 +211,9 @@ class Menu:
             elif self.game_taken:
                 text = self.small_font.render("Game Occupied", True, RED)
                 self.screen.blit(text, (center_x - text.get_width() // 2, self.solo_button.y + self.solo_button.height + 20))
+        if self.connect_error and not self.join_hover:
+            text = self.small_font.render(self.connect_error, True, RED)
+            self.screen.blit(text, (center_x - text.get_width() // 2, self.solo_button.y + self.solo_button.height + 20))
         m_x, m_y = pygame.mouse.get_pos()
         if self.create_button.collidepoint(m_x, m_y):
             if pygame.mouse.get_pressed(3)[0]:
@@ -223,9 +222,20 @@ class Menu:
             self.invalid_code = False
             self.game_taken = False
             self.create_button_color = HOVER
+            self.quick_button_color = BACKGROUND
         elif self.join_button.collidepoint(m_x, m_y):
             self.join_hover = True
             self.create_button_color = BACKGROUND
+            self.quick_button_color = BACKGROUND
+        elif self.quick_button.collidepoint(m_x, m_y):
+            # Paired with the next player who does the same, no code needed
+            if pygame.mouse.get_pressed(3)[0]:
+                return {"category": "QUEUE"}
+            self.join_hover = False
+            self.invalid_code = False
+            self.game_taken = False
+            self.create_button_color = BACKGROUND
+            self.quick_button_color = HOVER
         elif self.solo_button.collidepoint(m_x, m_y):
             if pygame.mouse.get_pressed(3)[0]:
                 return {"category": "SOLO"}
@@ -233,11 +243,13 @@ class Menu:
             self.invalid_code = False
             self.game_taken = False
             self.create_button_color = BACKGROUND
+            self.quick_button_color = BACKGROUND
         else:
             self.join_hover = False
             self.invalid_code = False
             self.game_taken = False
             self.create_button_color = BACKGROUND
+            self.quick_button_color = BACKGROUND
 
         screen_width, screen_height = self.screen.get_size()
         center_x = screen_width // 2
@@ -259,6 +271,7 @@ class Menu:
         self.blink_count = 0
         self.cursor = "_"
         self.game_taken = False
+        self.connect_error = ""
 
     def load_entities(self):
         screen_width, screen_height = self.screen.get_size()
@@ -268,18 +281,21 @@ class Menu:
         button_height = 60
         button_spacing = 20
         # Center buttons vertically and horizontally
-        total_height = (button_height * 3) + (button_spacing * 2)
-        start_y = screen_height // 2 - total_height // 2 + 50
+        total_height = (button_height * 4) + (button_spacing * 3)
+        start_y = screen_height // 2 - total_height // 2 + 70
         center_x = screen_width // 2
         self.create_button = pygame.Rect(center_x - button_width // 2, start_y, button_width, button_height)
         self.join_button = pygame.Rect(center_x - button_width // 2, start_y + button_height + button_spacing, button_width, button_height)
-        self.solo_button = pygame.Rect(center_x - button_width // 2, start_y + (button_height + button_spacing) * 2, button_width, button_height)
+        self.quick_button = pygame.Rect(center_x - button_width // 2, start_y + (button_height + button_spacing) * 2, button_width, button_height)
+        self.quick_text = self.small_font.render("QUICK PLAY", True, BLUE)
+        self.solo_button = pygame.Rect(center_x - button_width // 2, start_y + (button_height + button_spacing) * 3, button_width, button_height)
         self.solo_text = self.small_font.render("PLAY SOLO", True, BLUE)
         self.join_hover = False
         self.join_code = ""
         self.blink_count = 0
         self.cursor = "_"
         self.create_button_color = BACKGROUND
+        self.quick_button_color = BACKGROUND
 
     def draw_particles(self, loc):
         self.particles.append(
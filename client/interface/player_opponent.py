@@ -1,6 +1,8 @@
 import pygame
+from client.misc.assets import assets
 from client.misc.colors import *
-from client.misc.utils import image_at, make_grid
+from client.misc.fleet import FleetTracker
+from client.misc.utils import make_grid
 from pygame import mixer
 
 pygame.init()
@@ -11,47 +13,79 @@ rect = "rect"
 empty = "empty"
 color = "color"
 perma_color = "perma_color"
-font = pygame.font.Font("client/assets/retrofont.ttf", 14)
+font = assets.font(14)
 
 
 class Player:
     def __init__(self):
         self.grid = []
         self.is_turn = None
+        self.fleet = FleetTracker()
 
-        self.ship_img = pygame.image.load("client/assets/ship.png")
-        sheet = pygame.image.load("client/assets/ship_fire.png")
+        self.ship_img = assets.image("ship.png")
         # Use only one fire frame for continuous burning effect (no flickering)
         # Frame 1 (index 0) is typically the most visible fire frame
-        self.ship_destroyed_img = image_at(sheet, (1, 0, 35, 35))
+        self.ship_destroyed_img = assets.sprite("ship_fire.png", (1, 0, 35, 35))
+
+    def take_shot(self, x, y):
+        """Mark the opponent's shot at (x, y) on our grid."""
+        square = self.grid[x][y]
+        square[aimed] = True
+        if square[ship]:
+            self.fleet.hit((x, y), square[ship])
 
     def draw_grid(self, screen):
-        for sx in self.grid:
-            for square in sx:
-                cell_rect = pygame.Rect(square[rect])
-                # Hover highlight (slight color change)
-                if Opponent.is_hovered(pygame.mouse.get_pos(), cell_rect):
-                    highlight = pygame.Surface((cell_rect.width - 2, cell_rect.height - 2), pygame.SRCALPHA)
-                    highlight.fill((255, 255, 255, 30))
-                    screen.blit(highlight, (cell_rect.x + 1, cell_rect.y + 1))
-
-                if square[ship] and square[aimed]:
-                    r = pygame.Rect(square[rect])
-                    # Keep fire effect within the cell bounds
-                    screen.blit(self.ship_destroyed_img, r)
-                elif square[ship]:
-                    screen.blit(self.ship_img, pygame.Rect(square[rect]))
-                elif square[aimed]:
-                    pygame.draw.circle(
-                        screen,
-                        WHITE,
-                        (square[rect][0] + 17, square[rect][1] + 17),
-                        10,
-                        1,
-                    )
-                pygame.draw.rect(
-                    screen, square[color], cell_rect, square[empty]
-                )
+        hovered = Opponent.hovered_square(self.grid, pygame.mouse.get_pos())
+        for x, sx in enumerate(self.grid):
+            for y, square in enumerate(sx):
+                self.draw_square(screen, square, hovered == (x, y))
+
+    def draw_square(self, screen, square, hovered=False):
+        cell_rect = pygame.Rect(square[rect])
+        # Hover highlight (slight color change)
+        if hovered:
+            highlight = pygame.Surface((cell_rect.width - 2, cell_rect.height - 2), pygame.SRCALPHA)
+            highlight.fill((255, 255, 255, 30))
+            screen.blit(highlight, (cell_rect.x + 1, cell_rect.y + 1))
+
+        if square[ship] and square[aimed]:
+            # Keep fire effect within the cell bounds
+            screen.blit(self.ship_destroyed_img, cell_rect)
+        elif square[ship]:
+            screen.blit(self.ship_img, cell_rect)
+        elif square[aimed]:
+            pygame.draw.circle(
+                screen,
+                WHITE,
+                (square[rect][0] + 17, square[rect][1] + 17),
+                10,
+                1,
+            )
+        pygame.draw.rect(
+            screen, square[color], cell_rect, square[empty]
+        )
+
+    def tile_states(self, hovered):
+        """The atlas state of every square, column by column."""
+        hovered = self.grid.index(*hovered) if hovered else -1
+        return (
+            (bool(name), is_aimed, i == hovered, square_color, square_empty)
+            for i, (name, is_aimed, square_color, square_empty) in enumerate(
+                self.grid.values(ship, aimed, color, empty)
+            )
+        )
+
+    def draw_tile(self, surface, state):
+        """Draw a square in ``state`` (see tile_states) at the surface's origin."""
+        has_ship, is_aimed, hovered, square_color, square_empty = state
+        square = {
+            rect: (0, 0, *surface.get_size()),
+            ship: has_ship,
+            aimed: is_aimed,
+            color: square_color,
+            empty: square_empty,
+        }
+        self.draw_square(surface, square, hovered)
 
 
 class Opponent:
@@ -60,68 +94,74 @@ class Opponent:
         # Grid will be positioned dynamically, but use default for initialization
         self.grid = make_grid(300, 650, 120, 470, BLACK)
         self.start_ticks = pygame.time.get_ticks()
-        self.sunken_ships = {
-            "Carrier": False,
-            "Battleship": False,
-            "Cruiser": False,
-            "Submarine": False,
-            "Destroyer": False,
-        }
-        self.current_sunkship = None
-        self.explosion_sound = mixer.Sound("client/assets/explosion.wav")
-        self.miss_sound = mixer.Sound("client/assets/miss.wav")
+        self.sunk_banner = None
+        self.fleet = FleetTracker()
+        self.fleet.subscribe(self.on_sunk)
+        self.ship_destroyed_img = assets.sprite("ship_fire.png", (1, 0, 35, 35))
+        self.explosion_sound = assets.sound("explosion.wav")
+        self.miss_sound = assets.sound("miss.wav")
         self.sound_counter = 0
 
-    def draw_grid(self, screen):
-        for sx in self.grid:
-            for square in sx:
-                # Draw cell background
-                cell_rect = pygame.Rect(square[rect])
-                # Light, subtle cell border only - no dark background
-                pygame.draw.rect(screen, (150, 150, 180), cell_rect, 1)
-                
-                # Highlight hovered cell
-                if self.is_hovered(pygame.mouse.get_pos(), cell_rect):
-                    highlight = pygame.Surface((cell_rect.width-2, cell_rect.height-2), pygame.SRCALPHA)
-                    highlight.fill((255, 255, 255, 30))  # Semi-transparent white
-                    screen.blit(highlight, (cell_rect.x+1, cell_rect.y+1))
-                
-                # Draw hit/miss indicators
-                if square[perma_color]:
-                    pygame.draw.circle(
-                        screen,
-                        square[perma_color],
-                        (square[rect][0] + 17, square[rect][1] + 17),
-                        11,
-                    )
-                    square[empty] = 1
-                if (
-                    self.is_sunk(self.grid, square[ship])
-                    and not self.sunken_ships[square[ship]]
-                ):
-                    if self.current_sunkship is None:
-                        self.current_sunkship = square[ship]
-                    if square[ship] != self.current_sunkship:
-                        self.sunken_ships[self.current_sunkship] = True
-                        self.current_sunkship = square[ship]
-                    else:
-                        text = f"You sunk their {square[ship]}!"
-                        screen.blit(
-                            font.render(text, True, WHITE),
-                            (450 - len(text) * 10, 0),
-                        )
+    def draw_square(self, screen, square, hovered=False, sunk=False):
+        # Draw cell background
+        cell_rect = pygame.Rect(square[rect])
+        # Light, subtle cell border only - no dark background
+        pygame.draw.rect(screen, (150, 150, 180), cell_rect, 1)
 
-    @staticmethod
-    def is_hovered(mouse_pos, rect):
-        m_x, m_y = mouse_pos
+        # Highlight hovered cell
+        if hovered:
+            highlight = pygame.Surface((cell_rect.width-2, cell_rect.height-2), pygame.SRCALPHA)
+            highlight.fill((255, 255, 255, 30))  # Semi-transparent white
+            screen.blit(highlight, (cell_rect.x+1, cell_rect.y+1))
+
+        # Draw hit/miss indicators
+        if square[perma_color]:
+            pygame.draw.circle(
+                screen,
+                square[perma_color],
+                (square[rect][0] + 17, square[rect][1] + 17),
+                11,
+            )
+            square[empty] = 1
+        # Squares of a sunk ship burn like the player's own hit ships
+        if sunk:
+            screen.blit(self.ship_destroyed_img, cell_rect)
+
+    def tile_states(self, hovered):
+        """The atlas state of every square, column by column."""
+        hovered = self.grid.index(*hovered) if hovered else -1
+        sunk = self.sunk_ships()
         return (
-            m_y > rect.y
-            and m_y < rect.y + rect.height
-            and m_x > rect.x
-            and m_x < rect.x + rect.width
+            (mark, name in sunk, i == hovered)
+            for i, (mark, name) in enumerate(self.grid.values(perma_color, ship))
         )
 
+    def draw_tile(self, surface, state):
+        """Draw a square in ``state`` (see tile_states) at the surface's origin."""
+        mark, sunk, hovered = state
+        square = {rect: (0, 0, *surface.get_size()), perma_color: mark, empty: 1}
+        self.draw_square(surface, square, hovered, sunk)
+
+    def sunk_ships(self):
+        return self.fleet.sunk
+
+    def on_sunk(self, name):
+        self.sunk_banner = f"You sunk their {name}!"
+
+    def sunk_message(self):
+        """Announcement for the ship sunk last, until the next one sinks."""
+        return self.sunk_banner
+
     @staticmethod
-    def is_sunk(grid, ship_name):
-        if ship_name:
-            return all(y[aimed] for x in grid for y in x if y[ship] == ship_name)
+    def hovered_square(grid, mouse_pos):
+        """Grid index (x, y) of the square under the mouse, or None."""
+        if not grid or not grid[0]:
+            return None
+        left, top, width, height = grid[0][0][rect]
+        m_x, m_y = mouse_pos
+        x, dx = divmod(m_x - left, width)
+        y, dy = divmod(m_y - top, height)
+        # Strict bounds: the shared edges belong to no square
+        if 0 <= x < len(grid) and 0 <= y < len(grid[x]) and dx and dy:
+            return x, y
+        return None
@@ -1,62 +1,74 @@
 import random
-from client.misc.utils import make_grid, SHIPS
+from client.misc.utils import make_grid
+from common.placement import pool, ship_cells
 from client.misc.colors import BLACK
 
 
 def create_ship_grid(sx=50, ex=400, sy=30, ey=370, color=BLACK):
-    """Create a grid and randomly place ships. Returns grid (list of dicts).
-    Uses same algorithm as server layout (random orientation, collision checks).
+    """Create a grid and randomly place ships. Returns a common.board.Board.
+    Layouts come from the same pre-sampled pool the server uses.
     """
     grid = make_grid(sx, ex, sy, ey, color)
-    for name, size in SHIPS.items():
-        while True:
-            ship_collision = False
-            coords = []
-            coord1 = random.randint(0, 9)
-            coord2 = random.randint(0, 10 - size)
-
-            if random.choice((True, False)):
-                x, y = coord1, coord2
-                xi, yi = 0, 1
-            else:
-                x, y = coord2, coord1
-                xi, yi = 1, 0
-
-            for i in range(size):
-                new_x = x + (xi * i)
-                new_y = y + (yi * i)
-                if grid[new_x][new_y]["ship"]:
-                    ship_collision = True
-                    break
-                coords.append((new_x, new_y))
-            if not ship_collision:
-                break
-        for bx, by in coords:
+    for name, cells in ship_cells(pool.draw()):
+        for bx, by in cells:
             grid[bx][by]["ship"] = name
     return grid
 
 
+def reveal(grid, x, y):
+    """What the shooter of (x, y) is told: a hit, and the name of a ship it sinks."""
+    name = grid[x][y]["ship"]
+    if not name:
+        return False, None
+    shot = x * len(grid[0]) + y
+    for i, (square_ship, square_aimed) in enumerate(grid.values("ship", "aimed")):
+        if square_ship == name and not square_aimed and i != shot:
+            return True, None
+    return True, name
+
+
 class Bot:
     """Simple bot with random -> hunt/target behaviour.
 
     Bot stores a list of candidate target cells when it scores a hit.
+    With level="hard" it aims with a probability-density heat map instead
+    (client.misc.density, needs NumPy).
     """
 
-    def __init__(self, grid=None):
+    LEVELS = ("normal", "hard")
+
+    def __init__(self, grid=None, level="normal"):
+        if level not in self.LEVELS:
+            raise ValueError(f"Unknown bot level {level!r}, expected one of {self.LEVELS}")
         # bot's own grid (where its ships are placed)
         if grid is None:
             self.grid = create_ship_grid()
         else:
             self.grid = grid
+        self.level = level
+        self.reset()
+
+    def reset(self):
+        """Forget everything learnt about the opponent's board (new game)."""
         self.target_mode = False
         self.targets = []
+        self.density = None
+        if self.level == "hard":
+            from client.misc.density import DensityTargeting
+
+            self.density = DensityTargeting()
 
     def choose_move(self, player_grid):
-        """Choose a move against player_grid (list of lists of dicts).
+        """Choose a move against player_grid (a common.board.Board).
 
         Returns (x_index, y_index).
         Also updates internal targets when it scores a hit.
         """
+        if self.density:
+            cols = len(player_grid[0])
+            x, y = divmod(self.density.choose(), cols)
+            self.density.record(x * cols + y, *reveal(player_grid, x, y))
+            return (x, y)
         rows = len(player_grid)
         cols = len(player_grid[0]) if rows else 0
 
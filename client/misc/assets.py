@@ -0,0 +1,99 @@
+"""Images, fonts and sounds from client/assets, each loaded once.
+
+Screens ask ``assets`` for what they draw instead of opening files
+themselves. Resized copies are cached by target size and the least recently
+used ones are dropped past ``scaled_limit``.
+"""
+from collections import OrderedDict
+
+import pygame
+from pygame import mixer
+
+from client.misc.utils import image_at
+
+ASSETS_DIR = "client/assets"
+FONT = "retrofont.ttf"
+IMAGES = (
+    "bg_ocean.jpg",
+    "avatar1.jpg",
+    "avatar2.jpg",
+    "avatar3.jpg",
+    "avatar4.jpg",
+    "ship.png",
+    "ship_fire.png",
+)
+AVATARS = IMAGES[1:5]
+SOUNDS = ("explosion.wav", "miss.wav")
+# Font sizes the menu and game screens use
+FONT_SIZES = (12, 14, 16, 24, 25, 34, 36)
+
+
+class Assets:
+    def __init__(self, scaled_limit=32):
+        self.scaled_limit = scaled_limit
+        self._images = {}
+        self._scaled = OrderedDict()
+        self._sprites = {}
+        self._fonts = {}
+        self._sounds = {}
+
+    def image(self, name, flip_x=False):
+        key = name, flip_x
+        if key not in self._images:
+            if flip_x:
+                self._images[key] = pygame.transform.flip(self.image(name), True, False)
+            else:
+                self._images[key] = self._load(name)
+        return self._images[key]
+
+    def scaled(self, name, size):
+        key = name, tuple(size)
+        surface = self._scaled.get(key)
+        if surface is None:
+            surface = self._scaled[key] = pygame.transform.scale(self.image(name), key[1])
+            if len(self._scaled) > self.scaled_limit:
+                self._scaled.popitem(last=False)
+        else:
+            self._scaled.move_to_end(key)
+        return surface
+
+    def sprite(self, name, rect):
+        """A frame cut out of a sprite sheet."""
+        key = name, tuple(rect)
+        if key not in self._sprites:
+            self._sprites[key] = image_at(self.image(name), rect)
+        return self._sprites[key]
+
+    def font(self, size, name=FONT):
+        key = name, size
+        if key not in self._fonts:
+            self._fonts[key] = pygame.font.Font(f"{ASSETS_DIR}/{name}", size)
+        return self._fonts[key]
+
+    def sound(self, name):
+        if name not in self._sounds:
+            self._sounds[name] = mixer.Sound(f"{ASSETS_DIR}/{name}")
+        return self._sounds[name]
+
+    def preload(self, screen_size):
+        """Load everything up front so the first frames don't stall on disk."""
+        for name in IMAGES:
+            self.image(name)
+        self.image("ship.png", flip_x=True)
+        self.scaled("bg_ocean.jpg", screen_size)
+        for size in FONT_SIZES:
+            self.font(size)
+        if mixer.get_init():
+            for name in SOUNDS:
+                self.sound(name)
+
+    @staticmethod
+    def _load(name):
+        surface = pygame.image.load(f"{ASSETS_DIR}/{name}")
+        # Converting to the display format makes blits cheaper; it needs a window
+        if pygame.display.get_surface() is None:
+            return surface
+        return surface.convert_alpha() if name.endswith(".png") else surface.convert()
+
+
+assets = Assets()
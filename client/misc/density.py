@@ -0,0 +1,98 @@
+import random
+
+import numpy as np
+
+from common.placement import PLACEMENTS, SHIPS
+
+CELLS = 100
+
+
+def placement_matrix():
+    # Every placement of every ship as a row of a (placements x cells) matrix,
+    # plus the index in SHIPS of the ship each row belongs to.
+    # Cell index is x * 10 + y, matching grid[x][y].
+    rows, owners = [], []
+    for i, length in enumerate(SHIPS.values()):
+        for mask, _ in PLACEMENTS[length]:
+            rows.append([mask >> c & 1 for c in range(CELLS)])
+            owners.append(i)
+    return np.array(rows, dtype=np.float32), np.array(owners)
+
+
+MATRIX, OWNERS = placement_matrix()
+COVERS = MATRIX.astype(bool)
+# Cell mask of each row, as in PLACEMENTS
+ROW_MASKS = [mask for length in SHIPS.values() for mask, _ in PLACEMENTS[length]]
+SHIP_INDEX = {name: i for i, name in enumerate(SHIPS)}
+
+# Extra weight per unsunk hit a placement covers; pulls shots onto wounded ships
+HIT_WEIGHT = 50.0
+
+
+class DensityTargeting:
+    """Heat map over every placement still possible for the remaining ships.
+
+    Only what a player is told is used: hit or miss, and the name of a ship
+    when it sinks. Misses rule placements out and hits weight the placements
+    through them up. A sunk ship keeps the placements that cover the sinking
+    shot and only unclaimed hits; once a single one is left, its cells are
+    claimed and nothing else can overlap them. Each shot only touches one
+    column of the placement matrix, and the heat map is a single
+    vector-matrix product.
+    """
+
+    def __init__(self):
+        self.valid = np.ones(len(MATRIX), dtype=bool)
+        self.hits = np.zeros(len(MATRIX), dtype=np.float32)
+        self.shot = np.zeros(CELLS, dtype=bool)
+        # Hit cells not yet known to belong to a sunk ship, as a cell mask
+        self.open_hits = 0
+        # Sunk ship -> rows it may still be placed on, until only one is left
+        self.sunk = {}
+
+    def choose(self):
+        heat = (self.valid * (1 + HIT_WEIGHT * self.hits)) @ MATRIX
+        heat[self.shot] = -1
+        return int(random.choice(np.flatnonzero(heat == heat.max())))
+
+    def record(self, cell, hit, sunk=None):
+        """Feed back the result of shooting `cell`, and the name of the ship it sank."""
+        self.shot[cell] = True
+        if not hit:
+            self.valid &= ~COVERS[:, cell]
+            return
+        self.hits += MATRIX[:, cell]
+        self.open_hits |= 1 << cell
+        if sunk is not None:
+            owned = OWNERS == SHIP_INDEX[sunk]
+            rows = [
+                row for row in np.flatnonzero(self.valid & owned & COVERS[:, cell])
+                if not ROW_MASKS[row] & ~self.open_hits
+            ]
+            # The ship is down; its placements left only cover cells already shot
+            self.valid[owned] = False
+            self.valid[rows] = True
+            self.sunk[sunk] = rows
+            self.settle()
+
+    def settle(self):
+        # Claim the cells of sunk ships whose placement is down to one,
+        # which can narrow down the others in turn
+        settled = True
+        while settled:
+            settled = False
+            for name, rows in list(self.sunk.items()):
+                rows = [row for row in rows if not ROW_MASKS[row] & ~self.open_hits]
+                self.sunk[name] = rows
+                if len(rows) > 1:
+                    continue
+                del self.sunk[name]
+                self.valid[OWNERS == SHIP_INDEX[name]] = False
+                if not rows:
+                    continue
+                mask = ROW_MASKS[rows[0]]
+                self.open_hits &= ~mask
+                cells = [c for c in range(CELLS) if mask >> c & 1]
+                self.hits -= MATRIX[:, cells].sum(axis=1)
+                self.valid &= ~COVERS[:, cells].any(axis=1)
+                settled = True
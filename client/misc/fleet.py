@@ -0,0 +1,58 @@
+from client.misc.utils import SHIPS
+
+
+class FleetTracker:
+    """Hit points left per ship of one board, updated as shots land.
+
+    Sunk and game-over checks are lookups instead of grid scans. Callbacks
+    registered with ``subscribe`` get the ship name whenever one sinks.
+    """
+
+    def __init__(self, ships=SHIPS):
+        self.ships = dict(ships)
+        self.listeners = []
+        self.reset()
+
+    def reset(self, grid=None):
+        """Start over, counting hits already marked on ``grid`` if given."""
+        self.remaining = dict(self.ships)
+        self.cells_left = sum(self.ships.values())
+        self.sunk = set()
+        self._hits = set()
+        for x, column in enumerate(grid or ()):
+            for y, square in enumerate(column):
+                if square["ship"] and square["aimed"]:
+                    self.hit((x, y), square["ship"], notify=False)
+
+    def subscribe(self, callback):
+        self.listeners.append(callback)
+
+    def hit(self, cell, name=None, notify=True):
+        """Record a hit on ``cell``; ``name`` is the ship, if it is known yet."""
+        if cell in self._hits:
+            return
+        self._hits.add(cell)
+        self.cells_left -= 1
+        if name is not None and name not in self.sunk:
+            self.remaining[name] -= 1
+            if self.remaining[name] == 0:
+                self._sink(name, notify)
+
+    def sink(self, name):
+        """Mark ``name`` sunk when only the result is known (the opponent's ships online)."""
+        if name not in self.sunk:
+            self.remaining[name] = 0
+            self._sink(name, True)
+
+    def is_sunk(self, name):
+        return name in self.sunk
+
+    @property
+    def defeated(self):
+        return self.cells_left == 0
+
+    def _sink(self, name, notify):
+        self.sunk.add(name)
+        if notify:
+            for callback in self.listeners:
+                callback(name)
@@ -1,8 +1,26 @@
-import json
+import queue
+import selectors
 import socket
+from collections import deque
+from threading import Thread
+
+from common import binproto
+from common.framing import FrameReader, decode, encode
+
+# Server heartbeat
+PING = {"category": "PING"}
+PONG = {"category": "PONG"}
 
 
 class Network:
+    """Connection to the server, with all socket I/O on a background thread.
+
+    ``send`` only queues a frame and ``poll`` hands back the messages that
+    have arrived, so the UI thread never waits on the network. Decoded
+    messages wait in a bounded queue; when the UI falls that far behind the
+    I/O thread stops reading and TCP flow control holds the server back.
+    """
+
     server = "localhost"
     port = 1234
     address = server, port
@@ -10,49 +28,133 @@ class Network:
     def __init__(
         self,
         sock=None,
+        inbox_size=256,
     ):
         if sock is None:
             self.client = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         else:
             self.client = sock
+        self.reader = FrameReader()
+        # Offered to the server at CREATE/JOIN/QUEUE/RESUME; we start sending binary
+        # once the server has answered in it
+        self.codecs = [binproto.NAME]
+        self.binary = False
         self.connected = False
-    
+        self.closed = False
+        # Why the connection ended, if it failed
+        self.error = None
+        self.inbox = queue.Queue(inbox_size)
+        self._outbox = deque()
+        # Written to by send() to wake the I/O thread out of select()
+        self._wakeup, self._waker = socket.socketpair()
+        self._thread = None
+
     def connect(self):
-        """Connect to the server. Can be called explicitly or will be called automatically on first send/receive."""
+        """Connect to the server. Called by the I/O thread, or explicitly beforehand."""
         if not self.connected:
             try:
                 self.client.connect(self.address)
                 self.connected = True
             except ConnectionRefusedError:
                 raise ConnectionRefusedError(f"Could not connect to server at {self.address}. Make sure the server is running.")
-    
-    def ensure_connected(self):
-        """Ensure connection is established before operations."""
-        if not self.connected:
-            self.connect()
 
-    def receive(self):
-        self.ensure_connected()
-        buff = b""
-        n = int.from_bytes(self.client.recv(4)[:4], "big")
-        while n > 0:
-            b = self.client.recv(n)
-            buff += b
-            n -= len(b)
-        return json.loads(buff.decode())
+    def start(self):
+        """Start the I/O thread; the first send() does it too."""
+        if self._thread is None:
+            self._thread = Thread(target=self._run, name="network", daemon=True)
+            self._thread.start()
+
+    @property
+    def alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def poll(self):
+        """Every message received since the last poll, oldest first."""
+        messages = []
+        while True:
+            try:
+                messages.append(self.inbox.get_nowait())
+            except queue.Empty:
+                return messages
+
+    def receive(self, timeout=None):
+        """Wait for the next message (for scripts; the game polls)."""
+        self.start()
+        return self.inbox.get(timeout=timeout)
 
     def send(self, *data):
-        self.ensure_connected()
         if len(data) == 1:
             data = data[0]
-        final_data = b""
-        data = json.dumps(data)
-        final_data += len(data).to_bytes(4, "big")
-        final_data += data.encode()
-        try:
-            self.client.send(final_data)
-        except:
-            pass
+        if isinstance(data, dict) and data.get("category") in ("CREATE", "JOIN", "QUEUE", "RESUME"):
+            data = {**data, "codecs": self.codecs}
+        self._outbox.append(encode(data, self.binary))
+        self.start()
+        self._wake()
 
     def close(self):
+        self.closed = True
+        self._wake()
         self.client.close()
+
+    def _wake(self):
+        try:
+            self._waker.send(b"\0")
+        except OSError:
+            pass
+
+    def _run(self):
+        try:
+            self.connect()
+            self.client.setblocking(False)
+            with selectors.DefaultSelector() as selector:
+                selector.register(self._wakeup, selectors.EVENT_READ)
+                selector.register(self.client, selectors.EVENT_READ)
+                pending = bytearray()
+                while not self.closed:
+                    while self._outbox:
+                        pending += self._outbox.popleft()
+                    if pending:
+                        del pending[: self._write(pending)]
+                    events = selectors.EVENT_READ | (selectors.EVENT_WRITE if pending else 0)
+                    selector.modify(self.client, events)
+                    for key, mask in selector.select():
+                        if key.fileobj is self._wakeup:
+                            self._wakeup.recv(4096)
+                        elif mask & selectors.EVENT_READ:
+                            self._read()
+        except (OSError, ValueError) as error:
+            if not self.closed:
+                self.error = error
+                print(f"Connection to {self.address} lost: {error}")
+        finally:
+            self.connected = False
+            self._wakeup.close()
+            self._waker.close()
+
+    def _write(self, data):
+        try:
+            return self.client.send(data)
+        except BlockingIOError:
+            return 0
+
+    def _read(self):
+        try:
+            if not self.reader.fill(self.client):
+                raise ConnectionError("server closed the connection")
+        except BlockingIOError:
+            return
+        while (payload := self.reader.next_frame()) is not None:
+            if binproto.is_binary(payload):
+                self.binary = True
+            message = decode(payload)
+            if message == PING:
+                # Answered here, so a busy UI thread doesn't look like a dead client
+                self._outbox.append(encode(PONG, self.binary))
+                continue
+            # Blocks while the queue is full, which stops reading the socket
+            while not self.closed:
+                try:
+                    self.inbox.put(message, timeout=0.1)
+                    break
+                except queue.Full:
+                    pass
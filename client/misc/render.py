@@ -0,0 +1,95 @@
+"""Retained-mode drawing for screens that change only a little per frame.
+
+Each frame a screen adds regions on top of a static layer. A region is a
+rect, a key that changes whenever the region would look different, and a
+function drawing it. ``flush`` repaints only the areas of regions whose key
+or rect changed, redrawing every region that overlaps them, and returns the
+areas to hand to ``pygame.display.update``. When nothing changed it returns
+an empty list and draws nothing.
+"""
+import pygame
+
+
+class DirtyRenderer:
+    def __init__(self, screen):
+        self.screen = screen
+        self.static = None
+        self._static_key = None
+        self._regions = []
+        # name -> (rect, key) as drawn by the last flush
+        self._drawn = {}
+        self._full = True
+
+    def set_static(self, key, build):
+        """Use ``build()`` as the layer under all regions, rebuilt when ``key`` changes.
+
+        Returns True when the layer was rebuilt.
+        """
+        if self.static is not None and key == self._static_key:
+            return False
+        self.static = build()
+        self._static_key = key
+        self._full = True
+        return True
+
+    def invalidate(self):
+        """Redraw everything on the next flush (something else drew on the screen)."""
+        self._full = True
+
+    def add(self, name, rect, key, draw, damage=None):
+        """Queue a region; regions added later are drawn on top.
+
+        ``damage`` narrows a key change to the listed parts of ``rect``,
+        for regions that know exactly what changed (one tile of a board).
+        """
+        self._regions.append((name, pygame.Rect(rect), key, draw, damage))
+
+    def flush(self):
+        regions, self._regions = self._regions, []
+        if self._full:
+            dirty = [self.screen.get_rect()]
+        else:
+            dirty = self._merge(self._changed(regions))
+        # Every region is redrawn where it meets a dirty area, in order, so
+        # overlapping regions stay stacked the same way
+        for area in dirty:
+            self.screen.blit(self.static, area, area)
+        for _, rect, _, draw, _ in regions:
+            for area in dirty:
+                clip = rect.clip(area)
+                if clip:
+                    self.screen.set_clip(clip)
+                    draw()
+        self.screen.set_clip(None)
+        self._drawn = {name: (rect, key) for name, rect, key, _, _ in regions}
+        self._full = False
+        return dirty
+
+    def _changed(self, regions):
+        dirty = []
+        seen = set()
+        for name, rect, key, _, damage in regions:
+            seen.add(name)
+            old = self._drawn.get(name)
+            if old is None:
+                dirty.append(rect)
+            elif old[0] != rect:
+                dirty += [old[0], rect]
+            elif old[1] != key:
+                dirty += [rect] if damage is None else damage
+        # Regions that are gone leave their old area to be cleared
+        dirty += [rect for name, (rect, _) in self._drawn.items() if name not in seen]
+        return dirty
+
+    @staticmethod
+    def _merge(rects):
+        # Overlapping areas would draw translucent regions twice
+        merged = []
+        for rect in rects:
+            rect = pygame.Rect(rect)
+            i = rect.collidelist(merged)
+            while i != -1:
+                rect.union_ip(merged.pop(i))
+                i = rect.collidelist(merged)
+            merged.append(rect)
+        return merged
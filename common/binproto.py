@@ -0,0 +1,277 @@
+"""Compact binary encoding of the game messages (codec "bin1").
+
+A binary payload starts with ``VERSION``, a byte no JSON document can start
+with, followed by a message type and a type-specific body. Strings are
+UTF-8 with a 2-byte length, board cells are numbered ``x * 10 + y`` and a
+board's ships are sent as one 13-byte (100-bit) mask per ship.
+
+Decoding gives back the same structures the JSON path produces, except that
+BOARD layouts only keep each cell's ``ship``, the one field clients read.
+Messages without a compact form are sent as ``GENERIC`` (type byte plus the
+JSON text), so every message can be encoded.
+"""
+import json
+
+VERSION = 1
+NAME = "bin1"
+
+SIZE = 10
+MASK_BYTES = 13
+SHIP_NAMES = ("Carrier", "Battleship", "Cruiser", "Submarine", "Destroyer")
+SHIP_IDS = {name: i for i, name in enumerate(SHIP_NAMES)}
+
+GENERIC = 0
+END = 1
+TAKEN = 2
+INVALID = 3
+ID = 4
+BOARD = 5
+POSITION = 6
+CHAT = 7
+GAME_OVER = 8
+REMATCH_STATUS = 9
+CONTROL = 10
+RESULT = 11
+
+# Bare strings the server sends
+STRINGS = {"END": END, "TAKEN": TAKEN, "INVALID": INVALID}
+STRING_TYPES = {t: s for s, t in STRINGS.items()}
+# Payload-less messages, sent as one byte after the type
+CONTROLS = (
+    {"category": "REMATCH_START", "payload": {}},
+    {"category": "REMATCH_OFFER"},
+    {"category": "OVER"},
+    {"category": "SURRENDER"},
+    {"category": "FORFEIT"},
+    {"category": "PING"},
+    {"category": "PONG"},
+)
+
+
+def is_binary(payload):
+    return len(payload) > 0 and payload[0] == VERSION
+
+
+def dumps(data):
+    try:
+        return _encode(data)
+    except (AttributeError, IndexError, KeyError, OverflowError, TypeError, ValueError):
+        return bytes((VERSION, GENERIC)) + json.dumps(data).encode()
+
+
+def loads(payload):
+    payload = memoryview(payload)
+    kind = payload[1]
+    if kind == GENERIC:
+        return json.loads(str(payload[2:], "utf-8"))
+    if kind in STRING_TYPES:
+        return STRING_TYPES[kind]
+    if kind == CONTROL:
+        return dict(CONTROLS[payload[2]])
+    return _DECODERS[kind](payload, 2)
+
+
+def _encode(data):
+    if isinstance(data, str):
+        return bytes((VERSION, STRINGS[data]))
+    if data in CONTROLS:
+        return bytes((VERSION, CONTROL, CONTROLS.index(data)))
+    category = data["category"]
+    if category not in _ENCODERS or set(data) != {"category", "payload"}:
+        raise ValueError(category)
+    out = bytearray((VERSION, _TYPES[category]))
+    _ENCODERS[category](out, data["payload"])
+    return bytes(out)
+
+
+def _put_str(out, s):
+    b = s.encode()
+    out += len(b).to_bytes(2, "big")
+    out += b
+
+
+def _get_str(buf, i):
+    n = int.from_bytes(buf[i : i + 2], "big")
+    return str(buf[i + 2 : i + 2 + n], "utf-8"), i + 2 + n
+
+
+def _cell(x, y):
+    if not (0 <= x < SIZE and 0 <= y < SIZE):
+        raise ValueError((x, y))
+    return x * SIZE + y
+
+
+def _put_fleet(out, cells):
+    # cells: iterable of (x, y, ship name)
+    masks = [0] * len(SHIP_NAMES)
+    for x, y, name in cells:
+        masks[SHIP_IDS[name]] |= 1 << _cell(x, y)
+    out.append(sum(1 << i for i, m in enumerate(masks) if m))
+    for m in masks:
+        if m:
+            out += m.to_bytes(MASK_BYTES, "big")
+
+
+def _get_fleet(buf, i):
+    # returns ({cell index: ship name}, next offset)
+    present = buf[i]
+    i += 1
+    cells = {}
+    for ship_id, name in enumerate(SHIP_NAMES):
+        if present >> ship_id & 1:
+            mask = int.from_bytes(buf[i : i + MASK_BYTES], "big")
+            i += MASK_BYTES
+            while mask:
+                low = mask & -mask
+                cells[low.bit_length() - 1] = name
+                mask ^= low
+    return cells, i
+
+
+def _put_id(out, payload):
+    _put_str(out, payload)
+
+
+def _get_id(buf, i):
+    return {"category": "ID", "payload": _get_str(buf, i)[0]}
+
+
+def _put_board(out, payload):
+    turn, layout, opponent, name, avatar = payload
+    if len(layout) != SIZE or any(len(column) != SIZE for column in layout):
+        raise ValueError("layout must be 10x10")
+    out.append(1 if turn else 0)
+    _put_fleet(
+        out,
+        ((x, y, sq["ship"]) for x, column in enumerate(layout) for y, sq in enumerate(column) if sq["ship"]),
+    )
+    _put_fleet(out, opponent)
+    _put_str(out, name)
+    out.append(avatar)
+
+
+def _get_board(buf, i):
+    turn = bool(buf[i])
+    own, i = _get_fleet(buf, i + 1)
+    opponent, i = _get_fleet(buf, i)
+    name, i = _get_str(buf, i)
+    layout = [[{"ship": own.get(x * SIZE + y)} for y in range(SIZE)] for x in range(SIZE)]
+    ships = [[c // SIZE, c % SIZE, opponent[c]] for c in sorted(opponent)]
+    return {"category": "BOARD", "payload": [turn, layout, ships, name, buf[i]]}
+
+
+def _put_position(out, payload):
+    x, y = payload
+    out.append(_cell(x, y))
+
+
+def _get_position(buf, i):
+    return {"category": "POSITION", "payload": [buf[i] // SIZE, buf[i] % SIZE]}
+
+
+def _put_chat(out, payload):
+    _put_str(out, payload)
+
+
+def _get_chat(buf, i):
+    return {"category": "CHAT", "payload": _get_str(buf, i)[0]}
+
+
+def _put_game_over(out, payload):
+    if not set(payload) <= {"by", "reason"}:
+        raise ValueError(payload)
+    by, reason = payload.get("by"), payload.get("reason")
+    out.append((by is not None) | ("by" in payload) << 1 | (reason is not None) << 2)
+    if by is not None:
+        _put_str(out, by)
+    if reason is not None:
+        _put_str(out, reason)
+
+
+def _get_game_over(buf, i):
+    flags = buf[i]
+    i += 1
+    payload = {}
+    if flags & 2:
+        payload["by"] = None
+    if flags & 1:
+        payload["by"], i = _get_str(buf, i)
+    if flags & 4:
+        payload["reason"], i = _get_str(buf, i)
+    return {"category": "GAME_OVER", "payload": payload}
+
+
+def _put_rematch_status(out, payload):
+    if set(payload) != {"offers"}:
+        raise ValueError(payload)
+    offers = payload["offers"]
+    out.append(len(offers))
+    for name in offers:
+        _put_str(out, name)
+
+
+def _get_rematch_status(buf, i):
+    offers = []
+    count = buf[i]
+    i += 1
+    for _ in range(count):
+        name, i = _get_str(buf, i)
+        offers.append(name)
+    return {"category": "REMATCH_STATUS", "payload": {"offers": offers}}
+
+
+def _put_result(out, payload):
+    if set(payload) != {"position", "hit", "sunk", "cells", "win"}:
+        raise ValueError(payload)
+    x, y = payload["position"]
+    sunk = payload["sunk"]
+    out.append(_cell(x, y))
+    out.append(bool(payload["hit"]) | bool(payload["win"]) << 1 | (sunk is not None) << 2)
+    if sunk is not None:
+        _put_fleet(out, ((cx, cy, sunk) for cx, cy in payload["cells"]))
+
+
+def _get_result(buf, i):
+    position, flags = buf[i], buf[i + 1]
+    sunk, cells = None, []
+    if flags & 4:
+        fleet, _ = _get_fleet(buf, i + 2)
+        sunk = next(iter(fleet.values()))
+        cells = [[c // SIZE, c % SIZE] for c in sorted(fleet)]
+    payload = {
+        "position": [position // SIZE, position % SIZE],
+        "hit": bool(flags & 1),
+        "sunk": sunk,
+        "cells": cells,
+        "win": bool(flags & 2),
+    }
+    return {"category": "RESULT", "payload": payload}
+
+
+_TYPES = {
+    "ID": ID,
+    "BOARD": BOARD,
+    "POSITION": POSITION,
+    "CHAT": CHAT,
+    "GAME_OVER": GAME_OVER,
+    "REMATCH_STATUS": REMATCH_STATUS,
+    "RESULT": RESULT,
+}
+_ENCODERS = {
+    "ID": _put_id,
+    "BOARD": _put_board,
+    "POSITION": _put_position,
+    "CHAT": _put_chat,
+    "GAME_OVER": _put_game_over,
+    "REMATCH_STATUS": _put_rematch_status,
+    "RESULT": _put_result,
+}
+_DECODERS = {
+    ID: _get_id,
+    BOARD: _get_board,
+    POSITION: _get_position,
+    CHAT: _get_chat,
+    GAME_OVER: _get_game_over,
+    REMATCH_STATUS: _get_rematch_status,
+    RESULT: _get_result,
+}
@@ -0,0 +1,180 @@
+"""A 10x10 board kept in flat byte arrays instead of 100 dicts.
+
+Each square field (ship, shot, colors...) is one ``bytearray`` indexed by
+``x * rows + y``, holding a small code into a per-board table of values, so
+``None``/names/colors cost a byte per square. A field that was never set
+has no array at all: a server board only ever stores its ships. Square
+rects are worked out from the board origin.
+
+``board[x][y]`` still behaves like the old ``make_grid`` dicts
+(``square["ship"]``, ``.get("aimed")``, assignment), so code can move to
+the direct accessors one loop at a time.
+"""
+
+SIZE = 10
+# Square fields and the value of a square that never had one set
+FIELDS = {
+    "ship": None,
+    "aimed": False,
+    "perma_color": None,
+    "color": None,
+    "empty": 1,
+}
+
+
+class Board:
+    __slots__ = ("origin", "columns", "rows", "cell", "_data", "_tables", "_columns")
+
+    def __init__(self, origin=(0, 0), columns=SIZE, rows=SIZE, cell=35, color=None):
+        self.origin = tuple(origin)
+        self.columns = columns
+        self.rows = rows
+        self.cell = cell
+        # field -> bytearray of codes, created on the first write
+        self._data = {}
+        # field -> values the codes stand for; code 0 is the default
+        self._tables = {}
+        if color is not None:
+            self._tables["color"] = [color]
+        self._columns = None
+
+    def index(self, x, y):
+        return x * self.rows + y
+
+    def rect(self, x, y):
+        size = self.cell
+        return (self.origin[0] + x * size, self.origin[1] + y * size, size, size)
+
+    def get(self, x, y, field):
+        data = self._data.get(field)
+        if data is not None:
+            return self._tables[field][data[x * self.rows + y]]
+        if field == "rect":
+            return self.rect(x, y)
+        return self._table(field)[0]
+
+    def set(self, x, y, field, value):
+        if field == "rect":
+            raise ValueError("square rects follow from the board origin")
+        table = self._table(field)
+        try:
+            code = table.index(value)
+        except ValueError:
+            if len(table) == 256:
+                raise ValueError(f"too many distinct {field!r} values on one board") from None
+            code = len(table)
+            table.append(value)
+        data = self._data.get(field)
+        if data is None:
+            data = self._data[field] = bytearray(self.columns * self.rows)
+        data[x * self.rows + y] = code
+
+    def ship_at(self, x, y):
+        return self.get(x, y, "ship")
+
+    def place(self, name, cells):
+        for x, y in cells:
+            self.set(x, y, "ship", name)
+
+    def values(self, *fields):
+        """One tuple of ``fields`` per square, column by column."""
+        n = self.columns * self.rows
+        columns = []
+        for field in fields:
+            table = self._table(field)
+            data = self._data.get(field)
+            columns.append([table[0]] * n if data is None else [table[code] for code in data])
+        return zip(*columns)
+
+    def array(self, field):
+        """The codes of ``field`` as a writable (columns, rows) NumPy view; 0 is the default."""
+        import numpy as np
+
+        data = self._data.get(field)
+        if data is None:
+            self._table(field)
+            data = self._data[field] = bytearray(self.columns * self.rows)
+        return np.frombuffer(data, dtype=np.uint8).reshape(self.columns, self.rows)
+
+    def to_list(self, fields=tuple(FIELDS) + ("rect",)):
+        """The board as ``make_grid`` used to build it, for JSON payloads."""
+        return [[{field: self.get(x, y, field) for field in fields} for y in range(self.rows)] for x in range(self.columns)]
+
+    def _table(self, field):
+        table = self._tables.get(field)
+        if table is None:
+            if field not in FIELDS:
+                raise KeyError(field)
+            table = self._tables[field] = [FIELDS[field]]
+        return table
+
+    # Compatibility with the list-of-dicts grids: board[x][y]["ship"]
+    def __len__(self):
+        return self.columns
+
+    def __getitem__(self, x):
+        return self._view()[x]
+
+    def __iter__(self):
+        return iter(self._view())
+
+    def _view(self):
+        # Built on first use, so boards nobody indexes (the server's) stay small
+        if self._columns is None:
+            self._columns = [Column(self, x) for x in range(self.columns)]
+        return self._columns
+
+
+class Column:
+    __slots__ = ("squares",)
+
+    def __init__(self, board, x):
+        self.squares = [Square(board, x, y) for y in range(board.rows)]
+
+    def __len__(self):
+        return len(self.squares)
+
+    def __getitem__(self, y):
+        return self.squares[y]
+
+    def __iter__(self):
+        return iter(self.squares)
+
+
+class Square:
+    """One square of a ``Board``, read and written like a ``make_grid`` dict."""
+
+    __slots__ = ("board", "x", "y", "i")
+
+    def __init__(self, board, x, y):
+        self.board = board
+        self.x = x
+        self.y = y
+        self.i = board.index(x, y)
+
+    def __getitem__(self, field):
+        board = self.board
+        data = board._data.get(field)
+        if data is not None:
+            return board._tables[field][data[self.i]]
+        return board.get(self.x, self.y, field)
+
+    def __setitem__(self, field, value):
+        self.board.set(self.x, self.y, field, value)
+
+    def get(self, field, default=None):
+        try:
+            return self.board.get(self.x, self.y, field)
+        except KeyError:
+            return default
+
+    def keys(self):
+        return ("rect", *FIELDS)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+
+def make_grid(sx, ex, sy, ey, color, size=35):
+    """A board covering the pixel box (sx, sy)-(ex, ey) in ``size`` squares."""
+    return Board((sx, sy), len(range(sx, ex, size)), len(range(sy, ey, size)), size, color)
@@ -0,0 +1,110 @@
+import json
+
+from common import binproto
+
+# Every message is a 4-byte big-endian length followed by the payload
+HEADER = 4
+# Longest payload accepted; a bigger length in a header closes the connection
+MAX_FRAME = 1 << 20
+
+
+def encode(data, binary=False):
+    data = binproto.dumps(data) if binary else json.dumps(data).encode()
+    return len(data).to_bytes(HEADER, "big") + data
+
+
+def decode(payload):
+    # A frame is binary or JSON on its own, whatever the connection negotiated
+    if binproto.is_binary(payload):
+        return binproto.loads(payload)
+    return json.loads(str(payload, "utf-8"))
+
+
+class FrameReader:
+    """Buffered reader for length-prefixed frames.
+
+    Reads with ``recv_into`` straight into one reusable ``bytearray`` and hands
+    out every complete frame a single ``recv`` delivered before reading again.
+    Headers split across reads are kept until the rest arrives. A header
+    longer than ``MAX_FRAME`` raises ``ConnectionError``, and a buffer grown
+    for a big frame goes back to ``size`` once it has been read.
+    """
+
+    def __init__(self, size=8192):
+        self._size = size
+        self._buf = bytearray(size)
+        self._view = memoryview(self._buf)
+        self._start = 0
+        self._end = 0
+
+    def next_frame(self):
+        """Pop the next complete payload, or ``None`` if there is none yet.
+
+        The payload is a ``memoryview`` into the buffer and is only valid
+        until the next call.
+        """
+        available = self._end - self._start
+        if available < HEADER:
+            return None
+        n = int.from_bytes(self._view[self._start : self._start + HEADER], "big")
+        if n > MAX_FRAME:
+            raise ConnectionError(f"frame of {n} bytes is over MAX_FRAME")
+        if available < HEADER + n:
+            self._reserve(HEADER + n)
+            return None
+        begin = self._start + HEADER
+        self._start = begin + n
+        payload = self._view[begin : self._start]
+        if self._start == self._end:
+            self._start = self._end = 0
+        return payload
+
+    def fill(self, sock):
+        """One ``recv_into`` from ``sock``; returns the byte count (0 on EOF)."""
+        if not self._end and len(self._buf) > self._size:
+            # Nothing pending and the last payload handed out is no longer valid
+            self._buf = bytearray(self._size)
+            self._view = memoryview(self._buf)
+        if self._end == len(self._buf):
+            self._reserve(self._end - self._start + 1)
+        n = sock.recv_into(self._view[self._end :])
+        self._end += n
+        return n
+
+    def read(self, sock):
+        while (payload := self.next_frame()) is None:
+            if not self.fill(sock):
+                raise ConnectionResetError("connection closed by peer")
+        return payload
+
+    def receive(self, sock):
+        return decode(self.read(sock))
+
+    def take_pending(self):
+        """Remove and return the bytes read past the last frame handed out."""
+        data = bytes(self._view[self._start : self._end])
+        self._start = self._end = 0
+        return data
+
+    def feed(self, data):
+        """Queue ``data`` as if it had been read from the socket."""
+        self._reserve(self._end - self._start + len(data))
+        self._view[self._end : self._end + len(data)] = data
+        self._end += len(data)
+
+    def _reserve(self, size):
+        # Make sure `size` bytes fit from the start of the pending data
+        if self._start + size <= len(self._buf):
+            return
+        pending = self._end - self._start
+        if size > len(self._buf):
+            # Room for a few frames this size, so big ones don't force a
+            # compaction on every read
+            old = self._view
+            self._buf = bytearray(max(4 * size, 2 * len(self._buf)))
+            self._view = memoryview(self._buf)
+            self._view[:pending] = old[self._start : self._end]
+            old.release()
+        else:
+            self._view[:pending] = self._view[self._start : self._end]
+        self._start, self._end = 0, pending
@@ -0,0 +1,108 @@
+"""Fleet layouts packed into integers, served from a pre-filled pool.
+
+A ship placement is one byte: the start cell ``x * 10 + y`` shifted left by
+one, plus 1 for a vertical ship (growing along y). A layout packs one byte
+per ship in ``SHIPS`` order into a single integer, so the pool is a flat
+``array("Q")``.
+"""
+import random
+from array import array
+from threading import Event, Lock, Thread
+
+SHIPS = {
+    "Carrier": 5,
+    "Battleship": 4,
+    "Cruiser": 3,
+    "Submarine": 3,
+    "Destroyer": 2,
+}
+SIZE = 10
+
+
+def _placements(length):
+    # Every in-bounds placement of a ship as (cell mask, placement byte)
+    out = []
+    for vertical in (0, 1):
+        dx, dy = (0, 1) if vertical else (1, 0)
+        for x in range(SIZE - dx * (length - 1)):
+            for y in range(SIZE - dy * (length - 1)):
+                mask = 0
+                for i in range(length):
+                    mask |= 1 << ((x + dx * i) * SIZE + y + dy * i)
+                out.append((mask, (x * SIZE + y) << 1 | vertical))
+    return out
+
+
+PLACEMENTS = {length: _placements(length) for length in set(SHIPS.values())}
+# Placement byte -> cell mask, per ship in SHIPS order
+MASKS = [{byte: mask for mask, byte in PLACEMENTS[length]} for length in SHIPS.values()]
+
+
+def sample():
+    """One random layout, ships placed one by one and retried on overlap."""
+    taken = 0
+    code = 0
+    for i, length in enumerate(SHIPS.values()):
+        options = PLACEMENTS[length]
+        while True:
+            mask, byte = random.choice(options)
+            if not taken & mask:
+                break
+        taken |= mask
+        code |= byte << (8 * i)
+    return code
+
+
+def ship_cells(code):
+    """Yield (ship name, [(x, y), ...]) for a packed layout."""
+    for i, (name, length) in enumerate(SHIPS.items()):
+        byte = code >> (8 * i) & 0xFF
+        start, vertical = byte >> 1, byte & 1
+        x, y = divmod(start, SIZE)
+        dx, dy = (0, 1) if vertical else (1, 0)
+        yield name, [(x + dx * j, y + dy * j) for j in range(length)]
+
+
+def ship_masks(code):
+    return {name: MASKS[i][code >> (8 * i) & 0xFF] for i, name in enumerate(SHIPS)}
+
+
+class PlacementPool:
+    """Pre-sampled layouts; ``draw()`` pops one and a daemon thread tops the
+    pool back up once it falls below ``low``."""
+
+    def __init__(self, size=4096, low=1024):
+        self.size = size
+        self.low = low
+        self.layouts = array("Q")
+        self.lock = Lock()
+        self.wanted = Event()
+        self.thread = None
+
+    def draw(self):
+        with self.lock:
+            code = self.layouts.pop() if self.layouts else None
+            short = len(self.layouts) < self.low
+        if short:
+            self.refill()
+        return sample() if code is None else code
+
+    def refill(self):
+        if self.thread is None:
+            with self.lock:
+                if self.thread is None:
+                    self.thread = Thread(target=self._fill, daemon=True)
+                    self.thread.start()
+        self.wanted.set()
+
+    def _fill(self):
+        while True:
+            self.wanted.wait()
+            self.wanted.clear()
+            while len(self.layouts) < self.size:
+                batch = array("Q", (sample() for _ in range(256)))
+                with self.lock:
+                    self.layouts.extend(batch)
+
+
+pool = PlacementPool()
@@ -1,8 +1,84 @@
-from server.network import Network
+import argparse
+import os
+
+parser = argparse.ArgumentParser(prog="python -m server")
+parser.add_argument(
+    "--engine",
+    choices=("thread", "asyncio"),
+    default=os.getenv("SERVER_ENGINE", "thread"),
+    help="thread-per-connection (default) or a single asyncio event loop",
+)
+parser.add_argument(
+    "--workers",
+    type=int,
+    default=int(os.getenv("SERVER_WORKERS", "1")),
+    help="number of worker processes sharing the port (Linux, at most 26)",
+)
+parser.add_argument(
+    "--metrics-port",
+    type=int,
+    default=int(os.getenv("SERVER_METRICS_PORT", "0")),
+    help="serve Prometheus-style metrics on this localhost port (worker N uses port + N)",
+)
+parser.add_argument(
+    "--replay-dir",
+    default=os.getenv("SERVER_REPLAY_DIR", ""),
+    help="record every match as a replay in this directory (see server/replay.py)",
+)
+parser.add_argument(
+    "--stats-db",
+    default=os.getenv("SERVER_STATS_DB", ""),
+    help="keep player stats and the leaderboard in this SQLite file (see server/stats.py)",
+)
+parser.add_argument(
+    "--resume-grace",
+    type=float,
+    default=float(os.getenv("SERVER_RESUME_GRACE", "30")),
+    help="seconds to keep the seat of a player who dropped mid-match for RESUME; 0 turns it off",
+)
+parser.add_argument(
+    "--heartbeat",
+    type=float,
+    default=float(os.getenv("SERVER_HEARTBEAT", "10")),
+    help="PING clients that have been quiet this many seconds; 0 turns heartbeats off",
+)
+parser.add_argument(
+    "--idle-timeout",
+    type=float,
+    default=float(os.getenv("SERVER_IDLE_TIMEOUT", "30")),
+    help="disconnect clients quiet for this many seconds (checked every heartbeat); 0 never does",
+)
+parser.add_argument(
+    "--turn-seconds",
+    type=float,
+    default=float(os.getenv("SERVER_TURN_SECONDS", "0")),
+    help="shot clock: a player who does not fire in time loses the match; 0 turns it off",
+)
+args = parser.parse_args()
+if not 1 <= args.workers <= 26:
+    parser.error("--workers must be between 1 and 26")
+# Read by Network, also in worker processes
+os.environ["SERVER_METRICS_PORT"] = str(args.metrics_port)
+os.environ["SERVER_REPLAY_DIR"] = args.replay_dir
+os.environ["SERVER_STATS_DB"] = args.stats_db
+os.environ["SERVER_RESUME_GRACE"] = str(args.resume_grace)
+os.environ["SERVER_HEARTBEAT"] = str(args.heartbeat)
+os.environ["SERVER_IDLE_TIMEOUT"] = str(args.idle_timeout)
+os.environ["SERVER_TURN_SECONDS"] = str(args.turn_seconds)
+
+if args.engine == "asyncio":
+    from server.aio import AsyncNetwork as Network
+else:
+    from server.network import Network
 
 print("Started server...")
 try:
-    Network()
+    if args.workers > 1:
+        from server.shard import serve
+
+        serve(args.workers, args.engine)
+    else:
+        Network()
 except KeyboardInterrupt:
     print("Interrupt signal received... Closing server")
     exit()
@@ -0,0 +1,146 @@
+import asyncio
+from time import monotonic
+
+from common.framing import HEADER, MAX_FRAME, decode, encode
+from server.ids import RoomIds
+from server.matchmaking import Matchmaker
+from server.metrics import metrics
+from server.network import Network, ServerPlayer
+from server.outbox import HIGH_WATER, schedule
+from server.replay import ReplayLog
+from server.stats import StatsStore
+from server.timers import TimingWheel
+from server.rooms import RoomRegistry
+
+
+class StreamConnection:
+    """Per-client connection for the asyncio engine.
+
+    Mirrors the ``send``/``close`` interface of ``Network`` so the shared
+    message handlers don't need to know which engine is running them. Frames
+    queued while handling a message are handed to the transport together;
+    a client whose transport buffer passes ``HIGH_WATER`` is dropped.
+    """
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.binary = False
+        self.frames = []
+        self.last_seen = monotonic()
+
+    async def receive(self):
+        n = int.from_bytes(await self.reader.readexactly(HEADER), "big")
+        if n > MAX_FRAME:
+            raise ConnectionError(f"frame of {n} bytes is over MAX_FRAME")
+        payload = await self.reader.readexactly(n)
+        self.last_seen = monotonic()
+        metrics.inc("bytes_received_total", HEADER + n)
+        return decode(payload)
+
+    def take_pending(self):
+        """Remove and return the bytes read past the last frame received."""
+        # StreamReader has no public call for this; its buffer is a bytearray
+        rest = bytes(self.reader._buffer)
+        self.reader._buffer.clear()
+        return rest
+
+    def send(self, *data):
+        if len(data) == 1:
+            data = data[0]
+        frame = encode(data, self.binary)
+        if self.send_frame(frame):
+            metrics.inc("messages_sent_total")
+            metrics.inc("bytes_sent_total", len(frame))
+
+    def send_frame(self, frame):
+        transport = self.writer.transport
+        if transport.is_closing():
+            return False
+        if transport.get_write_buffer_size() + len(frame) > HIGH_WATER:
+            metrics.inc("slow_consumers_total")
+            transport.abort()
+            return False
+        self.frames.append(frame)
+        schedule(self)
+        return True
+
+    def flush(self):
+        if self.frames and not self.writer.transport.is_closing():
+            self.writer.writelines(self.frames)
+            metrics.inc("send_calls_total")
+        self.frames = []
+
+    def close(self):
+        self.frames = []
+        self.writer.close()
+
+    def abort(self):
+        self.frames = []
+        self.writer.transport.abort()
+
+
+class AsyncNetwork(Network):
+    """Single event loop server; one task per client instead of one thread."""
+
+    def __init__(self, shard=None):
+        self.rooms = RoomRegistry()
+        self.shard = shard
+        self.ids = RoomIds(shard.letters) if shard else RoomIds()
+        self.matchmaker = Matchmaker()
+        self.replays = ReplayLog(self.replay_dir) if self.replay_dir else None
+        self.stats_store = StatsStore(self.stats_db) if self.stats_db else None
+        self.sessions = {}
+        asyncio.run(self.wait_for_connection())
+
+    async def wait_for_connection(self):
+        self.loop = asyncio.get_running_loop()
+        # Callbacks are handed to the loop, so they run on its thread
+        self.timers = TimingWheel(dispatch=self.loop.call_soon_threadsafe)
+        server = await asyncio.start_server(
+            self.proceed_with_connection, *self.address, reuse_port=bool(self.shard)
+        )
+        if self.shard:
+            self.shard.listen(self.adopt)
+        self.start_metrics()
+        async with server:
+            await server.serve_forever()
+
+    async def proceed_with_connection(self, reader, writer):
+        print("Connected to: ", writer.get_extra_info("peername"))
+        await self.serve_player(ServerPlayer(StreamConnection(reader, writer)))
+
+    def adopt(self, sock, data, rest=b""):
+        # Called from the shard listener thread
+        asyncio.run_coroutine_threadsafe(self.adopt_connection(sock, data, rest), self.loop)
+
+    async def adopt_connection(self, sock, data, rest):
+        # asyncio.open_connection(), with the bytes read by the other shard
+        # in the buffer before the transport can read anything newer
+        reader = asyncio.StreamReader()
+        reader.feed_data(rest)
+        protocol = asyncio.StreamReaderProtocol(reader)
+        transport, _ = await self.loop.create_connection(lambda: protocol, sock=sock)
+        writer = asyncio.StreamWriter(transport, protocol, reader, self.loop)
+        player = ServerPlayer(StreamConnection(reader, writer))
+        self.handle(player, data)
+        await self.serve_player(player)
+
+    def hand_off(self, player, data, index=None):
+        self.shard.hand_off(player.conn.writer.get_extra_info("socket"), data, index, player.conn.take_pending())
+        player.handed_off = True
+        player.conn.close()
+
+    async def serve_player(self, player):
+        metrics.inc("connections_opened_total")
+        self.watch(player)
+        while not player.handed_off:
+            try:
+                data = await player.conn.receive()
+                if not data:
+                    break
+                self.handle(player, data)
+            except Exception:
+                break
+        self.disconnect(player)
+        metrics.inc("connections_closed_total")
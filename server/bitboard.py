@@ -0,0 +1,44 @@
+SIZE = 10
+
+
+def cell(x, y):
+    return x * SIZE + y
+
+
+class BitBoard:
+    """One player's fleet and the shots fired at it, as 100-bit integers.
+
+    Bit ``x * 10 + y`` stands for cell (x, y). Each ship has its own mask, so
+    resolving a shot, checking a sink or the whole fleet is a few bit ops.
+    """
+
+    def __init__(self, ships):
+        # ships: {name: mask}, e.g. common.placement.ship_masks(code)
+        self.ships = ships
+        self.fleet = 0
+        for mask in self.ships.values():
+            self.fleet |= mask
+        self.shots = 0
+
+    def fire(self, x, y):
+        """Shoot at (x, y). Returns (hit, sunk ship name or None, fleet destroyed),
+        or None if the cell is off the board or was already shot."""
+        if not (0 <= x < SIZE and 0 <= y < SIZE):
+            return None
+        bit = 1 << cell(x, y)
+        if self.shots & bit:
+            return None
+        self.shots |= bit
+        if not self.fleet & bit:
+            return False, None, False
+        sunk = None
+        for name, mask in self.ships.items():
+            if mask & bit:
+                if not mask & ~self.shots:
+                    sunk = name
+                break
+        return True, sunk, not self.fleet & ~self.shots
+
+    def cells(self, name):
+        mask = self.ships[name]
+        return [[i // SIZE, i % SIZE] for i in range(SIZE * SIZE) if mask >> i & 1]
@@ -0,0 +1,107 @@
+"""Room codes from a keyed permutation of a counter.
+
+Codes are six lowercase letters. Code number ``n`` is the ``n``-th value of
+a Feistel permutation over all codes whose round functions are tables of
+random numbers drawn at startup. Every allocation is one counter bump and a
+few lookups, no two codes repeat until the whole space has been handed out,
+and without the tables the next code can't be told from the previous ones.
+
+Once the counter runs out it starts over on a fresh permutation, skipping
+codes still in use and codes freed less than ``grace`` seconds ago, so a
+stale code never leads into somebody else's new room.
+"""
+import hashlib
+import secrets
+import string
+import time
+from array import array
+from collections import OrderedDict
+from threading import Lock
+
+LETTERS = string.ascii_lowercase
+# Letters after the first one
+TAIL = 5
+# The last five letters are spelled as a pair and a triple looked up here
+PAIRS = [a + b for a in LETTERS for b in LETTERS]
+TRIPLES = [a + b for a in LETTERS for b in PAIRS]
+
+
+class RoomIds:
+    def __init__(self, first=LETTERS, grace=600.0, key=None, rounds=4):
+        if rounds % 2:
+            raise ValueError("rounds must be even")
+        # First letters to use; a shard worker only gets its own
+        self.first = "".join(first)
+        self.grace = grace
+        self.rounds = rounds
+        self.tail = len(LETTERS) ** TAIL
+        self.size = len(self.first) * self.tail
+        # Code numbers split in two for the Feistel rounds: size = high * low
+        self.low = len(LETTERS) ** 3
+        self.high = self.size // self.low
+        # ``key`` makes the permutation reproducible (tests); by default it's secret
+        self.key = key
+        self.epoch = 0
+        self._shuffle()
+        self._live = set()
+        # code -> when it was freed, oldest first
+        self._recent = OrderedDict()
+        self._lock = Lock()
+
+    def allocate(self):
+        with self._lock:
+            self._forget_old()
+            if len(self._live) + len(self._recent) >= self.size:
+                raise RuntimeError("no room codes left")
+            while True:
+                if self._next == self.size:
+                    self.epoch += 1
+                    self._shuffle()
+                code = self.code(self.permute(self._next))
+                self._next += 1
+                # Taken codes only come up after the first pass over all codes
+                if not self.epoch or (code not in self._live and code not in self._recent):
+                    break
+            self._live.add(code)
+            return code
+
+    def release(self, code):
+        with self._lock:
+            if code in self._live:
+                self._live.remove(code)
+                self._recent[code] = time.monotonic()
+
+    def _forget_old(self):
+        if not self._recent:
+            return
+        cutoff = time.monotonic() - self.grace
+        while self._recent and next(iter(self._recent.values())) <= cutoff:
+            self._recent.popitem(last=False)
+
+    def _shuffle(self):
+        # One table per round, indexed by the half that goes in unchanged
+        key = (self.key or secrets.token_bytes(32)) + self.epoch.to_bytes(4, "big")
+        self.tables = []
+        for r in range(self.rounds):
+            n = self.low if r % 2 == 0 else self.high
+            table = array("I")
+            table.frombytes(hashlib.shake_256(key + bytes([r])).digest(n * table.itemsize))
+            self.tables.append(table)
+        self._next = 0
+
+    def permute(self, n):
+        """Keyed bijection of range(size), a Feistel network on (high, low) halves."""
+        left, right = divmod(n, self.low)
+        m_left, m_right = self.high, self.low
+        for table in self.tables:
+            # (left, right) in Z_m_left x Z_m_right -> (right, left + F(right)),
+            # which lives in Z_m_right x Z_m_left; an even number of rounds
+            # ends back in the original shape
+            left, right = right, (left + table[right]) % m_left
+            m_left, m_right = m_right, m_left
+        return left * self.low + right
+
+    def code(self, value):
+        head, tail = divmod(value, self.tail)
+        pair, triple = divmod(tail, len(TRIPLES))
+        return self.first[head] + PAIRS[pair] + TRIPLES[triple]
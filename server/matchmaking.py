@@ -0,0 +1,77 @@
+"""Quick-play pairing without room codes.
+
+Players waiting for a match sit in a FIFO per skill bucket. ``enqueue`` pairs
+a newcomer with whoever has waited longest in its bucket, or queues it if
+there is nobody. Leaving the queue only empties the player's entry; the
+entry is thrown away when it reaches the front, or when stale entries
+outnumber waiting players and the queues are compacted, so every operation
+is O(1) (amortized) however many players are waiting.
+"""
+from collections import deque
+from threading import Lock
+
+
+class Matchmaker:
+    def __init__(self, bucket_width=200):
+        # Players rated within the same ``bucket_width`` band are paired;
+        # unrated players all share one queue
+        self.bucket_width = bucket_width
+        self._queues = {}
+        self._lock = Lock()
+        self.waiting = 0
+        # Queue entries, those of players who left included
+        self._entries = 0
+
+    def bucket(self, rating):
+        return None if rating is None else int(rating) // self.bucket_width
+
+    def enqueue(self, player, rating=None):
+        """Pair ``player`` with the longest waiting player in its bucket.
+
+        Returns that opponent, or None if ``player`` now waits (or already did).
+        """
+        key = self.bucket(rating)
+        with self._lock:
+            if getattr(player, "queued", None):
+                return None
+            queue = self._queues.get(key)
+            while queue:
+                opponent = queue.popleft()[0]
+                self._entries -= 1
+                # None: the player left the queue after joining it
+                if opponent is not None:
+                    opponent.queued = None
+                    self.waiting -= 1
+                    return opponent
+            if queue is None:
+                queue = self._queues[key] = deque()
+            # A one-item list, so leaving can empty it wherever it is in the queue
+            player.queued = [player]
+            queue.append(player.queued)
+            self._entries += 1
+            self.waiting += 1
+            return None
+
+    def cancel(self, player):
+        """Take ``player`` out of the queue; True if it was waiting."""
+        with self._lock:
+            entry = getattr(player, "queued", None)
+            if not entry:
+                return False
+            entry[0] = player.queued = None
+            self.waiting -= 1
+            if self._entries > 2 * self.waiting + 64:
+                self._compact()
+            return True
+
+    def _compact(self):
+        for key, queue in list(self._queues.items()):
+            kept = deque(entry for entry in queue if entry[0] is not None)
+            if kept:
+                self._queues[key] = kept
+            else:
+                del self._queues[key]
+        self._entries = self.waiting
+
+    def __len__(self):
+        return self.waiting
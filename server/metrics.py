@@ -0,0 +1,180 @@
+"""Server counters and message timings, served in the Prometheus text format.
+
+Every thread updates its own counters without taking a lock; a scrape adds
+the per-thread values up. A connection thread of the thread engine folds its
+counters into a shared total with ``retire()`` when it ends, so the list of
+threads to read stays as long as the list of open connections.
+
+    python -m server --metrics-port 9100
+    curl localhost:9100/metrics
+"""
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PREFIX = "battleship_"
+
+COUNTERS = {
+    "connections_opened_total": "Client connections accepted or adopted from another shard",
+    "connections_closed_total": "Client connections closed or handed to another shard",
+    "rooms_created_total": "Rooms created with CREATE",
+    "queue_matches_total": "Rooms opened by pairing two QUEUE players",
+    "matches_started_total": "Boards dealt, rematches included",
+    "matches_finished_total": "Matches that reached GAME_OVER",
+    "rematches_total": "Rematches both players agreed to",
+    "surrenders_total": "SURRENDER or FORFEIT messages in a room",
+    "messages_sent_total": "Frames sent to clients",
+    "send_calls_total": "Socket writes carrying queued frames",
+    "slow_consumers_total": "Clients cut off for letting too much unsent data pile up",
+    "replay_records_total": "Match replay records written to disk",
+    "replay_records_dropped_total": "Match replay records dropped because the writer fell behind",
+    "stats_results_total": "Match results saved to the stats database",
+    "stats_results_dropped_total": "Match results not saved (writer behind or database error)",
+    "stats_commits_total": "Stats database transactions",
+    "sessions_kept_total": "Seats kept for a player whose connection dropped mid-match",
+    "sessions_resumed_total": "Kept seats taken back with RESUME",
+    "sessions_expired_total": "Kept seats given up after the grace period",
+    "pings_sent_total": "PING heartbeats sent to quiet clients",
+    "idle_disconnects_total": "Clients disconnected after idle_timeout seconds without a message",
+    "turn_timeouts_total": "Matches lost on the shot clock",
+    "bytes_received_total": "Bytes read from clients, frame headers included",
+    "bytes_sent_total": "Bytes written to clients, frame headers included",
+}
+
+# Upper bounds (seconds) of the message handling time histogram
+BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.1)
+
+
+class _Counts:
+    """Counters and histograms written by a single thread."""
+
+    def __init__(self):
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        # category -> bucket counts (the last one is +Inf) followed by the sum
+        self.histograms = {}
+
+    def merge(self, other):
+        for name, value in other.counters.items():
+            self.counters[name] += value
+        # The owning thread may add a category meanwhile; dict.copy() holds the GIL
+        for category, values in other.histograms.copy().items():
+            mine = self.histograms.setdefault(category, [0] * len(values))
+            for i, value in enumerate(values):
+                mine[i] += value
+
+
+class Metrics:
+    def __init__(self):
+        self.labels = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._retired = _Counts()
+        self._gauges = {}
+
+    def _counts(self):
+        try:
+            return self._local.counts
+        except AttributeError:
+            counts = self._local.counts = _Counts()
+            with self._lock:
+                self._threads.append((threading.current_thread(), counts))
+            return counts
+
+    def retire(self):
+        """Fold the calling thread's counts into the total; call it last thing."""
+        counts = self._local.__dict__.pop("counts", None)
+        if counts is None:
+            return
+        with self._lock:
+            self._threads = [entry for entry in self._threads if entry[1] is not counts]
+            self._retired.merge(counts)
+
+    def inc(self, name, n=1):
+        self._counts().counters[name] += n
+
+    def observe(self, category, seconds):
+        histograms = self._counts().histograms
+        values = histograms.get(category)
+        if values is None:
+            values = histograms[category] = [0] * (len(BUCKETS) + 2)
+        values[bisect.bisect_left(BUCKETS, seconds)] += 1
+        values[-1] += seconds
+
+    def gauge(self, name, help, read):
+        """Report ``read()`` as gauge ``name`` on every scrape."""
+        self._gauges[name] = (help, read)
+
+    def snapshot(self):
+        total = _Counts()
+        with self._lock:
+            alive = []
+            for thread, counts in self._threads:
+                if thread.is_alive():
+                    alive.append((thread, counts))
+                else:
+                    self._retired.merge(counts)
+            self._threads = alive
+            total.merge(self._retired)
+        for _, counts in alive:
+            total.merge(counts)
+        return total
+
+    def render(self):
+        total = self.snapshot()
+        base = ",".join(f'{k}="{v}"' for k, v in self.labels.items())
+        labels = "{" + base + "}" if base else ""
+        lines = []
+        for name, help in COUNTERS.items():
+            lines += [f"# HELP {PREFIX}{name} {help}", f"# TYPE {PREFIX}{name} counter"]
+            lines.append(f"{PREFIX}{name}{labels} {total.counters[name]}")
+        c = total.counters
+        gauges = {
+            "connections_active": (
+                "Client connections currently open",
+                lambda: c["connections_opened_total"] - c["connections_closed_total"],
+            ),
+            **self._gauges,
+        }
+        for name, (help, read) in gauges.items():
+            lines += [f"# HELP {PREFIX}{name} {help}", f"# TYPE {PREFIX}{name} gauge"]
+            lines.append(f"{PREFIX}{name}{labels} {read()}")
+        name = PREFIX + "message_handling_seconds"
+        lines += [f"# HELP {name} Time spent handling one client message", f"# TYPE {name} histogram"]
+        for category in sorted(total.histograms):
+            values = total.histograms[category]
+            prefix = (base + "," if base else "") + f'category="{category}"'
+            seen = 0
+            for bound, count in zip(BUCKETS + ("+Inf",), values):
+                seen += count
+                lines.append(f'{name}_bucket{{{prefix},le="{bound}"}} {seen}')
+            lines.append(f"{name}_sum{{{prefix}}} {values[-1]}")
+            lines.append(f"{name}_count{{{prefix}}} {seen}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port, host="127.0.0.1"):
+        """Serve ``/metrics`` on a daemon thread."""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+metrics = Metrics()
@@ -1,27 +1,79 @@
-import json
 import socket
-import string
 import random
 import os
 from threading import Lock, Thread
+from time import monotonic, perf_counter
 
+from common import binproto
+from common.framing import HEADER, FrameReader, decode, encode
+from common.placement import pool, ship_masks
+from server.bitboard import BitBoard
+from server.ids import RoomIds
+from server.matchmaking import Matchmaker
+from server.metrics import metrics
+from server import replay
+from server.outbox import Outbox, batched
+from server.rooms import RoomRegistry
+from server.sessions import Backlog, new_token
+from server.stats import StatsStore
+from server.timers import TimingWheel
 from server.utils import layout_ships
 
-lock = Lock()
+# Client message categories the server handles; anything else is timed as "other"
+CATEGORIES = frozenset(
+    (
+        "OVER", "CREATE", "JOIN", "QUEUE", "SPECTATE", "POSITION",
+        "REMATCH_OFFER", "SURRENDER", "FORFEIT", "CHAT", "STATS", "LEADERBOARD",
+        "RESUME", "PING", "PONG",
+    )
+)
 
 
 class Room:
-    def __init__(self):
+    def __init__(self, replays=None, stats=None, timers=None, turn_seconds=0):
         self.players = []
         self.sent_board = False
         self.rematch_votes = set()
         self.game_over = False
         self._id = ""
+        # Connections watching with SPECTATE, in the order they came
+        self.spectators = {}
+        # Set once a player has left; nobody can start watching after that
+        self.closed = False
+        # server.replay.ReplayLog to record matches in, and the match running
+        self.replays = replays
+        self.match = None
+        # server.stats.StatsStore for results
+        self.stats = stats
+        # True from the deal until the match is decided
+        self.live = False
+        # server.timers.TimingWheel for the shot clock: a player who has not
+        # fired within turn_seconds loses the match (0 turns it off)
+        self.timers = timers
+        self.turn_seconds = turn_seconds
+        self.clock = None
+        # Turns started, so a clock that fires late can tell it is stale
+        self.turns = 0
+        # Held while changing the match; other rooms have their own
+        self.lock = Lock()
 
     def send_board(self):
         self.players[0].turn = random.choice((True, False))
         self.players[1].turn = not self.players[0].turn
-        self.players[0].layout, self.players[1].layout = layout_ships(), layout_ships()
+        codes = []
+        for player in self.players:
+            code = pool.draw()
+            codes.append(code)
+            player.code = code
+            player.layout = layout_ships(code)
+            player.board = BitBoard(ship_masks(code))
+        metrics.inc("matches_started_total")
+        # A rematch dealt before the last match was decided
+        self.end_match(None, replay.ABANDONED)
+        self.live = True
+        if self.replays:
+            first = 0 if self.players[0].turn else 1
+            self.match = self.replays.start(self._id, codes, first, [p.name for p in self.players])
         self.players[0].opponent, self.players[1].opponent = (
             self.players[1],
             self.players[0],
@@ -29,18 +81,14 @@ class Room:
         for player in self.players:
             opponent_name = player.opponent.name
             opponent_avatar = player.opponent.avatar
+            # Shots are resolved here, so the opponent's ships stay on the server
             player.conn.send(
                 {
                     "category": "BOARD",
                     "payload": [
                         player.turn,
-                        player.layout,
-                        [
-                            (xi, yi, square["ship"])
-                            for xi, x in enumerate(player.opponent.layout)
-                            for yi, square in enumerate(x)
-                            if square["ship"]
-                        ],
+                        player.layout.to_list(("ship",)),
+                        [],
                         opponent_name,
                         opponent_avatar,
                     ],
@@ -49,14 +97,187 @@ class Room:
         # Reset game_over/rematch state when starting a new board
         self.game_over = False
         self.rematch_votes.clear()
+        self.start_turn()
+        self.broadcast({"category": "SPECTATE", "payload": self.snapshot()})
+
+    def snapshot(self):
+        """What a spectator sees: the players and every shot fired so far."""
+        boards = []
+        for player in self.players:
+            board = player.board
+            if board is None:
+                continue
+            shots = [i for i in range(100) if board.shots >> i & 1]
+            boards.append(
+                {
+                    "name": player.name,
+                    "avatar": player.avatar,
+                    "turn": player.turn,
+                    # Shots fired at this player's fleet, as x * 10 + y
+                    "hits": [i for i in shots if board.fleet >> i & 1],
+                    "misses": [i for i in shots if not board.fleet >> i & 1],
+                    "sunk": [name for name, mask in board.ships.items() if not mask & ~board.shots],
+                }
+            )
+        return {"room": self._id, "boards": boards, "game_over": self.game_over}
+
+    def resume_snapshot(self, player):
+        """Where ``player`` stands, for a RESUME: cells as bits x * 10 + y."""
+        target = player.opponent.board
+        return {
+            "room": self._id,
+            # common.placement layout code of the player's own fleet
+            "layout": player.code,
+            "turn": player.turn,
+            "received": player.board.shots,
+            "fired": target.shots,
+            "hits": target.shots & target.fleet,
+            "sunk": {name: target.cells(name) for name, mask in target.ships.items() if not mask & ~target.shots},
+            "opponent": [player.opponent.name, player.opponent.avatar],
+            "game_over": self.game_over,
+        }
+
+    def broadcast(self, message):
+        # Encoded once per codec in use, then the same bytes are queued on
+        # every spectator's connection
+        frames = {}
+        sent = size = 0
+        for conn in self.spectators:
+            frame = frames.get(conn.binary)
+            if frame is None:
+                frame = frames[conn.binary] = encode(message, conn.binary)
+            if conn.send_frame(frame):
+                sent += 1
+                size += len(frame)
+        if sent:
+            metrics.inc("messages_sent_total", sent)
+            metrics.inc("bytes_sent_total", size)
+
+    def start_turn(self):
+        # Restart the shot clock for whoever is to fire
+        self.turns += 1
+        if self.clock:
+            self.clock.cancel()
+            self.clock = None
+        if self.timers and self.turn_seconds > 0 and self.live:
+            self.clock = self.timers.schedule(self.turn_seconds, self.turn_over, self.turns)
+
+    def turn_over(self, turn):
+        # The shot clock ran out: the player to fire forfeits
+        with self.lock:
+            if turn != self.turns or not self.live or self.game_over:
+                return
+            player = self.players[0] if self.players[0].turn else self.players[1]
+            winner = player.opponent
+            self.game_over = True
+            self.end_match(winner, replay.TIMEOUT)
+            metrics.inc("turn_timeouts_total")
+            metrics.inc("matches_finished_total")
+            message = {"category": "GAME_OVER", "payload": {"by": winner.name, "reason": "timeout"}}
+            with batched():
+                for p in list(self.players):
+                    p.conn.send(message)
+                self.broadcast(message)
+
+    def end_match(self, winner, reason):
+        # Records how the match ended, once; winner is a player or None
+        if not self.live:
+            return
+        self.live = False
+        if self.clock:
+            self.clock.cancel()
+            self.clock = None
+        if self.match:
+            self.match.end(self.players.index(winner) if winner in self.players else None, reason)
+        # Only results the server decided count; a client's word (OVER) never does
+        if self.stats and winner in self.players and reason != replay.OVER:
+            results = []
+            for player in self.players:
+                # What this player fired at the other fleet
+                board = player.opponent.board
+                surrendered = reason == replay.SURRENDER and player is not winner
+                shots = board.shots.bit_count()
+                hits = (board.shots & board.fleet).bit_count()
+                if player.name:
+                    results.append((player.name, player is winner, surrendered, shots, hits))
+            self.stats.record(results)
+
+    def end_spectating(self):
+        self.closed = True
+        self.broadcast("END")
+        self.spectators.clear()
+
+    def fire(self, player, position):
+        # Shots out of turn, malformed, off the board or repeated are ignored
+        target = player.opponent
+        if self.game_over or not player.turn or target is None:
+            return
+        if not isinstance(position, (list, tuple)) or len(position) != 2:
+            return
+        x, y = position
+        if not isinstance(x, int) or not isinstance(y, int):
+            return
+        result = target.board.fire(x, y)
+        if result is None:
+            return
+        hit, sunk, won = result
+        player.turn, target.turn = False, True
+        result = {
+            "position": [x, y],
+            "hit": hit,
+            "sunk": sunk,
+            "cells": target.board.cells(sunk) if sunk else [],
+            "win": won,
+        }
+        player.conn.send({"category": "RESULT", "payload": result})
+        target.conn.send({"category": "POSITION", "payload": [x, y]})
+        if self.spectators:
+            self.broadcast({"category": "SHOT", "payload": {**result, "by": player.name}})
+        if self.match:
+            self.match.shot(self.players.index(player), x, y, hit, sunk, won)
+        if not won:
+            self.start_turn()
+        if won:
+            self.game_over = True
+            self.end_match(player, replay.FLEET_DESTROYED)
+            metrics.inc("matches_finished_total")
+            message = {"category": "GAME_OVER", "payload": {"by": player.name}}
+            for p in list(self.players):
+                p.conn.send(message)
+            self.broadcast(message)
 
 
 class ServerPlayer:
     def __init__(self, conn, room=None):
         self.conn = conn
         self.room = room
+        # Room this connection is spectating, if any
+        self.watching = None
         self.name = ""
         self.avatar = 0
+        self.opponent = None
+        self.turn = False
+        self.board = None
+        # Skill rating for quick-play pairing; None pairs with anybody unrated
+        self.rating = None
+        # Queue entry while waiting for a quick-play match
+        self.queued = None
+        # Set when the connection was passed to the worker owning its room
+        self.handed_off = False
+        # Token to take the seat back with RESUME, and the layout code dealt
+        self.session = None
+        self.code = 0
+        # True while the seat is kept after the connection dropped; the
+        # snapshot to resume from is taken when it drops
+        self.away = False
+        self.resume = None
+        # Set once the connection is done with, which stops its heartbeat
+        self.closed = False
+
+    def take_seat(self, other):
+        """Carry over the match state of ``other``, whose connection dropped."""
+        for field in ("room", "name", "avatar", "opponent", "turn", "board", "layout", "code", "rating", "session"):
+            setattr(self, field, getattr(other, field))
 
 
 class Network:
@@ -65,16 +286,68 @@ class Network:
     server_addr = os.getenv("SERVER_HOST", "localhost")
     port = int(os.getenv("SERVER_PORT", "1234"))
     address = (server_addr, port)
+    # Prometheus-style metrics on localhost; 0 turns them off. Shards add
+    # their index to the port.
+    metrics_port = int(os.getenv("SERVER_METRICS_PORT", "0"))
+    # Directory to record match replays in; empty turns recording off
+    replay_dir = os.getenv("SERVER_REPLAY_DIR", "")
+    # SQLite file for player stats and the leaderboard; empty turns them off
+    stats_db = os.getenv("SERVER_STATS_DB", "")
+    # Seconds a dropped player's seat is kept for RESUME; 0 ends the match at once
+    resume_grace = float(os.getenv("SERVER_RESUME_GRACE", "30"))
+    # A client quiet for heartbeat seconds is sent PING, one quiet for
+    # idle_timeout seconds is disconnected; 0 turns either off
+    heartbeat = float(os.getenv("SERVER_HEARTBEAT", "10"))
+    idle_timeout = float(os.getenv("SERVER_IDLE_TIMEOUT", "30"))
+    # Shot clock in seconds; 0 lets players take as long as they like
+    turn_seconds = float(os.getenv("SERVER_TURN_SECONDS", "0"))
+    shard = None
 
     def __init__(
-        self, sock=socket.socket(socket.AF_INET, socket.SOCK_STREAM), is_server=True
+        self,
+        sock=socket.socket(socket.AF_INET, socket.SOCK_STREAM),
+        is_server=True,
+        shard=None,
     ):
         self.server = sock
+        self.reader = FrameReader()
+        # Switched on when the client offers the binary codec at CREATE/JOIN
+        self.binary = False
+        # When the client last sent anything, for idle checks
+        self.last_seen = monotonic()
+        if not is_server:
+            self.outbox = Outbox(sock)
         if is_server:
-            self.game_list = {}
+            self.rooms = RoomRegistry()
+            self.shard = shard
+            self.ids = RoomIds(shard.letters) if shard else RoomIds()
+            self.matchmaker = Matchmaker()
+            self.replays = replay.ReplayLog(self.replay_dir) if self.replay_dir else None
+            self.stats_store = StatsStore(self.stats_db) if self.stats_db else None
+            # Session token -> player, for RESUME
+            self.sessions = {}
+            # Heartbeats, idle checks, shot clocks and RESUME grace periods
+            self.timers = TimingWheel()
+            if shard:
+                self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
             self.server.bind(self.address)
+            if shard:
+                shard.listen(self.adopt)
+            self.start_metrics()
             self.wait_for_connection()
 
+    def start_metrics(self):
+        metrics.gauge("rooms", "Open rooms", lambda: self.stats()["rooms"])
+        metrics.gauge("players", "Players in a room", lambda: self.stats()["players"])
+        metrics.gauge("spectators", "Connections watching a room", lambda: self.stats()["spectators"])
+        metrics.gauge("players_queued", "Players waiting for a quick-play match", lambda: len(self.matchmaker))
+        metrics.gauge("players_away", "Dropped players whose seat is kept for RESUME", lambda: self.stats()["away"])
+        metrics.gauge("timers_pending", "Timeouts on the timing wheel", lambda: len(self.timers))
+        if self.shard:
+            metrics.labels["shard"] = self.shard.index
+        if self.metrics_port:
+            metrics.serve(self.metrics_port + (self.shard.index if self.shard else 0))
+
     def wait_for_connection(self):
         self.server.listen()
         while True:
@@ -82,136 +355,386 @@ class Network:
             print("Connected to: ", address)
 
             conn = Network(sock=conn, is_server=False)
-            lock.acquire()
             Thread(
                 target=self.proceed_with_connection,
                 args=(ServerPlayer(conn),),
             ).start()
-            lock.release()
-            print(self.game_list)
+
     def proceed_with_connection(self, player):
-        while True:
+        metrics.inc("connections_opened_total")
+        self.watch(player)
+        while not player.handed_off:
             try:
                 data = player.conn.receive()
                 if not data:
                     break
-                if data["category"] == "OVER":
-                    # Mark room as game over and broadcast to both players.
-                    if player.room:
+                self.handle(player, data)
+            except:
+                break
+        self.disconnect(player)
+        metrics.inc("connections_closed_total")
+        metrics.retire()
+
+    def adopt(self, sock, data, rest=b""):
+        # Client handed over by another shard, its JOIN already read
+        player = ServerPlayer(Network(sock=sock, is_server=False))
+        player.conn.reader.feed(rest)
+        self.handle(player, data)
+        Thread(target=self.proceed_with_connection, args=(player,)).start()
+
+    def hand_off(self, player, data, index=None):
+        self.shard.hand_off(player.conn.server, data, index, player.conn.reader.take_pending())
+        player.handed_off = True
+        player.conn.close()
+
+    def watch(self, player):
+        # Idle checks every heartbeat seconds, on the timing wheel
+        if self.heartbeat > 0:
+            self.timers.schedule(self.heartbeat, self.check_idle, player)
+
+    def check_idle(self, player):
+        if player.closed:
+            return
+        conn = player.conn
+        idle = monotonic() - conn.last_seen
+        if self.idle_timeout > 0 and idle >= self.idle_timeout:
+            # Half-open or gone quiet; its reader sees EOF and cleans up
+            metrics.inc("idle_disconnects_total")
+            conn.abort()
+            return
+        if idle >= self.heartbeat:
+            metrics.inc("pings_sent_total")
+            conn.send({"category": "PING"})
+        self.timers.schedule(self.heartbeat, self.check_idle, player)
+
+    def handle(self, player, data):
+        start = perf_counter()
+        try:
+            # Frames for the same client leave in one write when handling is done
+            with batched():
+                self.dispatch(player, data)
+        finally:
+            category = data.get("category") if isinstance(data, dict) else None
+            metrics.observe(category if category in CATEGORIES else "other", perf_counter() - start)
+
+    def dispatch(self, player, data):
+        if data["category"] in ("CREATE", "JOIN", "QUEUE") and player.room:
+            # Connection reused from the menu: leave the last room first
+            self.leave(player)
+            player.room = player.opponent = None
+        if data["category"] == "OVER":
+            # Mark room as game over and broadcast to both players.
+            # A result the server already decided is not overridden, and a
+            # match still being played is only ended by the server.
+            if player.room:
+                with player.room.lock:
+                    if not player.room.game_over and not player.room.live:
+                        # No match is running, so there is no result to record
                         player.room.game_over = True
                         # Broadcast GAME_OVER with player who sent the message as "by"
+                        message = {"category": "GAME_OVER", "payload": {"by": player.name}}
                         for p in list(player.room.players):
                             try:
-                                p.conn.send({"category": "GAME_OVER", "payload": {"by": player.name}})
+                                p.conn.send(message)
                             except Exception:
                                 pass
-                    # Do not delete the room immediately; allow rematch flow.
-                    player.room = player.room
-                elif data["category"] == "CREATE":
-                    player.name = data.get("name", "")
-                    player.avatar = data.get("avatar", 0)
-                    i = self.generate_id()
-                    self.game_list[i] = Room()
-                    self.game_list[i]._id = i
-                    self.game_list[i].players.append(player)
-                    player.room = self.game_list[i]
-                    player.conn.send({"category": "ID", "payload": i})
-                elif data["category"] == "JOIN":
-                    player.name = data.get("name", "")
-                    player.avatar = data.get("avatar", 0)
+                        player.room.broadcast(message)
+            # Do not delete the room immediately; allow rematch flow.
+            player.room = player.room
+        elif data["category"] == "CREATE":
+            self.matchmaker.cancel(player)
+            player.name = data.get("name", "")
+            player.avatar = data.get("avatar", 0)
+            player.conn.binary = binproto.NAME in data.get("codecs", ())
+            metrics.inc("rooms_created_total")
+            room = Room(self.replays, self.stats_store, self.timers, self.turn_seconds)
+            room.players.append(player)
+            player.room = room
+            player.conn.send({"category": "ID", "payload": self.rooms.create(room, self.generate_id)})
+            self.open_session(player)
+        elif data["category"] in ("JOIN", "SPECTATE", "RESUME") and not isinstance(data.get("payload"), str):
+            # Room codes and session tokens are strings; anything else matches nothing
+            player.conn.send("INVALID")
+        elif data["category"] == "JOIN" and self.shard and not self.shard.owns(data["payload"]):
+            self.hand_off(player, data)
+        elif data["category"] == "JOIN":
+            self.matchmaker.cancel(player)
+            player.name = data.get("name", "")
+            player.avatar = data.get("avatar", 0)
+            player.conn.binary = binproto.NAME in data.get("codecs", ())
+            room = self.rooms.join(data["payload"], player)
+            if isinstance(room, str):
+                # "INVALID" or "TAKEN"
+                player.conn.send(room)
+            else:
+                player.room = room
+                self.open_session(player)
+                with room.lock:
+                    room.send_board()
+        elif data["category"] == "QUEUE" and self.shard and self.shard.index != self.shard.matchmaker:
+            # One worker keeps the queue, so players on any worker meet
+            self.hand_off(player, data, self.shard.matchmaker)
+        elif data["category"] == "QUEUE":
+            player.name = data.get("name", "")
+            player.avatar = data.get("avatar", 0)
+            player.conn.binary = binproto.NAME in data.get("codecs", ())
+            opponent = self.matchmaker.enqueue(player, player.rating)
+            if opponent is not None:
+                # Both already sent everything a JOIN would, so deal right away
+                metrics.inc("queue_matches_total")
+                room = Room(self.replays, self.stats_store, self.timers, self.turn_seconds)
+                room.players += [opponent, player]
+                opponent.room = player.room = room
+                self.rooms.create(room, self.generate_id)
+                for p in room.players:
+                    self.open_session(p)
+                with room.lock:
+                    room.send_board()
+        elif data["category"] == "SPECTATE" and self.shard and not self.shard.owns(data["payload"]):
+            self.hand_off(player, data)
+        elif data["category"] == "SPECTATE":
+            player.conn.binary = binproto.NAME in data.get("codecs", ())
+            room = self.rooms.get(data["payload"])
+            if room is None:
+                player.conn.send("INVALID")
+                return
+            if player.watching:
+                with player.watching.lock:
+                    player.watching.spectators.pop(player.conn, None)
+            with room.lock:
+                if room.closed:
+                    player.watching = None
+                    player.conn.send("INVALID")
+                    return
+                player.watching = room
+                room.spectators[player.conn] = None
+                player.conn.send({"category": "SPECTATE", "payload": room.snapshot()})
+        elif data["category"] == "RESUME" and self.shard and not self.shard.owns(data["payload"]):
+            self.hand_off(player, data)
+        elif data["category"] == "RESUME":
+            player.conn.binary = binproto.NAME in data.get("codecs", ())
+            away = self.sessions.get(data["payload"])
+            if away is None or not self.resume(player, away):
+                player.conn.send("INVALID")
+        elif data["category"] == "POSITION":
+            if player.room:
+                with player.room.lock:
+                    player.room.fire(player, data["payload"])
+        elif data["category"] == "REMATCH_OFFER":
+            # Add player's vote and start a new board when both agree
+            if player.room:
+                with player.room.lock:
+                    player.room.rematch_votes.add(player)
+                    # Notify both players about current rematch status
                     try:
-                        if len(self.game_list[data["payload"]].players) == 2:
-                            player.conn.send("TAKEN")
-                        else:
-                            player.room = self.game_list[data["payload"]]
-                            self.game_list[data["payload"]].players.append(player)
-                            self.game_list[data["payload"]].send_board()
-                    except KeyError:
-                        player.conn.send("INVALID")
-                elif data["category"] == "POSITION":
-                    player.opponent.conn.send(data)
-                elif data["category"] == "REMATCH_OFFER":
-                    # Add player's vote and start a new board when both agree
-                    if player.room:
-                        with lock:
-                            player.room.rematch_votes.add(player)
-                            # Notify both players about current rematch status
+                        offered_names = [p.name for p in player.room.rematch_votes]
+                        for p in list(player.room.players):
                             try:
-                                offered_names = [p.name for p in player.room.rematch_votes]
-                                for p in list(player.room.players):
-                                    try:
-                                        p.conn.send({"category": "REMATCH_STATUS", "payload": {"offers": offered_names}})
-                                    except Exception:
-                                        pass
+                                p.conn.send({"category": "REMATCH_STATUS", "payload": {"offers": offered_names}})
                             except Exception:
                                 pass
-                            # Only start rematch when both players present and both voted
-                            if len(player.room.players) == 2 and len(player.room.rematch_votes) == 2:
+                    except Exception:
+                        pass
+                    # Only start rematch when both players present and both voted
+                    if len(player.room.players) == 2 and len(player.room.rematch_votes) == 2:
+                        try:
+                            # Inform clients rematch is starting
+                            for p in list(player.room.players):
                                 try:
-                                    # Inform clients rematch is starting
-                                    for p in list(player.room.players):
-                                        try:
-                                            p.conn.send({"category": "REMATCH_START", "payload": {}})
-                                        except Exception:
-                                            pass
-                                    player.room.rematch_votes.clear()
-                                    player.room.send_board()
+                                    p.conn.send({"category": "REMATCH_START", "payload": {}})
                                 except Exception:
                                     pass
-                elif data["category"] == "SURRENDER" or data["category"] == "FORFEIT":
-                    # Player concedes — declare opponent as winner
-                    if player.room:
-                        player.room.game_over = True
+                            player.room.rematch_votes.clear()
+                            metrics.inc("rematches_total")
+                            player.room.send_board()
+                        except Exception:
+                            pass
+        elif data["category"] == "SURRENDER" or data["category"] == "FORFEIT":
+            # Player concedes — declare opponent as winner
+            if player.room:
+                metrics.inc("surrenders_total")
+                with player.room.lock:
+                    if not player.room.game_over:
+                        metrics.inc("matches_finished_total")
+                        player.room.end_match(player.opponent, replay.SURRENDER)
+                    player.room.game_over = True
+                    winner_name = None
+                    try:
+                        winner = player.opponent
+                        winner_name = winner.name if winner else None
+                    except Exception:
                         winner_name = None
+                    message = {"category": "GAME_OVER", "payload": {"by": winner_name, "reason": "surrender"}}
+                    for p in list(player.room.players):
                         try:
-                            winner = player.opponent
-                            winner_name = winner.name if winner else None
+                            p.conn.send(message)
                         except Exception:
-                            winner_name = None
-                        for p in list(player.room.players):
-                            try:
-                                p.conn.send({"category": "GAME_OVER", "payload": {"by": winner_name, "reason": "surrender"}})
-                            except Exception:
-                                pass
-                elif data["category"] == "CHAT":
+                            pass
+                    player.room.broadcast(message)
+        elif data["category"] == "CHAT":
+            # Nobody to read it while the creator waits alone
+            if player.room and player.opponent:
+                # Under the lock, so a message for an away opponent is kept
+                with player.room.lock:
                     player.opponent.conn.send(data)
-            except:
-                break
-        try:
-            player.opponent.conn.send("END")
-        except AttributeError:
-            print("Closed Without Pair")
-        if player.room and player.room._id in self.game_list:
-            del self.game_list[player.room._id]
-        player.conn.close()
+                    if player.room.match:
+                        player.room.match.chat(player.room.players.index(player), data.get("payload", ""))
+        elif data["category"] == "PING":
+            player.conn.send({"category": "PONG"})
+        elif data["category"] == "STATS":
+            player.conn.send({"category": "STATS", "payload": self.stats()})
+        elif data["category"] == "LEADERBOARD":
+            # From memory; empty when stats are off
+            board = self.stats_store.leaderboard() if self.stats_store else []
+            player.conn.send({"category": "LEADERBOARD", "payload": board})
+
+    def disconnect(self, player):
+        player.closed = True
+        if player.handed_off:
+            return
+        self.matchmaker.cancel(player)
+        if player.watching:
+            with player.watching.lock:
+                player.watching.spectators.pop(player.conn, None)
+        conn = player.conn
+        if not self.keep_seat(player):
+            self.leave(player)
+        conn.close()
         return
 
+    def leave(self, player):
+        # The player is gone for good: the match ends and the room closes
+        room = player.room
+        opponent = player.opponent
+        # The opponent may have left this room for another one already
+        if opponent is not None and opponent.room is room:
+            opponent.conn.send("END")
+        else:
+            print("Closed Without Pair")
+        if room:
+            with room.lock:
+                if not room.game_over:
+                    room.end_match(player.opponent, replay.DISCONNECT)
+                room.end_spectating()
+                for p in room.players:
+                    if self.sessions.get(p.session) is p:
+                        del self.sessions[p.session]
+        if room and self.rooms.remove(room):
+            self.ids.release(room._id)
+
+    def keep_seat(self, player):
+        # Hold the seat of a player dropped mid-match for resume_grace seconds
+        room = player.room
+        if not (room and self.resume_grace > 0):
+            return False
+        with room.lock:
+            if player not in room.players:
+                # A RESUME already gave the seat to a new connection
+                return True
+            opponent = player.opponent
+            if not room.live or opponent is None or opponent.away:
+                return False
+            self.set_away(player)
+            opponent.conn.send({"category": "OPPONENT_AWAY", "payload": {"grace": self.resume_grace}})
+        metrics.inc("sessions_kept_total")
+        self.timers.schedule(self.resume_grace, self.expire, player)
+        return True
+
+    def set_away(self, player):
+        # Called with the room lock held; keeps what is sent until a RESUME
+        player.resume = player.room.resume_snapshot(player)
+        player.conn = Backlog(player.conn.binary)
+        player.away = True
+
+    def expire(self, player):
+        # Nobody came back for the seat; RESUME and this race for player.away
+        with player.room.lock:
+            if not player.away:
+                return
+            player.away = False
+        metrics.inc("sessions_expired_total")
+        with batched():
+            self.leave(player)
+
+    def resume(self, player, away):
+        """Give the seat of ``away`` to ``player``; False if it is not kept any more."""
+        room = away.room
+        stale = None
+        with room.lock:
+            if self.resume_grace <= 0 or self.sessions.get(away.session) is not away:
+                return False
+            if not away.away:
+                # The old connection is still open as far as we can tell
+                # (half-open after a network change): it is the one to go
+                if not room.live or away.opponent is None or away.opponent.away:
+                    return False
+                stale = away.conn
+                self.set_away(away)
+            away.away = False
+            backlog = away.conn
+            player.take_seat(away)
+            room.players[room.players.index(away)] = player
+            player.opponent.opponent = player
+            self.sessions[player.session] = player
+            # Where things stood when the connection dropped, then what was missed
+            player.conn.send({"category": "RESUME", "payload": away.resume})
+            for message in backlog.messages:
+                player.conn.send(message)
+            player.opponent.conn.send({"category": "OPPONENT_BACK", "payload": {}})
+        if stale:
+            # Its reader finds the seat taken and leaves the room alone
+            stale.abort()
+            stale.close()
+        metrics.inc("sessions_resumed_total")
+        return True
+
+    def open_session(self, player):
+        # Token for RESUME; it starts with the room code so shards can route it
+        self.sessions.pop(player.session, None)
+        player.session = new_token(player.room._id)
+        self.sessions[player.session] = player
+        player.conn.send({"category": "SESSION", "payload": player.session})
+
+    def stats(self):
+        # Counts for this process only; each shard answers for its own rooms
+        rooms = self.rooms.values()
+        return {
+            "rooms": len(rooms),
+            "players": sum(len(room.players) for room in rooms),
+            "spectators": sum(len(room.spectators) for room in rooms),
+            "away": sum(p.away for room in rooms for p in room.players),
+            "shard": self.shard.index if self.shard else None,
+        }
+
     def receive(self):
-        buff = b""
-        n = int.from_bytes(self.server.recv(4)[:4], "big")
-        while n > 0:
-            b = self.server.recv(n)
-            buff += b
-            n -= len(b)
-        return json.loads(buff.decode())
+        payload = self.reader.read(self.server)
+        self.last_seen = monotonic()
+        metrics.inc("bytes_received_total", HEADER + len(payload))
+        return decode(payload)
 
     def send(self, *data):
         if len(data) == 1:
             data = data[0]
-        final_data = b""
-        data = json.dumps(data)
-        final_data += len(data).to_bytes(4, "big")
-        final_data += data.encode()
-        try:
-            self.server.send(final_data)
-        except:
-            pass
+        frame = encode(data, self.binary)
+        if self.send_frame(frame):
+            metrics.inc("messages_sent_total")
+            metrics.inc("bytes_sent_total", len(frame))
+
+    def send_frame(self, frame):
+        """Queue an encoded frame, uncounted; False if the connection is gone."""
+        return self.outbox.put(frame)
 
     def close(self):
-        self.server.close()
+        self.outbox.close()
+
+    def abort(self):
+        """Cut the connection off; the reader thread sees EOF."""
+        try:
+            self.server.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
 
     def generate_id(self):
-        _id = "".join(random.choice(string.ascii_lowercase) for _ in range(6))
-        while _id in self.game_list.keys():
-            _id = "".join(random.choice(string.ascii_lowercase) for _ in range(6))
-        return _id
+        # In sharded mode the first letter names the worker owning the room,
+        # so each worker's allocator only uses its own letters
+        return self.ids.allocate()
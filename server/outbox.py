@@ -0,0 +1,194 @@
+"""Per-connection send buffers for the thread engine.
+
+``send`` queues a frame instead of writing it. Frames queued while handling
+one client message go out together in a single ``sendmsg`` per connection
+when the message is done (see ``batched``). Whatever the kernel does not
+take right away is written by one background flusher thread once the socket
+is writable again, so a slow client never holds up the thread that is
+sending to it. A client that lets more than ``HIGH_WATER`` bytes pile up is
+disconnected.
+"""
+import os
+import selectors
+import socket
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+from server.metrics import metrics
+
+HIGH_WATER = int(os.getenv("SERVER_SEND_HIGH_WATER", str(1 << 20)))
+# Most buffers one sendmsg takes (IOV_MAX is 1024 on Linux)
+IOV_MAX = 1024
+
+_local = threading.local()
+
+
+@contextmanager
+def batched():
+    """Hold back flushes until the block ends, then flush each connection once."""
+    if getattr(_local, "pending", None) is not None:
+        yield
+        return
+    pending = _local.pending = {}
+    try:
+        yield
+    finally:
+        _local.pending = None
+        for conn in pending:
+            conn.flush()
+
+
+def schedule(conn):
+    # Flush now, or at the end of the running batch
+    pending = getattr(_local, "pending", None)
+    if pending is None:
+        conn.flush()
+    else:
+        pending[conn] = None
+
+
+class Outbox:
+    def __init__(self, sock, high_water=HIGH_WATER):
+        self.sock = sock
+        self.high_water = high_water
+        self.frames = deque()
+        self.size = 0
+        self.lock = threading.Lock()
+        # Set while the flusher thread owns the writes
+        self.waiting = False
+        self.closed = False
+
+    def put(self, frame):
+        """Queue ``frame``; False if the connection is closed or was cut off."""
+        with self.lock:
+            if self.closed:
+                return False
+            self.frames.append(frame)
+            self.size += len(frame)
+            if self.size > self.high_water:
+                self.closed = True
+                self.frames.clear()
+                metrics.inc("slow_consumers_total")
+                # The reader thread sees EOF and cleans up as for any disconnect
+                try:
+                    self.sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+                return False
+        schedule(self)
+        return True
+
+    def flush(self):
+        with self.lock:
+            if self.waiting or self.closed or not self.frames:
+                return
+            self._write()
+            if self.frames:
+                self.waiting = True
+                flusher.watch(self)
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+            self.frames.clear()
+            if self.waiting:
+                # The flusher closes the socket once it has let go of it
+                flusher.wake()
+                return
+        self.sock.close()
+
+    def writable(self):
+        """Called by the flusher; True once there is nothing left to write."""
+        with self.lock:
+            if not self.closed:
+                self._write()
+            return self.closed or not self.frames
+
+    def release(self):
+        """Called by the flusher after unregistering; False if more was queued meanwhile."""
+        with self.lock:
+            if self.frames and not self.closed:
+                return False
+            self.waiting = False
+            if self.closed:
+                self.sock.close()
+            return True
+
+    def _write(self):
+        # One syscall for everything queued; a partial write leaves the rest
+        frames = self.frames
+        try:
+            if hasattr(self.sock, "sendmsg"):
+                buffers = list(frames) if len(frames) <= IOV_MAX else [frames[i] for i in range(IOV_MAX)]
+                sent = self.sock.sendmsg(buffers, (), getattr(socket, "MSG_DONTWAIT", 0))
+            else:
+                sent = self.sock.send(b"".join(frames))
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            # Gone; the reader thread notices too
+            self.closed = True
+            frames.clear()
+            self.size = 0
+            return
+        metrics.inc("send_calls_total")
+        self.size -= sent
+        while sent:
+            n = len(frames[0])
+            if sent < n:
+                frames[0] = memoryview(frames[0])[sent:]
+                break
+            frames.popleft()
+            sent -= n
+
+
+class Flusher:
+    """Background writer for connections the kernel could not take everything from."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.added = []
+        self.thread = None
+        # Made with the thread, so forked shard workers don't share them
+        self._wakeup = self._waker = None
+
+    def watch(self, outbox):
+        with self.lock:
+            self.added.append(outbox)
+            if self.thread is None:
+                self._wakeup, self._waker = socket.socketpair()
+                self.thread = threading.Thread(target=self.run, name="flusher", daemon=True)
+                self.thread.start()
+        self.wake()
+
+    def wake(self):
+        try:
+            self._waker.send(b"\0")
+        except (AttributeError, OSError):
+            pass
+
+    def run(self):
+        selector = selectors.DefaultSelector()
+        selector.register(self._wakeup, selectors.EVENT_READ)
+        while True:
+            ready = []
+            for key, _ in selector.select():
+                if key.fileobj is self._wakeup:
+                    self._wakeup.recv(4096)
+                else:
+                    ready.append(key.data)
+            with self.lock:
+                added, self.added = self.added, []
+            for outbox in added:
+                selector.register(outbox.sock, selectors.EVENT_WRITE, outbox)
+            # Closed connections may never become writable, so look for them too
+            ready += [key.data for key in selector.get_map().values() if key.data and key.data.closed]
+            for outbox in dict.fromkeys(ready):
+                if outbox.writable():
+                    selector.unregister(outbox.sock)
+                    if not outbox.release():
+                        selector.register(outbox.sock, selectors.EVENT_WRITE, outbox)
+
+
+flusher = Flusher()
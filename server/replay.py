@@ -0,0 +1,263 @@
+"""Match replays as an append-only binary event log.
+
+Every match (one deal of boards, so a rematch is a new match) is recorded as
+a stream of small records: the two fleet layouts, each shot with its result,
+chat, and how it ended. Records of all matches go, interleaved, into segment
+files in one directory; a new segment starts once the current one passes
+``segment_bytes``. Gameplay threads only append the encoded record to a deque
+in memory, no lock taken; one background thread writes whatever has piled up
+in a single ``write`` per batch. If the disk can't keep up and more than
+``max_pending`` records wait, new ones are dropped and counted rather than
+blocking a room.
+
+A record is a fixed header, ``match id (u64) | kind (u8) | milliseconds since
+the match started (u32) | payload length (u16)``, little-endian, followed by
+the payload. ``ReplayReader`` maps the segments with ``mmap`` and indexes the
+record offsets of every match in one pass, so any match, or any move in it,
+is a lookup away.
+
+    python -m server --replay-dir replays
+"""
+import atexit
+import mmap
+import os
+import secrets
+import struct
+import threading
+import time
+from array import array
+from collections import deque
+
+from common.placement import SIZE
+from server.metrics import metrics
+
+MAGIC = b"BSREPLAY1\n"
+HEADER = struct.Struct("<QBIH")
+
+BOARD, SHOT, CHAT, END = 1, 2, 3, 4
+KINDS = {BOARD: "BOARD", SHOT: "SHOT", CHAT: "CHAT", END: "END"}
+# END reasons; ABANDONED is a match replaced by a new deal before it ended,
+# TIMEOUT one lost on the shot clock
+FLEET_DESTROYED, OVER, SURRENDER, DISCONNECT, ABANDONED, TIMEOUT = range(6)
+REASONS = ("fleet_destroyed", "over", "surrender", "disconnect", "abandoned", "timeout")
+# SHOT flags
+HIT, SUNK, WON = 1, 2, 4
+NOBODY = 255
+
+BOARD_FIXED = struct.Struct("<6sQQB")
+
+
+def _name(value):
+    # Length-prefixed, at most 255 bytes
+    data = str(value).encode("utf-8", "replace")[:255]
+    return bytes((len(data),)) + data
+
+
+class ReplayLog:
+    def __init__(self, directory, segment_bytes=64 << 20, max_pending=500000, interval=0.05):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.max_pending = max_pending
+        # How long the writer waits for more records before writing a batch
+        self.interval = interval
+        os.makedirs(directory, exist_ok=True)
+        self._pending = deque()
+        # Set when records are waiting; the writer clears it before taking them
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._file = None
+        self._written = 0
+        self._thread = None
+        self._closed = False
+
+    def start(self, room_id, codes, first, names):
+        """Begin recording a match; returns the ``Match`` to record it with."""
+        match = Match(self, secrets.randbits(64))
+        payload = BOARD_FIXED.pack(room_id.encode()[:6], codes[0], codes[1], first)
+        payload += b"".join(_name(name) for name in names)
+        match.record(BOARD, payload)
+        return match
+
+    def append(self, record):
+        pending = self._pending
+        if len(pending) >= self.max_pending or self._closed:
+            metrics.inc("replay_records_dropped_total")
+            return
+        pending.append(record)
+        if not self._ready.is_set():
+            if self._thread is None:
+                self._start()
+            self._ready.set()
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                # Started on first use, so forked shard workers get their own
+                self._thread = threading.Thread(target=self.run, name="replay", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def run(self):
+        pending = self._pending
+        while not (self._closed and not pending):
+            self._ready.wait()
+            self._ready.clear()
+            # Let a batch build up, unless a lot is already waiting
+            if len(pending) < self.max_pending // 4 and not self._closed:
+                time.sleep(self.interval)
+            batch = [pending.popleft() for _ in range(len(pending))]
+            if batch:
+                self._write(b"".join(batch))
+                metrics.inc("replay_records_total", len(batch))
+        if self._file:
+            self._file.close()
+
+    def _write(self, data):
+        if self._file is None or self._written >= self.segment_bytes:
+            if self._file:
+                self._file.close()
+            # Names sort in the order the segments were started
+            name = f"{time.time_ns():020d}-{os.getpid()}.seg"
+            self._file = open(os.path.join(self.directory, name), "ab", buffering=0)
+            self._file.write(MAGIC)
+            self._written = len(MAGIC)
+        self._file.write(data)
+        self._written += len(data)
+
+    def close(self):
+        """Write out what is pending and stop the writer."""
+        with self._lock:
+            self._closed = True
+            thread = self._thread
+        self._ready.set()
+        if thread and thread is not threading.current_thread():
+            thread.join()
+
+
+class Match:
+    """Recorder for one match; calls after ``end`` are ignored."""
+
+    def __init__(self, log, match_id):
+        self.log = log
+        self.id = match_id
+        self.started = time.monotonic()
+        self.ended = False
+
+    def record(self, kind, payload=b""):
+        if self.ended:
+            return
+        ms = int((time.monotonic() - self.started) * 1000) & 0xFFFFFFFF
+        self.log.append(HEADER.pack(self.id, kind, ms, len(payload)) + payload)
+
+    def shot(self, player, x, y, hit, sunk, won):
+        flags = (HIT if hit else 0) | (SUNK if sunk else 0) | (WON if won else 0)
+        self.record(SHOT, bytes((player, x * SIZE + y, flags)))
+
+    def chat(self, player, text):
+        # The rest of the payload, which has a 16-bit length
+        self.record(CHAT, bytes((player,)) + str(text).encode("utf-8", "replace")[:0xFFFF - 1])
+
+    def end(self, winner, reason):
+        self.record(END, bytes((NOBODY if winner is None else winner, reason)))
+        self.ended = True
+
+
+class ReplayReader:
+    """Read-only view of a replay directory, segments mapped with ``mmap``.
+
+    Segments written after the reader was made are not seen; make a new one.
+    """
+
+    def __init__(self, directory):
+        self.segments = []
+        self._maps = []
+        # match id -> record positions, each (segment << 40 | offset)
+        self._index = {}
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith(".seg"):
+                continue
+            with open(os.path.join(directory, name), "rb") as f:
+                if os.fstat(f.fileno()).st_size <= len(MAGIC):
+                    continue
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            if data[: len(MAGIC)] != MAGIC:
+                data.close()
+                continue
+            self.segments.append(name)
+            self._maps.append(data)
+            self._scan(len(self._maps) - 1, data)
+
+    def _scan(self, segment, data):
+        index = self._index
+        unpack = HEADER.unpack_from
+        size = HEADER.size
+        offset = len(MAGIC)
+        last = len(data) - size
+        base = segment << 40
+        while offset <= last:
+            match_id, _, _, length = unpack(data, offset)
+            if offset + size + length > last + size:
+                # A batch cut short by a crash
+                break
+            try:
+                index[match_id].append(base | offset)
+            except KeyError:
+                index[match_id] = array("Q", (base | offset,))
+            offset += size + length
+
+    def matches(self):
+        """Match ids, in the order the matches started."""
+        return list(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+    def records(self, match_id):
+        """How many records a match has, the BOARD record included."""
+        return len(self._index[match_id])
+
+    def event(self, match_id, n):
+        """The ``n``-th record of a match (0 is the BOARD record)."""
+        position = self._index[match_id][n]
+        data = self._maps[position >> 40]
+        offset = position & ((1 << 40) - 1)
+        _, kind, ms, length = HEADER.unpack_from(data, offset)
+        start = offset + HEADER.size
+        return decode(kind, ms, data[start : start + length])
+
+    def events(self, match_id):
+        for n in range(self.records(match_id)):
+            yield self.event(match_id, n)
+
+    def close(self):
+        for data in self._maps:
+            data.close()
+        self._maps = []
+
+
+def decode(kind, ms, payload):
+    event = {"kind": KINDS.get(kind, kind), "t": ms / 1000}
+    if kind == BOARD:
+        room, first_code, second_code, first = BOARD_FIXED.unpack_from(payload)
+        names, offset = [], BOARD_FIXED.size
+        while offset < len(payload):
+            n = payload[offset]
+            names.append(payload[offset + 1 : offset + 1 + n].decode("utf-8", "replace"))
+            offset += 1 + n
+        # Layout codes as in common.placement: ship_cells()/ship_masks()
+        event.update(room=room.rstrip(b"\0").decode(), layouts=[first_code, second_code], first=first, names=names)
+    elif kind == SHOT:
+        player, cell, flags = payload
+        event.update(
+            player=player,
+            position=list(divmod(cell, SIZE)),
+            hit=bool(flags & HIT),
+            sunk=bool(flags & SUNK),
+            win=bool(flags & WON),
+        )
+    elif kind == CHAT:
+        event.update(player=payload[0], text=payload[1:].decode("utf-8", "replace"))
+    elif kind == END:
+        winner, reason = payload
+        event.update(winner=None if winner == NOBODY else winner, reason=REASONS[reason])
+    return event
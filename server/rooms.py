@@ -0,0 +1,73 @@
+"""Open rooms by code, split over lock stripes.
+
+A room code hashes to one of ``stripes`` dicts, each with its own lock, so
+creating, joining or closing rooms only contends with rooms on the same
+stripe. Every room also carries its own ``lock`` for what happens inside
+it (shots, rematch votes, surrender), so one busy match never holds up
+another.
+"""
+from threading import Lock
+
+
+class RoomRegistry:
+    def __init__(self, stripes=64):
+        self._stripes = [({}, Lock()) for _ in range(stripes)]
+
+    def _stripe(self, room_id):
+        return self._stripes[hash(room_id) % len(self._stripes)]
+
+    def get(self, room_id):
+        rooms, _ = self._stripe(room_id)
+        return rooms.get(room_id)
+
+    def create(self, room, new_id):
+        """Register ``room`` under the first code from ``new_id()`` not in use."""
+        while True:
+            room_id = new_id()
+            rooms, lock = self._stripe(room_id)
+            with lock:
+                if room_id not in rooms:
+                    room._id = room_id
+                    rooms[room_id] = room
+                    return room_id
+
+    def join(self, room_id, player):
+        """Add ``player`` to a room with one seat left.
+
+        Returns the room, or "INVALID"/"TAKEN" when there is none to join.
+        """
+        rooms, lock = self._stripe(room_id)
+        with lock:
+            room = rooms.get(room_id)
+            if room is None:
+                return "INVALID"
+            if len(room.players) >= 2:
+                return "TAKEN"
+            room.players.append(player)
+            return room
+
+    def remove(self, room):
+        """Drop ``room``, unless its code already belongs to another room.
+
+        Returns True if it was removed by this call.
+        """
+        rooms, lock = self._stripe(room._id)
+        with lock:
+            if rooms.get(room._id) is room:
+                del rooms[room._id]
+                return True
+        return False
+
+    def values(self):
+        # A snapshot; rooms opened or closed meanwhile may be missed
+        out = []
+        for rooms, lock in self._stripes:
+            with lock:
+                out += rooms.values()
+        return out
+
+    def __contains__(self, room_id):
+        return room_id in self._stripe(room_id)[0]
+
+    def __len__(self):
+        return sum(len(rooms) for rooms, _ in self._stripes)
@@ -0,0 +1,48 @@
+"""Seats kept for players whose connection drops in the middle of a match.
+
+Every player in a room gets a session token (a SESSION message). The token
+starts with the room code, so in sharded mode a RESUME reaches the worker
+owning the room the same way a JOIN does. When the connection of a player in
+a live match drops, the room stays open for ``resume_grace`` seconds: the
+player's connection is swapped for a ``Backlog``, which keeps everything the
+server would have sent, and the opponent gets OPPONENT_AWAY. A RESUME with
+the token gives the seat to the new connection, which is sent a RESUME
+snapshot of both boards as they were when it dropped, then the kept messages
+(the opponent's POSITION, CHAT, GAME_OVER...) in order. If nobody comes back
+in time the match ends as a disconnect, like it always did.
+
+    python -m server --resume-grace 30
+"""
+import secrets
+
+# CHAT messages kept for an away player; the rest are dropped
+MAX_CHATS = 64
+
+
+def new_token(room_id):
+    return f"{room_id}-{secrets.token_urlsafe(16)}"
+
+
+class Backlog:
+    """Stands in for the connection of an away player, keeping what is sent."""
+
+    def __init__(self, binary):
+        self.binary = binary
+        self.messages = []
+        self.chats = 0
+
+    def send(self, *data):
+        if len(data) == 1:
+            data = data[0]
+        if isinstance(data, dict) and data.get("category") == "CHAT":
+            if self.chats >= MAX_CHATS:
+                return
+            self.chats += 1
+        self.messages.append(data)
+
+    def send_frame(self, frame):
+        # Only spectators get frames encoded in advance
+        return False
+
+    def close(self):
+        pass
@@ -0,0 +1,122 @@
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import string
+import tempfile
+from threading import Thread
+
+from common.framing import HEADER
+
+
+class Shard:
+    """Routing state for one worker of a multi-process server.
+
+    Every worker listens on the same port with SO_REUSEPORT, so the kernel
+    spreads new connections across processes. A room lives in the worker that
+    created it, and the first letter of its code tells which one that is. When
+    a JOIN lands on another worker the client socket is passed to the owner
+    over a Unix socket (SCM_RIGHTS) together with the JOIN message and any
+    bytes already read past it. QUEUE messages are passed the same way to the
+    one worker running matchmaking.
+    """
+
+    # Worker holding the quick-play queue
+    matchmaker = 0
+
+    def __init__(self, index, workers, port):
+        self.index = index
+        self.workers = workers
+        self.port = port
+        # First letters of the room codes this shard hands out
+        self.letters = [c for c in string.ascii_lowercase if self.owner(c) == index]
+
+    def owner(self, room_id):
+        return ord(room_id[0]) % self.workers
+
+    def owns(self, room_id):
+        # Anything but a room code is answered INVALID by whoever got it
+        return not isinstance(room_id, str) or not room_id or self.owner(room_id) == self.index
+
+    def socket_path(self, index):
+        return os.path.join(
+            tempfile.gettempdir(), f"battleship-{self.port}-{index}.sock"
+        )
+
+    def hand_off(self, sock, data, index=None, rest=b""):
+        # To the owner of the room being joined, unless told otherwise.
+        # The message is length-prefixed, the unread bytes follow it.
+        if index is None:
+            index = self.owner(data["payload"])
+        message = json.dumps(data).encode()
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as u:
+            u.connect(self.socket_path(index))
+            socket.send_fds(u, [len(message).to_bytes(HEADER, "big") + message + rest], [sock.fileno()])
+
+    def listen(self, adopt):
+        """Accept handed-off clients and give them to ``adopt(sock, data, rest)``."""
+        path = self.socket_path(self.index)
+        if os.path.exists(path):
+            os.unlink(path)
+        u = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        u.bind(path)
+        u.listen()
+        Thread(target=self._accept_hand_offs, args=(u, adopt), daemon=True).start()
+
+    def _accept_hand_offs(self, u, adopt):
+        while True:
+            conn, _ = u.accept()
+            with conn:
+                try:
+                    msg, fds, _, _ = socket.recv_fds(conn, 65536, 1)
+                    while more := conn.recv(65536):
+                        msg += more
+                except OSError:
+                    continue
+            if not fds:
+                continue
+            sock = socket.socket(fileno=fds[0])
+            try:
+                n = int.from_bytes(msg[:HEADER], "big")
+                adopt(sock, json.loads(msg[HEADER : HEADER + n].decode()), msg[HEADER + n :])
+            except Exception:
+                sock.close()
+
+
+def run_worker(index, workers, engine):
+    from server.network import Network
+
+    shard = Shard(index, workers, Network.port)
+    try:
+        if engine == "asyncio":
+            from server.aio import AsyncNetwork
+
+            AsyncNetwork(shard=shard)
+        else:
+            # A fresh socket per worker; the default argument would be shared
+            # by every forked process.
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            Network(sock=sock, shard=shard)
+    except KeyboardInterrupt:
+        pass
+
+
+def serve(workers, engine):
+    processes = [
+        multiprocessing.Process(
+            target=run_worker, args=(i, workers, engine), daemon=True
+        )
+        for i in range(workers)
+    ]
+    for p in processes:
+        p.start()
+    # Make `kill <pid>` of the parent take the workers down with it
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit())
+    try:
+        for p in processes:
+            p.join()
+    finally:
+        for p in processes:
+            p.terminate()
@@ -0,0 +1,161 @@
+"""Player stats in SQLite, and the leaderboard served from memory.
+
+Finished matches are queued by the rooms and written by one thread, which
+group-commits everything queued since its last transaction: the rows are
+summed per player name and upserted in a single commit. The database runs in
+WAL mode so readers (another shard, a backup) never wait on the writer.
+
+After each commit, and every ``refresh`` seconds otherwise (to pick up other
+shards' commits to the same file), the writer reads the top ``top`` players
+into an immutable list. ``leaderboard()`` returns that list, so answering a
+LEADERBOARD request never touches the disk.
+
+    python -m server --stats-db stats.db
+"""
+import atexit
+import sqlite3
+import threading
+import time
+from collections import deque
+
+from server.metrics import metrics
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    name TEXT PRIMARY KEY,
+    games INTEGER NOT NULL DEFAULT 0,
+    wins INTEGER NOT NULL DEFAULT 0,
+    losses INTEGER NOT NULL DEFAULT 0,
+    surrenders INTEGER NOT NULL DEFAULT 0,
+    shots INTEGER NOT NULL DEFAULT 0,
+    hits INTEGER NOT NULL DEFAULT 0,
+    updated REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS players_rank ON players (wins DESC, losses, name);
+"""
+
+UPSERT = """
+INSERT INTO players (name, games, wins, losses, surrenders, shots, hits, updated)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (name) DO UPDATE SET
+    games = games + excluded.games,
+    wins = wins + excluded.wins,
+    losses = losses + excluded.losses,
+    surrenders = surrenders + excluded.surrenders,
+    shots = shots + excluded.shots,
+    hits = hits + excluded.hits,
+    updated = excluded.updated
+"""
+
+TOP = """
+SELECT name, games, wins, losses, surrenders, shots, hits FROM players
+ORDER BY wins DESC, losses, name LIMIT ?
+"""
+
+# Per-player deltas, in UPSERT order after the name
+GAMES, WINS, LOSSES, SURRENDERS, SHOTS, HITS = range(6)
+
+
+class StatsStore:
+    def __init__(self, path, top=10, interval=0.05, refresh=5.0, max_pending=100000):
+        self.path = path
+        self.top = top
+        # How long the writer waits for more results before committing
+        self.interval = interval
+        self.refresh = refresh
+        self.max_pending = max_pending
+        self._pending = deque()
+        self._ready = threading.Event()
+        self._closed = False
+        self._leaderboard = []
+        # Opened here so a bad path fails at startup; only the writer uses it after
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # Durable at checkpoints; a crash loses at most the last commits
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        # Other shards may hold the write lock for a moment
+        self._db.execute("PRAGMA busy_timeout=5000")
+        self._db.executescript(SCHEMA)
+        self._load(self._db)
+        self._thread = threading.Thread(target=self.run, name="stats", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def record(self, results):
+        """Queue one match's results: [(name, won, surrendered, shots, hits), ...]."""
+        if len(self._pending) >= self.max_pending or self._closed:
+            metrics.inc("stats_results_dropped_total")
+            return
+        self._pending.append(results)
+        if not self._ready.is_set():
+            self._ready.set()
+
+    def leaderboard(self):
+        """The top players, best first, as of the last commit or refresh."""
+        return self._leaderboard
+
+    def run(self):
+        db = self._db
+        pending = self._pending
+        while not (self._closed and not pending):
+            if not self._ready.wait(self.refresh):
+                self._load(db)
+                continue
+            self._ready.clear()
+            # Let results from other rooms join this transaction
+            if not self._closed:
+                time.sleep(self.interval)
+            batch = [pending.popleft() for _ in range(len(pending))]
+            if batch:
+                self._commit(db, batch)
+                self._load(db)
+        db.close()
+
+    def _commit(self, db, batch):
+        totals = {}
+        for results in batch:
+            for name, won, surrendered, shots, hits in results:
+                row = totals.get(name)
+                if row is None:
+                    row = totals[name] = [0] * 6
+                row[GAMES] += 1
+                row[WINS if won else LOSSES] += 1
+                row[SURRENDERS] += surrendered
+                row[SHOTS] += shots
+                row[HITS] += hits
+        now = time.time()
+        try:
+            with db:
+                db.executemany(UPSERT, [(name, *row, now) for name, row in totals.items()])
+        except sqlite3.Error as e:
+            print("Stats not saved:", e)
+            metrics.inc("stats_results_dropped_total", len(batch))
+            return
+        metrics.inc("stats_commits_total")
+        metrics.inc("stats_results_total", len(batch))
+
+    def _load(self, db):
+        try:
+            rows = db.execute(TOP, (self.top,)).fetchall()
+        except sqlite3.Error as e:
+            print("Leaderboard not refreshed:", e)
+            return
+        # Replaced whole, so readers on other threads never see it half built
+        self._leaderboard = [
+            {
+                "name": name,
+                "games": games,
+                "wins": wins,
+                "losses": losses,
+                "surrenders": surrenders,
+                "shots": shots,
+                "accuracy": round(hits / shots, 3) if shots else 0.0,
+            }
+            for name, games, wins, losses, surrenders, shots, hits in rows
+        ]
+
+    def close(self):
+        """Commit what is queued and stop the writer."""
+        self._closed = True
+        self._ready.set()
+        self._thread.join()
@@ -0,0 +1,129 @@
+"""Every server timeout on one hierarchical timing wheel.
+
+Heartbeats, idle connection checks, turn clocks and the RESUME grace period
+are all scheduled here instead of getting a thread or a ``threading.Timer``
+each. The wheel has ``levels`` rings of ``1 << bits`` slots; a slot of level
+0 covers one ``tick``, a slot of level n covers ``1 << (bits * n)`` ticks. A
+timeout goes into the finest level whose ring reaches its deadline, so
+scheduling is O(1), and cancelling only marks the entry, which is dropped
+when its slot comes up. Each tick fires one level-0 slot; when a ring wraps,
+the next slot of the level above is moved down (cascaded). A tick costs the
+same with ten pending timeouts or a million.
+
+One daemon thread turns the wheel and runs the callbacks, or hands them to
+``dispatch`` (the asyncio engine passes ``loop.call_soon_threadsafe``).
+Callbacks may run up to one tick late, never early.
+"""
+import math
+import threading
+import time
+
+
+class Timeout:
+    """A scheduled call; ``cancel()`` is O(1) and safe from any thread."""
+
+    __slots__ = ("deadline", "callback", "args")
+
+    def __init__(self, deadline, callback, args):
+        self.deadline = deadline
+        self.callback = callback
+        self.args = args
+
+    def cancel(self):
+        self.callback = None
+        self.args = ()
+
+    @property
+    def cancelled(self):
+        return self.callback is None
+
+
+class TimingWheel:
+    def __init__(self, tick=0.1, bits=8, levels=4, dispatch=None, clock=time.monotonic):
+        self.tick = tick
+        self.bits = bits
+        self.mask = (1 << bits) - 1
+        self.levels = levels
+        self.dispatch = dispatch
+        self.clock = clock
+        # Furthest deadline, in ticks; later ones are clamped (13.6 years by default)
+        self.span = 1 << (bits * levels)
+        self._rings = [[[] for _ in range(1 << bits)] for _ in range(levels)]
+        self._start = clock()
+        # Ticks done; every entry on the wheel has a deadline after it
+        self._now = 0
+        # Entries on the wheel, cancelled ones until their slot comes up
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def __len__(self):
+        return self._pending
+
+    def schedule(self, delay, callback, *args):
+        """Call ``callback(*args)`` in ``delay`` seconds; returns its ``Timeout``."""
+        elapsed = (self.clock() - self._start + delay) / self.tick
+        with self._lock:
+            deadline = min(max(math.ceil(elapsed), self._now + 1), self._now + self.span - 1)
+            timeout = Timeout(deadline, callback, args)
+            self._insert(timeout)
+            self._pending += 1
+            if self._thread is None:
+                # Started on first use, so forked shard workers get their own
+                self._thread = threading.Thread(target=self.run, name="timers", daemon=True)
+                self._thread.start()
+        return timeout
+
+    def _insert(self, timeout):
+        delta = timeout.deadline - self._now
+        level = 0
+        while delta >> (self.bits * (level + 1)):
+            level += 1
+        self._rings[level][timeout.deadline >> (self.bits * level) & self.mask].append(timeout)
+
+    def advance(self, target):
+        """Turn the wheel to tick ``target``; returns the timeouts that came due."""
+        due = []
+        bits, mask, rings = self.bits, self.mask, self._rings
+        with self._lock:
+            while self._now < target:
+                self._now += 1
+                now = self._now
+                # A ring wrapped: move the next slot of the level above down,
+                # the coarsest first so its entries can go down more than one level
+                if not now & mask:
+                    for level in range(self.levels - 1, 0, -1):
+                        if now & ((1 << (bits * level)) - 1):
+                            continue
+                        index = now >> (bits * level) & mask
+                        slot = rings[level][index]
+                        if slot:
+                            rings[level][index] = []
+                            for timeout in slot:
+                                if timeout.callback is None:
+                                    self._pending -= 1
+                                else:
+                                    self._insert(timeout)
+                slot = rings[0][now & mask]
+                if slot:
+                    rings[0][now & mask] = []
+                    self._pending -= len(slot)
+                    due += slot
+        return due
+
+    def run(self):
+        while True:
+            target = int((self.clock() - self._start) / self.tick)
+            for timeout in self.advance(target):
+                callback, args = timeout.callback, timeout.args
+                if callback is None:
+                    continue
+                timeout.cancel()
+                try:
+                    if self.dispatch:
+                        self.dispatch(callback, *args)
+                    else:
+                        callback(*args)
+                except Exception as e:
+                    print("Timer callback failed:", repr(e))
+            time.sleep(max(0.0, (target + 1) * self.tick - (self.clock() - self._start)))